@@ -0,0 +1,254 @@
+"""
+Backtest walk-forward (rolling origin) atas dataset historis.
+
+Setiap titik origin memakai 60 nilai terakhir sebelumnya sebagai window
+input dan memprediksi secara rekursif sejauh horizon, lalu hasilnya
+dibandingkan dengan nilai aktual. Window dan target aktual adalah view
+sliding_window_view atas satu array (tanpa salinan); hanya potongan
+origin yang sedang diproses yang disalin ke tensor input. Origin
+dibagi menjadi batch besar yang masing-masing dijalankan dengan satu
+rollout berbatch, tersebar di beberapa proses worker.
+
+Kolom yang tidak ada di registry scaler di-fit hanya dari data yang
+sudah tersedia saat origin pertama, bukan dari seluruh series.
+
+Contoh:
+    python backtest.py --column GLD --horizon 30 --stride 1 --workers 4
+    python backtest.py --column SLV --scalers scalers.npz
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import forecast_core
+from rollout import RolloutEngine
+from scaler_registry import load_registry
+
+METRICS = ('MAE', 'MSE', 'MAPE')
+
+# State per proses worker, diisi oleh _init_worker
+_worker = {}
+
+
+def origin_views(values, scaled, horizon, sequence_length=forecast_core.SEQUENCE_LENGTH):
+    """
+    Window input dan target aktual untuk setiap origin, sebagai view tanpa salinan
+    Args:
+        values: Nilai asli (n,)
+        scaled: Nilai ter-skala float32 (n,)
+        horizon: Jumlah langkah prediksi
+    Returns:
+        tuple: (windows (origins, sequence_length), actuals (origins, horizon))
+            Origin ke-i memakai scaled[i:i+sequence_length] dan dibandingkan
+            dengan values[i+sequence_length:i+sequence_length+horizon].
+    """
+    origins = len(values) - sequence_length - horizon + 1
+    if origins < 1:
+        raise ValueError(f"Data terlalu sedikit. Minimal {sequence_length + horizon} data point "
+                         f"diperlukan untuk horizon {horizon}.")
+    windows = sliding_window_view(scaled, sequence_length)[:origins]
+    actuals = sliding_window_view(values[sequence_length:], horizon)[:origins]
+    return windows, actuals
+
+
+def error_sums(predictions, actuals):
+    """
+    Jumlah error per langkah horizon, agar hasil antar batch bisa dijumlahkan
+    Returns:
+        dict: count, abs, sq, ape, ape_count — masing-masing array (horizon,)
+    """
+    errors = predictions - actuals
+    nonzero = actuals != 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ape = np.where(nonzero, np.abs(errors / actuals), 0.0)
+    return {
+        'count': np.full(actuals.shape[1], len(actuals), dtype=np.int64),
+        'abs': np.abs(errors).sum(axis=0),
+        'sq': (errors ** 2).sum(axis=0),
+        'ape': ape.sum(axis=0),
+        'ape_count': nonzero.sum(axis=0),
+    }
+
+
+def merge_sums(total, part):
+    if total is None:
+        return {key: value.copy() for key, value in part.items()}
+    for key, value in part.items():
+        total[key] += value
+    return total
+
+
+def summarize(sums):
+    """Tabel MAE/MSE/MAPE (%) per langkah horizon dari hasil error_sums"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table = pd.DataFrame({
+            'Origins': sums['count'],
+            'MAE': sums['abs'] / sums['count'],
+            'MSE': sums['sq'] / sums['count'],
+            'MAPE': np.where(sums['ape_count'] > 0, sums['ape'] / sums['ape_count'] * 100, np.nan),
+        }, index=pd.RangeIndex(1, len(sums['count']) + 1, name='Langkah'))
+    return table
+
+
+def evaluate_origins(engine, scaler, windows, actuals, positions):
+    """
+    Menjalankan rollout berbatch untuk sebagian origin
+    Args:
+        engine: RolloutEngine
+        scaler: Scaler untuk inverse transform
+        windows, actuals: Hasil origin_views
+        positions: Indeks origin yang dievaluasi
+    """
+    horizon = actuals.shape[1]
+    scaled_predictions = engine.run_batch(windows[positions][..., None], horizon)
+    predictions = forecast_core.inverse_predictions(scaler, scaled_predictions)
+    return error_sums(predictions, actuals[positions])
+
+
+def _init_worker(model_path, scaler, num_threads, values, horizon):
+    from interpreter_pool import create_interpreter
+    scaled = scaler.transform(values.reshape(-1, 1)).ravel().astype(np.float32)
+    _worker['engine'] = RolloutEngine(create_interpreter(model_path, num_threads=num_threads))
+    _worker['scaler'] = scaler
+    _worker['views'] = origin_views(values, scaled, horizon)
+
+
+def _evaluate_chunk(positions):
+    windows, actuals = _worker['views']
+    return evaluate_origins(_worker['engine'], _worker['scaler'], windows, actuals, positions)
+
+
+def origin_positions(length, horizon=30, stride=1, max_origins=None):
+    """
+    Indeks awal window setiap origin yang dievaluasi
+    Raises:
+        ValueError: Jika data terlalu sedikit untuk satu origin pun
+    """
+    total = length - forecast_core.SEQUENCE_LENGTH - horizon + 1
+    positions = np.arange(0, max(total, 0), stride)
+    if max_origins is not None:
+        positions = positions[-max_origins:]
+    if not len(positions):
+        raise ValueError(f"Data terlalu sedikit. Minimal {forecast_core.SEQUENCE_LENGTH + horizon} "
+                         f"data point diperlukan untuk horizon {horizon}.")
+    return positions
+
+
+def run_backtest(values, scaler, model_path='model.tflite', horizon=30, stride=1,
+                 max_origins=None, batch_size=1024, workers=None, num_threads=1, progress=None):
+    """
+    Backtest walk-forward atas satu series
+    Args:
+        values: Nilai asli (n,), urut menurut waktu
+        scaler: Scaler kolom yang diuji (mis. ScalerRegistry.scaler_for)
+        horizon: Jumlah langkah prediksi dari setiap origin
+        stride: Jarak antar origin
+        max_origins: Batasi ke origin terbaru sebanyak ini (None = semua)
+        batch_size: Jumlah origin per rollout berbatch
+        workers: Jumlah proses worker (None = jumlah CPU, 1 = di proses ini)
+        num_threads: Thread TFLite per worker
+        progress: Callback progress(origins_selesai, total_origins)
+    Returns:
+        pd.DataFrame: MAE, MSE dan MAPE (%) per langkah horizon
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    positions = origin_positions(len(values), horizon, stride, max_origins)
+    chunks = [positions[i:i + batch_size] for i in range(0, len(positions), batch_size)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    sums, done = None, 0
+    initargs = (model_path, scaler, num_threads, values, horizon)
+    if workers == 1:
+        _init_worker(*initargs)
+        for chunk in chunks:
+            sums = merge_sums(sums, _evaluate_chunk(chunk))
+            done += len(chunk)
+            if progress:
+                progress(done, len(positions))
+        return summarize(sums)
+
+    # spawn: TensorFlow tidak aman di-fork setelah diinisialisasi
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=initargs) as executor:
+        futures = {executor.submit(_evaluate_chunk, chunk): len(chunk) for chunk in chunks}
+        for future in as_completed(futures):
+            sums = merge_sums(sums, future.result())
+            done += futures[future]
+            if progress:
+                progress(done, len(positions))
+    return summarize(sums)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest walk-forward model prediksi harga emas")
+    parser.add_argument('--csv', default='gld_price_data.csv')
+    parser.add_argument('--date-column', default='Date')
+    parser.add_argument('--column', default='GLD', help='Kolom harga yang diuji')
+    parser.add_argument('--horizon', type=int, default=30, help='Jumlah langkah prediksi per origin')
+    parser.add_argument('--stride', type=int, default=1, help='Jarak antar origin')
+    parser.add_argument('--max-origins', type=int, help='Hanya origin terbaru sebanyak ini')
+    parser.add_argument('--batch-size', type=int, default=1024, help='Origin per rollout berbatch')
+    parser.add_argument('--model', default='model.tflite')
+    parser.add_argument('--scaler', default='scaler.pkl', help='Scaler lama (GLD), jika GLD tidak ada di --scalers')
+    parser.add_argument('--scalers', default='scalers.npz',
+                        help='Registry scaler per kolom; kolom yang tidak terdaftar di-fit dari data '
+                             'sebelum origin pertama')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--num-threads', type=int, default=1, help='Thread TFLite per worker')
+    parser.add_argument('--output', help='Simpan tabel per langkah ke CSV')
+    parser.add_argument('--json', help='Simpan ringkasan ke file JSON')
+    args = parser.parse_args(argv)
+
+    values, _ = forecast_core.load_series(args.csv, args.column, args.date_column)
+    try:
+        positions = origin_positions(len(values), args.horizon, args.stride, args.max_origins)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    # Setiap kolom diuji dengan scaler-nya sendiri, sama seperti aplikasi dan forecast_cli.
+    # Kolom yang belum terdaftar hanya di-fit dari data sebelum origin pertama
+    # agar min/max periode yang diuji tidak bocor ke input model
+    history = values[:positions[0] + forecast_core.SEQUENCE_LENGTH]
+    scaler = load_registry(args.scalers, args.scaler).scaler_for(args.column, history)
+    start = time.perf_counter()
+
+    def progress(done, total):
+        print(f"\r{done}/{total} origin", end='', file=sys.stderr, flush=True)
+
+    try:
+        table = run_backtest(values, scaler, args.model, args.horizon, args.stride, args.max_origins,
+                             args.batch_size, args.workers, args.num_threads, progress)
+    except ValueError as e:
+        print(f"\n{e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    origins = int(table['Origins'].iloc[0])
+    print(file=sys.stderr)
+
+    print(table.to_string(float_format=lambda v: f"{v:.4f}"))
+    overall = {metric: float(table[metric].mean()) for metric in METRICS}
+    print(f"{origins} origin x {args.horizon} langkah dalam {elapsed:.1f}s "
+          f"({origins / elapsed:.0f} origin/s) — rata-rata MAE {overall['MAE']:.4f}, "
+          f"MSE {overall['MSE']:.4f}, MAPE {overall['MAPE']:.2f}%")
+
+    if args.output:
+        table.to_csv(args.output)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'column': args.column, 'horizon': args.horizon, 'stride': args.stride,
+                       'origins': origins, 'seconds': elapsed, 'overall': overall,
+                       'per_step': table.reset_index().to_dict(orient='records')}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
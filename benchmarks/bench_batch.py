@@ -0,0 +1,77 @@
+"""
+Benchmark rollout batch: N rollout terpisah vs satu rollout berbatch N
+
+Contoh:
+    python benchmarks/bench_batch.py --model model.tflite --series 1,10,50 --horizon 30
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rollout import RolloutEngine
+
+
+def make_windows(csv_path, count, sequence_length=60):
+    """Mengambil window ter-skala dari berbagai kolom/offset dataset"""
+    df = pd.read_csv(csv_path)
+    values = df.select_dtypes(include=[np.number]).to_numpy(dtype=np.float64)
+    values = (values - values.min(axis=0)) / (values.max(axis=0) - values.min(axis=0))
+    rng = np.random.default_rng(0)
+    columns = rng.integers(0, values.shape[1], size=count)
+    starts = rng.integers(0, len(values) - sequence_length, size=count)
+    return np.stack([values[s:s + sequence_length, c] for s, c in zip(starts, columns)])[..., None]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default='model.tflite')
+    parser.add_argument('--csv', default='gld_price_data.csv')
+    parser.add_argument('--series', default='1,10,50')
+    parser.add_argument('--horizon', type=int, default=30)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--json', help='Simpan hasil ke file JSON')
+    args = parser.parse_args(argv)
+
+    import tensorflow as tf
+    model = tf.lite.Interpreter(model_path=args.model)
+    model.allocate_tensors()
+    engine = RolloutEngine(model)
+    if not engine.dynamic_batch:
+        print("Peringatan: model memiliki batch tetap, rollout batch dijalankan per series")
+
+    results = []
+    print(f"{'N':>6} {'sequential (ms)':>16} {'batched (ms)':>14} {'speedup':>8}")
+    for count in [int(n) for n in args.series.split(',')]:
+        windows = make_windows(args.csv, count)
+
+        sequential, batched = [], []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            for window in windows:
+                engine.run(window, args.horizon)
+            sequential.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            engine.run_batch(windows, args.horizon)
+            batched.append(time.perf_counter() - start)
+
+        seq, bat = statistics.median(sequential), statistics.median(batched)
+        results.append({'series': count, 'horizon': args.horizon,
+                        'sequential_s': seq, 'batched_s': bat})
+        print(f"{count:>6} {seq * 1e3:>16.1f} {bat * 1e3:>14.1f} {seq / bat:>7.2f}x")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark grafik historis: semua titik vs LTTB dengan anggaran piksel
+
+Untuk deret sintetis per menit dengan berbagai panjang, mengukur waktu
+render dan ukuran PNG jika semua titik digambar, dibandingkan dengan
+membangun piramida sekali lalu memilih titik untuk tampilan penuh dan
+tampilan zoom.
+
+Contoh:
+    python benchmarks/bench_downsample.py --rows 100000,1000000 --points 1500
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chart_render import ChartCache, render_chart
+from downsample import DownsamplePyramid
+
+
+def make_series(rows):
+    rng = np.random.default_rng(0)
+    dates = np.datetime64('2000-01-01', 'ns') + np.arange(rows) * np.timedelta64(1, 'm')
+    values = 100 + np.cumsum(rng.normal(0, 0.05, rows))
+    return dates, values
+
+
+def render(dates, values):
+    def draw(fig):
+        ax = fig.subplots()
+        ax.plot(dates, values, linewidth=0.8)
+    start = time.perf_counter()
+    # Cache baru agar setiap render benar-benar digambar
+    data = render_chart('bench', draw, figsize=(10, 6), dpi=150, cache=ChartCache())
+    return time.perf_counter() - start, len(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='100000,1000000')
+    parser.add_argument('--points', type=int, default=1500)
+    parser.add_argument('--skip-full-above', type=int, default=10_000_000,
+                        help='Lewati render semua titik untuk deret lebih panjang dari ini')
+    parser.add_argument('--json', help='Simpan hasil ke file JSON')
+    args = parser.parse_args(argv)
+
+    render(*make_series(10))  # impor dan inisialisasi matplotlib tidak ikut diukur
+    results = []
+    print(f"{'rows':>9} {'full render (s)':>16} {'full PNG (KB)':>14} {'pyramid (s)':>12} "
+          f"{'select (ms)':>12} {'zoom (ms)':>10} {'LTTB render (s)':>16} {'LTTB PNG (KB)':>14}")
+    for rows in [int(n) for n in args.rows.split(',')]:
+        dates, values = make_series(rows)
+
+        full_s, full_bytes = (None, None)
+        if rows <= args.skip_full_above:
+            full_s, full_bytes = render(dates, values)
+
+        start = time.perf_counter()
+        pyramid = DownsamplePyramid(dates, values)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        positions = pyramid.select(args.points)
+        select_s = time.perf_counter() - start
+
+        # Zoom ke 10% terakhir dari rentang waktu
+        start = time.perf_counter()
+        pyramid.select(args.points, dates[int(rows * 0.9)], dates[-1])
+        zoom_s = time.perf_counter() - start
+
+        lttb_s, lttb_bytes = render(dates[positions], values[positions])
+        results.append({'rows': rows, 'full_render_s': full_s, 'full_png_bytes': full_bytes,
+                        'pyramid_build_s': build_s, 'select_s': select_s, 'zoom_select_s': zoom_s,
+                        'points': len(positions), 'lttb_render_s': lttb_s, 'lttb_png_bytes': lttb_bytes})
+        full_text = f"{full_s:>16.2f} {full_bytes / 1024:>14.0f}" if full_s is not None else f"{'-':>16} {'-':>14}"
+        print(f"{rows:>9} {full_text} {build_s:>12.2f} {select_s * 1e3:>12.1f} {zoom_s * 1e3:>10.1f} "
+              f"{lttb_s:>16.2f} {lttb_bytes / 1024:>14.0f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
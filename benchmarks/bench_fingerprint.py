@@ -0,0 +1,136 @@
+"""
+Benchmark latensi rerun: cache yang meng-hash DataFrame vs key fingerprint
+
+Mensimulasikan rerun halaman prediksi yang hanya dipicu perubahan slider
+(data upload sama, semua cache sudah hangat). Mode "hash" meneruskan
+DataFrame ke fungsi @st.cache_data seperti sebelumnya sehingga Streamlit
+meng-hash-nya di setiap panggilan; mode "fingerprint" menghitung digest
+byte upload sekali lalu hanya meneruskan key pendek.
+
+Contoh:
+    python benchmarks/bench_fingerprint.py --rows 10000,100000,1000000
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import forecast_core
+import fingerprint
+from upload_validation import validate_frame
+
+
+def make_upload(rows):
+    """Bytes CSV sintetis dengan kolom Date dan GLD"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Date': pd.date_range('1900-01-01', periods=rows, freq='D').strftime('%Y-%m-%d'),
+        'GLD': 100 + np.cumsum(rng.normal(0, 0.5, rows)).clip(-90, None),
+        'SPX': 1000 + np.cumsum(rng.normal(0, 5, rows)).clip(-900, None),
+    })
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def build_pipelines(st):
+    """Dua varian langkah ter-cache halaman prediksi"""
+
+    # Varian lama: argumen DataFrame di-hash oleh Streamlit di setiap panggilan
+    @st.cache_data
+    def read_hashed(content):
+        return pd.read_csv(io.BytesIO(content))
+
+    @st.cache_data
+    def validate_hashed(df, date_column, value_column):
+        report = validate_frame(df, date_column, value_column)
+        return report.is_valid
+
+    @st.cache_data
+    def prepare_hashed(df, value_column, date_column):
+        return forecast_core.prepare_prediction_data(df, value_column, date_column)
+
+    def rerun_hashed(content):
+        df = read_hashed(content)
+        validate_hashed(df, 'Date', 'GLD')
+        return prepare_hashed(df, 'GLD', 'Date')
+
+    # Varian baru: key dari fingerprint, DataFrame tidak di-hash
+    @st.cache_data
+    def read_keyed(key, _content):
+        return pd.read_csv(io.BytesIO(_content))
+
+    @st.cache_data
+    def validate_keyed(key, _df, date_column, value_column):
+        report = validate_frame(_df, date_column, value_column)
+        return report.is_valid
+
+    @st.cache_data
+    def prepare_keyed(key, _df, value_column, date_column):
+        return forecast_core.prepare_prediction_data(_df, value_column, date_column)
+
+    memo = {}
+
+    def rerun_keyed(content):
+        # Setara session_state: digest byte upload hanya dihitung sekali per file
+        if id(content) not in memo:
+            memo[id(content)] = fingerprint.digest_bytes(content)
+        key = memo[id(content)]
+        df = read_keyed(key, content)
+        validate_keyed(key, df, 'Date', 'GLD')
+        return prepare_keyed(fingerprint.combine(key, 'Date', 'GLD'), df, 'GLD', 'Date')
+
+    return rerun_hashed, rerun_keyed
+
+
+def time_reruns(rerun, content, repeats):
+    start = time.perf_counter()
+    rerun(content)
+    cold = time.perf_counter() - start
+    warm = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        rerun(content)
+        warm.append(time.perf_counter() - start)
+    return cold, statistics.median(warm)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='10000,100000,1000000')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--json', help='Simpan hasil ke file JSON')
+    args = parser.parse_args(argv)
+
+    # Tanpa runtime Streamlit, cache_data memakai penyimpanan memori biasa;
+    # peringatan "bare mode" di setiap panggilan tidak relevan untuk benchmark
+    import streamlit as st
+    from streamlit import logger as st_logger
+    st.get_option('logger.level')  # parsing config me-reset level log, jadi paksa dulu
+    st_logger.set_log_level('error')
+
+    results = []
+    print(f"{'rows':>9} {'hash rerun (ms)':>16} {'fingerprint rerun (ms)':>23} {'speedup':>8}")
+    for rows in [int(n) for n in args.rows.split(',')]:
+        content = make_upload(rows)
+        rerun_hashed, rerun_keyed = build_pipelines(st)
+        st.cache_data.clear()
+        hashed_cold, hashed = time_reruns(rerun_hashed, content, args.repeats)
+        keyed_cold, keyed = time_reruns(rerun_keyed, content, args.repeats)
+        results.append({'rows': rows, 'hash_cold_s': hashed_cold, 'hash_rerun_s': hashed,
+                        'fingerprint_cold_s': keyed_cold, 'fingerprint_rerun_s': keyed})
+        print(f"{rows:>9} {hashed * 1e3:>16.1f} {keyed * 1e3:>23.1f} {hashed / keyed:>7.1f}x")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
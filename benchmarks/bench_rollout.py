@@ -0,0 +1,117 @@
+"""
+Benchmark latensi per langkah: loop predict_future lama vs RolloutEngine
+
+Contoh:
+    python benchmarks/bench_rollout.py --model model.tflite --horizons 1-90
+"""
+import argparse
+import json
+import os
+import pickle
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rollout import RolloutEngine
+
+
+def legacy_rollout(model, data, scaler, days_to_predict):
+    """Salinan loop predict_future sebelum RolloutEngine (tanpa Streamlit)"""
+    predictions = []
+    current_sequence = data.reshape(1, 60, 1)
+    for i in range(days_to_predict):
+        input_details = model.get_input_details()
+        model.set_tensor(input_details[0]['index'], current_sequence.astype(np.float32))
+        model.invoke()
+        output_details = model.get_output_details()
+        prediction = model.get_tensor(output_details[0]['index'])
+        prediction_value = float(scaler.inverse_transform(prediction)[0][0])
+        predictions.append(prediction_value)
+        new_value = scaler.transform([[prediction_value]])[0]
+        current_sequence = np.append(current_sequence[:, 1:, :],
+                                     new_value.reshape(1, 1, 1),
+                                     axis=1)
+    return predictions
+
+
+def engine_rollout(model, data, scaler, days_to_predict):
+    engine = RolloutEngine(model)
+    scaled = engine.run(data, days_to_predict)
+    return scaler.inverse_transform(scaled.astype(np.float64).reshape(-1, 1))[:, 0].tolist()
+
+
+def parse_horizons(text):
+    """Menerima format '1-90' atau '1,7,30'"""
+    if '-' in text:
+        start, end = text.split('-', 1)
+        return list(range(int(start), int(end) + 1))
+    return [int(h) for h in text.split(',') if h]
+
+
+def load_scaler(path, csv_path, column):
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    from sklearn.preprocessing import MinMaxScaler
+    df = pd.read_csv(csv_path)
+    return MinMaxScaler(feature_range=(0, 1)).fit(df[[column]].values)
+
+
+def time_per_step(fn, model, data, scaler, horizon, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(model, data, scaler, horizon)
+        samples.append((time.perf_counter() - start) / horizon)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default='model.tflite')
+    parser.add_argument('--scaler', default='scaler.pkl')
+    parser.add_argument('--csv', default='gld_price_data.csv')
+    parser.add_argument('--column', default='GLD')
+    parser.add_argument('--horizons', default='1-90')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--json', help='Simpan hasil ke file JSON')
+    args = parser.parse_args(argv)
+
+    import tensorflow as tf
+    model = tf.lite.Interpreter(model_path=args.model)
+    model.allocate_tensors()
+    scaler = load_scaler(args.scaler, args.csv, args.column)
+
+    df = pd.read_csv(args.csv)
+    data = scaler.transform(df[[args.column]].values)[-60:].reshape(60, 1)
+
+    # Pemanasan agar alokasi awal interpreter tidak ikut terukur
+    legacy_rollout(model, data, scaler, 5)
+    engine_rollout(model, data, scaler, 5)
+
+    results = []
+    print(f"{'horizon':>8} {'legacy (us/step)':>18} {'engine (us/step)':>18} {'speedup':>8}")
+    for horizon in parse_horizons(args.horizons):
+        legacy = time_per_step(legacy_rollout, model, data, scaler, horizon, args.repeats)
+        engine = time_per_step(engine_rollout, model, data, scaler, horizon, args.repeats)
+        results.append({'horizon': horizon, 'legacy_s': legacy, 'engine_s': engine})
+        print(f"{horizon:>8} {legacy * 1e6:>18.1f} {engine * 1e6:>18.1f} {legacy / engine:>7.2f}x")
+
+    # Pastikan kedua jalur menghasilkan prediksi yang sama
+    max_horizon = max(r['horizon'] for r in results)
+    diff = np.max(np.abs(np.array(legacy_rollout(model, data, scaler, max_horizon)) -
+                         np.array(engine_rollout(model, data, scaler, max_horizon))))
+    print(f"Selisih maksimum prediksi: {diff:.6f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'results': results, 'max_abs_diff': float(diff)}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
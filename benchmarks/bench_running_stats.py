@@ -0,0 +1,95 @@
+"""
+Benchmark statistik visualisasi: describe()/corr() penuh vs RunningStats
+
+Untuk histori sintetis dengan berbagai panjang, mengukur waktu
+DataFrame.describe() + corr() atas seluruh data (cara lama, setiap rerun)
+dibandingkan pembaruan RunningStats saat histori bertambah --append baris
+dan pembacaan tabel dari state. Selisih maksimum terhadap pandas ikut
+dicetak agar akurasi momen dan kuantil terlihat.
+
+Contoh:
+    python benchmarks/bench_running_stats.py --rows 10000,1000000 --append 1
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from running_stats import RunningStats
+
+COLUMNS = ['SPX', 'GLD', 'USO', 'SLV', 'EUR/USD']
+
+
+def make_history(rows):
+    rng = np.random.default_rng(0)
+    base = np.array([1500.0, 120.0, 30.0, 20.0, 1.2])
+    steps = rng.normal(0, 0.01, (rows, len(COLUMNS)))
+    values = base * np.exp(np.cumsum(steps, axis=0))
+    index = pd.date_range('1990-01-01', periods=rows, freq='D')
+    return pd.DataFrame(values, index=index, columns=COLUMNS)
+
+
+def timed(func, repeat=3):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='10000,100000,1000000')
+    parser.add_argument('--append', type=int, default=1, help='Baris baru per pembaruan')
+    parser.add_argument('--json', help='Simpan hasil ke file JSON')
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'rows':>9} {'pandas (ms)':>12} {'initial (s)':>12} {'append (ms)':>12} "
+          f"{'read (ms)':>10} {'moments rel.err':>16} {'quantile rel.err':>18}")
+    for rows in [int(n) for n in args.rows.split(',')]:
+        df = make_history(rows + args.append)
+        head, tail = df.iloc[:rows], df.iloc[rows:]
+
+        full_s, (expected, expected_corr) = timed(lambda: (df.describe(), df.corr()))
+
+        stats = RunningStats(COLUMNS)
+        start = time.perf_counter()
+        stats.update(head.to_numpy(), head.index)
+        initial_s = time.perf_counter() - start
+        start = time.perf_counter()
+        stats.update(tail.to_numpy(), tail.index)
+        append_s = time.perf_counter() - start
+        read_s, (described, corr) = timed(lambda: (stats.describe(), stats.corr()))
+
+        moments = ['count', 'mean', 'std', 'min', 'max']
+        # Selisih relatif untuk momen (nilai deret bisa sangat besar), absolut untuk korelasi
+        moment_error = max(float(((described.loc[moments] - expected.loc[moments]).abs()
+                                  / expected.loc[moments].abs().clip(lower=1.0)).max().max()),
+                           float((corr - expected_corr).abs().max().max()))
+        quantiles = ['25%', '50%', '75%']
+        # Selisih relatif terhadap rentang nilai kolom
+        spread = expected.loc['max'] - expected.loc['min']
+        quantile_error = float(((described.loc[quantiles] - expected.loc[quantiles]).abs() / spread).max().max())
+
+        results.append({'rows': rows, 'pandas_s': full_s, 'initial_s': initial_s, 'append_s': append_s,
+                        'read_s': read_s, 'moment_error': moment_error,
+                        'quantile_relative_error': quantile_error})
+        print(f"{rows:>9} {full_s * 1e3:>12.1f} {initial_s:>12.2f} {append_s * 1e3:>12.2f} "
+              f"{read_s * 1e3:>10.2f} {moment_error:>16.2e} {quantile_error:>18.2e}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Harness cold start: waktu impor/render dan memori resident per halaman
+
+Setiap skenario dijalankan di proses Python baru (seperti worker/pod yang
+baru dinyalakan) lewat streamlit.testing.AppTest. Dilaporkan waktu sampai
+halaman selesai dirender, RSS puncak, dan modul berat yang ikut dimuat.
+Opsi --eager mengimpor TensorFlow, matplotlib dan scikit-learn di awal
+untuk meniru aplikasi lama yang mengimpor semuanya di level modul.
+
+Contoh:
+    python benchmarks/bench_startup.py --workdir . --upload gld_price_data.csv --compare-eager
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['tensorflow', 'tflite_runtime', 'ai_edge_litert', 'matplotlib', 'sklearn']
+PAGES = ['HOME', 'VISUALISASI MODEL', 'PREDIKSI']
+
+# Skrip app pengganti: file_uploader mengembalikan file lokal agar halaman
+# PREDIKSI dapat dirender sampai model dimuat tanpa interaksi browser
+UPLOAD_WRAPPER = """
+import io, runpy, sys
+import streamlit as st
+_content = open({upload!r}, 'rb').read()
+class _Upload(io.BytesIO):
+    name = {name!r}
+    size = len(_content)
+    file_id = 'bench-startup'
+st.file_uploader = lambda *args, **kwargs: _Upload(_content)
+sys.path.insert(0, {app_dir!r})
+runpy.run_path({app!r}, run_name='__main__')
+"""
+
+
+def child(args):
+    start = time.perf_counter()
+    if args.eager:
+        import matplotlib.pyplot  # noqa: F401
+        import sklearn.preprocessing  # noqa: F401
+        import tensorflow  # noqa: F401
+    eager_s = time.perf_counter() - start
+
+    import resource
+    from streamlit.testing.v1 import AppTest
+    harness_s = time.perf_counter() - start
+
+    app = args.app
+    if args.upload:
+        script = UPLOAD_WRAPPER.format(upload=os.path.abspath(args.upload),
+                                       name=os.path.basename(args.upload),
+                                       app_dir=os.path.dirname(app), app=app)
+        at = AppTest.from_string(script, default_timeout=args.timeout)
+    else:
+        at = AppTest.from_file(app, default_timeout=args.timeout)
+    at.run()
+    if args.page != 'HOME':
+        at.sidebar.radio[0].set_value(args.page).run()
+        if args.page == 'PREDIKSI' and args.upload:
+            at.selectbox[1].set_value(args.value_column).run()
+    render_s = time.perf_counter() - start
+
+    print(json.dumps({
+        'page': args.page,
+        'eager': args.eager,
+        'eager_import_s': eager_s,
+        'harness_s': harness_s,
+        'ready_s': render_s,
+        'app_s': render_s - harness_s,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'heavy_modules': sorted(m for m in HEAVY_MODULES if m in sys.modules),
+        'exceptions': [str(e.value) for e in at.exception],
+    }))
+
+
+def run_scenario(args, page, eager):
+    command = [sys.executable, os.path.abspath(__file__), '--child', '--page', page,
+               '--app', args.app, '--timeout', str(args.timeout),
+               '--value-column', args.value_column]
+    if eager:
+        command.append('--eager')
+    if args.upload:
+        command += ['--upload', os.path.abspath(args.upload)]
+
+    start = time.perf_counter()
+    output = subprocess.run(command, cwd=args.workdir, capture_output=True, text=True)
+    wall_s = time.perf_counter() - start
+    if output.returncode != 0:
+        raise RuntimeError(f"Skenario {page} gagal:\n{output.stderr[-2000:]}")
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    result['wall_s'] = wall_s
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--app', default=os.path.join(REPO_ROOT, 'gold_prediction.py'))
+    parser.add_argument('--workdir', default=REPO_ROOT,
+                        help='Direktori kerja aplikasi (berisi model.tflite, scaler.pkl, CSV)')
+    parser.add_argument('--pages', default=','.join(PAGES))
+    parser.add_argument('--upload', help='CSV yang di-"upload" pada halaman PREDIKSI')
+    parser.add_argument('--value-column', default='GLD')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=180)
+    parser.add_argument('--compare-eager', action='store_true',
+                        help='Jalankan juga skenario impor eager sebagai pembanding')
+    parser.add_argument('--json', help='Simpan hasil ke file JSON')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--page', default='HOME', help=argparse.SUPPRESS)
+    parser.add_argument('--eager', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.app = os.path.abspath(args.app)
+
+    if args.child:
+        child(args)
+        return
+
+    results = []
+    print(f"{'page':<18} {'mode':<6} {'ready (s)':>10} {'app (s)':>8} {'RSS (MB)':>9}  modul berat")
+    for page in args.pages.split(','):
+        for eager in ([False, True] if args.compare_eager else [False]):
+            runs = [run_scenario(args, page, eager) for _ in range(args.repeats)]
+            best = min(runs, key=lambda r: r['ready_s'])
+            results.append(best)
+            mode = 'eager' if eager else 'lazy'
+            print(f"{page:<18} {mode:<6} {best['ready_s']:>10.2f} {best['app_s']:>8.2f} "
+                  f"{best['max_rss_mb']:>9.0f}  {', '.join(best['heavy_modules']) or '-'}")
+            if best['exceptions']:
+                print(f"  exception: {best['exceptions'][0]}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Perbandingan varian model TFLite: latensi, ukuran, memori dan akurasi
+
+Setiap varian (lihat interpreter_pool.MODEL_VARIANTS) diukur di proses
+terpisah agar RSS tidak saling memengaruhi: latensi per invoke, latensi
+rollout untuk horizon slider aplikasi (1-90 hari), ukuran file dan
+kenaikan RSS setelah interpreter dimuat. Akurasi dihitung dengan
+backtest walk-forward pada dataset bawaan: MAPE terhadap harga aktual
+dan selisih rata-rata terhadap prediksi float32. Varian termurah (jumlah
+latensi rollout semua horizon paling kecil) yang selisih MAPE-nya
+terhadap float32 masih dalam --tolerance direkomendasikan.
+
+Contoh:
+    python benchmarks/bench_variants.py --model-dir . --tolerance 0.5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import forecast_core
+from backtest import error_sums, origin_views, summarize
+from interpreter_pool import MODEL_VARIANTS
+from soak_render import current_rss_mb
+
+
+def measure_variant(model_path, scaler_path, values, horizons, invokes, repeats, stride, accuracy_horizon,
+                    num_threads):
+    """Dijalankan di proses baru: semua pengukuran untuk satu file model"""
+    from interpreter_pool import create_interpreter, load_tflite_module
+    from rollout import RolloutEngine
+
+    load_tflite_module()  # impor runtime tidak ikut dihitung sebagai memori model
+    scaler = forecast_core.load_scaler_file(scaler_path)
+    scaled = scaler.transform(values.reshape(-1, 1)).ravel().astype(np.float32)
+    rss_before = current_rss_mb()
+    engine = RolloutEngine(create_interpreter(model_path, num_threads=num_threads))
+    rss_loaded = current_rss_mb()
+
+    window = scaled[-forecast_core.SEQUENCE_LENGTH:].reshape(1, -1)
+    engine.run(window, 1)  # pemanasan
+    invoke_times = []
+    for _ in range(invokes):
+        start = time.perf_counter()
+        engine.run(window, 1)
+        invoke_times.append(time.perf_counter() - start)
+
+    rollout_ms = {}
+    for horizon in horizons:
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            engine.run(window, horizon)
+            times.append(time.perf_counter() - start)
+        rollout_ms[horizon] = statistics.median(times) * 1e3
+
+    windows, actuals = origin_views(values, scaled, accuracy_horizon)
+    positions = np.arange(0, len(windows), stride)
+    start = time.perf_counter()
+    scaled_predictions = engine.run_batch(windows[positions][..., None], accuracy_horizon)
+    backtest_s = time.perf_counter() - start
+    predictions = forecast_core.inverse_predictions(scaler, scaled_predictions)
+
+    return {
+        'bytes': os.path.getsize(model_path),
+        'rss_load_mb': rss_loaded - rss_before,
+        'rss_mb': current_rss_mb(),
+        'invoke_ms_p50': statistics.median(invoke_times) * 1e3,
+        'invoke_ms_p95': float(np.percentile(invoke_times, 95)) * 1e3,
+        'rollout_ms': rollout_ms,
+        'backtest_s': backtest_s,
+        'predictions': predictions,
+        'actuals': np.ascontiguousarray(actuals[positions]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-dir', default='.')
+    parser.add_argument('--scaler', help='Default: <model-dir>/scaler.pkl')
+    parser.add_argument('--csv', default='gld_price_data.csv')
+    parser.add_argument('--column', default='GLD')
+    parser.add_argument('--variants', default=','.join(MODEL_VARIANTS))
+    parser.add_argument('--horizons', default='1,7,30,60,90', help='Horizon rollout yang diukur (hari)')
+    parser.add_argument('--invokes', type=int, default=200)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--stride', type=int, default=10, help='Jarak antar origin backtest')
+    parser.add_argument('--accuracy-horizon', type=int, default=30)
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Selisih MAPE maksimum terhadap float32 (poin persen)')
+    parser.add_argument('--num-threads', type=int, default=1)
+    parser.add_argument('--json', help='Simpan hasil ke file JSON')
+    args = parser.parse_args(argv)
+
+    scaler_path = args.scaler or os.path.join(args.model_dir, 'scaler.pkl')
+    horizons = [int(h) for h in args.horizons.split(',')]
+    values, _ = forecast_core.load_series(args.csv, args.column)
+    variants = [v for v in args.variants.split(',')
+                if os.path.exists(os.path.join(args.model_dir, MODEL_VARIANTS[v]))]
+    if 'float32' not in variants:
+        print("model.tflite (float32) dibutuhkan sebagai acuan akurasi", file=sys.stderr)
+        return 1
+
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for variant in variants:
+        # Proses baru per varian agar RSS dan cache CPU tidak terbawa dari varian sebelumnya
+        with context.Pool(1) as pool:
+            results[variant] = pool.apply(measure_variant, (
+                os.path.join(args.model_dir, MODEL_VARIANTS[variant]), scaler_path, values, horizons,
+                args.invokes, args.repeats, args.stride, args.accuracy_horizon, args.num_threads))
+
+    baseline = results['float32']['predictions']
+    for result in results.values():
+        vs_actual = summarize(error_sums(result['predictions'], result['actuals']))
+        vs_float32 = summarize(error_sums(result['predictions'], baseline))
+        result['origins'] = len(result['actuals'])
+        result['mape'] = float(vs_actual['MAPE'].mean())
+        result['mae'] = float(vs_actual['MAE'].mean())
+        result['mean_abs_diff_float32'] = float(vs_float32['MAE'].mean())
+        result['max_abs_diff_float32'] = float(np.abs(result['predictions'] - baseline).max())
+    for result in results.values():
+        result['mape_delta'] = result['mape'] - results['float32']['mape']
+        result['within_tolerance'] = abs(result['mape_delta']) <= args.tolerance
+        del result['predictions'], result['actuals']
+
+    print(f"{'variant':<13} {'size (KB)':>9} {'RSS (MB)':>9} {'invoke p50':>11} "
+          + ' '.join(f"{f'{h}d (ms)':>9}" for h in horizons)
+          + f" {'MAPE (%)':>9} {'ΔMAPE':>7} {'|Δ| vs f32':>11} {'max |Δ|':>8}")
+    for variant, r in results.items():
+        print(f"{variant:<13} {r['bytes'] / 1024:>9.1f} {r['rss_load_mb']:>9.1f} {r['invoke_ms_p50']:>9.3f}ms "
+              + ' '.join(f"{r['rollout_ms'][h]:>9.2f}" for h in horizons)
+              + f" {r['mape']:>9.3f} {r['mape_delta']:>+7.3f} {r['mean_abs_diff_float32']:>11.4f}"
+              f" {r['max_abs_diff_float32']:>8.3f}")
+
+    candidates = [v for v, r in results.items() if r['within_tolerance']]
+    for result in results.values():
+        result['rollout_cost_ms'] = sum(result['rollout_ms'].values())
+    recommended = min(candidates, key=lambda v: (results[v]['rollout_cost_ms'], results[v]['bytes']))
+    print(f"Rekomendasi: GOLD_MODEL_VARIANT={recommended} "
+          f"(total rollout {results[recommended]['rollout_cost_ms']:.2f} ms, "
+          f"ΔMAPE {results[recommended]['mape_delta']:+.3f} poin, toleransi {args.tolerance})")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'tolerance': args.tolerance, 'recommended': recommended,
+                       'origins': results['float32']['origins'], 'variants': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Soak test rendering grafik: RSS harus datar setelah ribuan render
+
+Merender grafik prediksi harian dan tahunan dari aplikasi berkali-kali
+dengan input yang selalu berbeda (cache miss) diselingi input berulang
+(cache hit), lalu mencatat RSS proses setiap --sample render. Mode
+--legacy meniru cara lama (plt.subplots tanpa close) sebagai pembanding.
+
+Contoh:
+    python benchmarks/soak_render.py --renders 3000
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def current_rss_mb():
+    """RSS saat ini dari /proc (Linux), atau RSS puncak jika tidak tersedia"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_inputs(i, horizon=30):
+    rng = np.random.default_rng(i)
+    predictions = list(120 + np.cumsum(rng.normal(0, 1, horizon)))
+    start = datetime(2025, 1, 1) + timedelta(days=i % 365)
+    future_dates = [start + timedelta(days=d + 1) for d in range(horizon)]
+    yearly = [predictions[-1] * (1.05 ** y) for y in range(5)]
+    return predictions, future_dates, yearly
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--renders', type=int, default=3000)
+    parser.add_argument('--unique-every', type=int, default=2,
+                        help='Setiap n render memakai input baru (sisanya cache hit)')
+    parser.add_argument('--sample', type=int, default=250)
+    parser.add_argument('--warmup', type=int, default=500,
+                        help='Render sebelum RSS acuan diambil (cache gambar sudah penuh)')
+    parser.add_argument('--chart-cache-mb', type=float, default=8.0)
+    parser.add_argument('--max-growth-mb', type=float, default=25.0,
+                        help='Batas kenaikan RSS setelah warmup sebelum dianggap bocor')
+    parser.add_argument('--legacy', action='store_true',
+                        help='Gunakan pyplot tanpa close seperti implementasi lama')
+    parser.add_argument('--json', help='Simpan hasil ke file JSON')
+    args = parser.parse_args(argv)
+
+    import streamlit as st
+    from streamlit import logger as st_logger
+    st.get_option('logger.level')  # parsing config me-reset level log, jadi paksa dulu
+    st_logger.set_log_level('error')
+    import chart_render
+    import gold_prediction as app
+    chart_render.default_cache.max_bytes = int(args.chart_cache_mb * 2**20)
+
+    if args.legacy:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        def render(key, predictions, future_dates, yearly):
+            # Figure tetap terdaftar di pyplot dan tidak pernah ditutup
+            app.draw_daily_plot(plt.figure(figsize=(8, 4)), predictions, future_dates)
+            app.draw_yearly_plot(plt.figure(figsize=(8, 4)), yearly)
+    else:
+        def render(key, predictions, future_dates, yearly):
+            app.create_daily_plot(key, None, None, predictions, future_dates, 'Date', 'GLD')
+            app.create_yearly_plot(key, yearly, 'GLD')
+
+    samples = []
+    baseline = None
+    start = time.perf_counter()
+    for i in range(args.renders):
+        seed = i // args.unique_every
+        predictions, future_dates, yearly = make_inputs(seed)
+        render(f"soak-{seed}", predictions, future_dates, yearly)
+        if i + 1 == args.warmup:
+            gc.collect()
+            baseline = current_rss_mb()
+        if (i + 1) % args.sample == 0:
+            samples.append({'renders': i + 1, 'rss_mb': current_rss_mb()})
+            print(f"{i + 1:>7} render  RSS {samples[-1]['rss_mb']:8.1f} MB")
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    final = current_rss_mb()
+    baseline = baseline if baseline is not None else samples[0]['rss_mb']
+    growth = final - baseline
+    result = {
+        'mode': 'legacy' if args.legacy else 'render_chart',
+        'renders': args.renders,
+        'elapsed_s': elapsed,
+        'ms_per_render': elapsed / args.renders * 1e3,
+        'baseline_rss_mb': baseline,
+        'final_rss_mb': final,
+        'growth_mb': growth,
+        'samples': samples,
+    }
+    if not args.legacy:
+        result['chart_cache'] = chart_render.default_cache.stats()
+    print(f"RSS setelah warmup {baseline:.1f} MB, akhir {final:.1f} MB, "
+          f"kenaikan {growth:+.1f} MB ({result['ms_per_render']:.1f} ms/render)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+    if growth > args.max_growth_mb:
+        print(f"GAGAL: RSS naik lebih dari {args.max_growth_mb} MB")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
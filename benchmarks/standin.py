@@ -0,0 +1,87 @@
+"""
+Model dan scaler pengganti untuk benchmark, dibuat tanpa training
+
+Arsitektur sama dengan train_model.build_model (LSTM dua lapis, 60
+timestep, output satu nilai) tetapi bobotnya hasil inisialisasi acak
+dengan seed tetap, sehingga biaya invoke setara model asli tanpa perlu
+data training atau waktu fit. Scaler di-fit langsung dari kolom CSV dan
+disimpan sebagai scalers.npz (tanpa pickle). Hasilnya disertakan di
+benchmarks/standin/ agar suite bisa dijalankan tanpa TensorFlow; skrip
+ini hanya perlu dijalankan ulang jika arsitektur model berubah.
+
+Contoh:
+    python benchmarks/standin.py --output-dir benchmarks/standin
+"""
+import argparse
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import forecast_core
+from scaler_registry import ScalerRegistry
+
+STANDIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'standin')
+MODEL_FILE = 'model.tflite'
+MANIFEST_FILE = 'standin.json'
+
+
+def build_standin(output_dir=STANDIN_DIR, csv_path=os.path.join(REPO_ROOT, 'gld_price_data.csv'), column='GLD',
+                  units=50, seed=0):
+    """
+    Menulis model.tflite (bobot acak) dan scalers.npz ke output_dir
+    Returns:
+        dict: Manifest (ukuran dan checksum file, parameter pembuatan)
+    """
+    import tensorflow as tf
+    from train_model import _write_bytes, build_model, convert_model
+
+    tf.keras.utils.set_random_seed(seed)
+    model = build_model(units=units)
+    os.makedirs(output_dir, exist_ok=True)
+    artifacts = {'model': _write_bytes(os.path.join(output_dir, MODEL_FILE), convert_model(model))}
+
+    values, _ = forecast_core.load_series(csv_path, column)
+    registry = ScalerRegistry.fit(values.reshape(-1, 1), [column])
+    registry.save(os.path.join(output_dir, 'scalers.npz'))
+
+    manifest = {'column': column, 'units': units, 'seed': seed, 'tensorflow': tf.__version__,
+                'artifacts': artifacts}
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_standin(model_dir=STANDIN_DIR, num_threads=1):
+    """
+    Interpreter dan scaler pengganti
+    Returns:
+        tuple: (interpreter, ColumnScaler)
+    """
+    from interpreter_pool import create_interpreter
+
+    with open(os.path.join(model_dir, MANIFEST_FILE)) as f:
+        column = json.load(f)['column']
+    scaler = ScalerRegistry.load(os.path.join(model_dir, 'scalers.npz')).scaler(column)
+    return create_interpreter(os.path.join(model_dir, MODEL_FILE), num_threads=num_threads), scaler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output-dir', default=STANDIN_DIR)
+    parser.add_argument('--csv', default=os.path.join(REPO_ROOT, 'gld_price_data.csv'))
+    parser.add_argument('--column', default='GLD')
+    parser.add_argument('--units', type=int, default=50, help='Unit per lapisan LSTM (samakan dengan model asli)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    manifest = build_standin(args.output_dir, args.csv, args.column, args.units, args.seed)
+    artifact = manifest['artifacts']['model']
+    print(f"{artifact['file']}: {artifact['bytes'] / 1024:.1f} KB  {artifact['sha256'][:12]}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Suite microbenchmark pipeline prediksi dengan model pengganti
+
+Mengukur preprocess_data, predict_future (beberapa horizon),
+predict_future_batch (beberapa ukuran batch), validasi, parsing dan
+ingest CSV (beberapa ukuran input) serta rendering grafik. Model dan
+scaler diambil dari benchmarks/standin/ (lihat standin.py), sehingga
+suite berjalan tanpa model.tflite hasil training. Data besar dibuat
+dengan bootstrap return harian gld_price_data.csv agar distribusinya
+tetap mirip data asli.
+
+Setiap kasus diulang --repeats kali setelah warmup; kasus yang sangat
+cepat dijalankan beberapa kali per sampel agar resolusi timer tidak
+dominan. Hasil (median, min, max per pemanggilan) disimpan ke JSON.
+Dengan --baseline, median (atau --metric min_s) dibandingkan dengan
+hasil sebelumnya dan suite keluar dengan kode 1 jika ada kasus yang
+melambat lebih dari --threshold (dan lebih dari --min-delta-ms, agar
+noise kasus mikro tidak dihitung).
+
+Contoh:
+    python benchmarks/suite.py --output baseline.json
+    python benchmarks/suite.py --baseline baseline.json --threshold 0.2
+    python benchmarks/suite.py --quick --only predict_future
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import forecast_core
+from standin import MANIFEST_FILE, STANDIN_DIR, load_standin
+from upload_validation import validate_stream
+
+# Durasi minimum satu sampel; kasus yang lebih cepat diulang di dalam sampel
+MIN_SAMPLE_S = 0.02
+
+
+def measure(func, repeats=5, warmup=1, setup=None):
+    """
+    Mengukur durasi func per pemanggilan
+    Args:
+        func: Fungsi yang diukur; jika setup diberikan, dipanggil func(setup())
+        repeats: Jumlah sampel
+        warmup: Pemanggilan awal yang tidak dihitung
+        setup: Fungsi persiapan per pemanggilan (tidak ikut diukur)
+    Returns:
+        dict: median_s, min_s, max_s, repeats, inner
+    """
+    call = (lambda: func(setup())) if setup is not None else func
+    for _ in range(warmup):
+        call()
+
+    inner = 1
+    if setup is None:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        inner = max(1, int(MIN_SAMPLE_S / max(elapsed, 1e-9)))
+
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            if setup is not None:
+                args = setup()
+                start = time.perf_counter()
+                func(args)
+                samples.append(time.perf_counter() - start)
+            else:
+                start = time.perf_counter()
+                for _ in range(inner):
+                    func()
+                samples.append((time.perf_counter() - start) / inner)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {'median_s': statistics.median(samples), 'min_s': min(samples), 'max_s': max(samples),
+            'repeats': repeats, 'inner': inner}
+
+
+def synthetic_frame(rows, csv_path=os.path.join(REPO_ROOT, 'gld_price_data.csv'), seed=0):
+    """
+    DataFrame sepanjang rows dengan kolom dan format tanggal seperti gld_price_data.csv;
+    harga dibentuk dari return harian asli yang diambil acak (bootstrap)
+    """
+    source = pd.read_csv(csv_path)
+    numeric = source.drop(columns='Date').apply(pd.to_numeric, errors='coerce').dropna()
+    returns = np.diff(np.log(numeric.to_numpy()), axis=0)
+    rng = np.random.default_rng(seed)
+    sampled = returns[rng.integers(0, len(returns), rows - 1)]
+    levels = np.exp(np.vstack([np.zeros((1, returns.shape[1])), np.cumsum(sampled, axis=0)]))
+    frame = pd.DataFrame(numeric.to_numpy()[0] * levels, columns=numeric.columns).round(6)
+    dates = pd.date_range('2008-01-02', periods=rows, freq='D')
+    frame.insert(0, 'Date', [f"{d.month}/{d.day}/{d.year}" for d in dates])
+    return frame
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment(model_dir):
+    with open(os.path.join(model_dir, MANIFEST_FILE)) as f:
+        standin = json.load(f)
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'model_sha256': standin['artifacts']['model']['sha256'],
+    }
+
+
+def build_cases(args):
+    """Daftar (nama, fungsi ukur) sesuai argumen; data disiapkan sekali per ukuran"""
+    model, scaler = load_standin(args.model_dir)
+    cases = []
+
+    for rows in args.rows:
+        frame = synthetic_frame(rows)
+        csv_bytes = frame.to_csv(index=False).encode('utf-8')
+        parsed = pd.read_csv(io.BytesIO(csv_bytes))
+        series = parsed['GLD'].to_numpy(dtype=np.float64).reshape(-1, 1)
+
+        cases += [
+            (f"csv_parse[rows={rows}]", lambda b=csv_bytes: measure(
+                lambda: pd.read_csv(io.BytesIO(b)), args.repeats)),
+            (f"validate_stream[rows={rows}]", lambda b=csv_bytes: measure(
+                lambda: validate_stream(io.BytesIO(b), 'Date', 'GLD', min_rows=forecast_core.SEQUENCE_LENGTH),
+                args.repeats)),
+            (f"validate_data[rows={rows}]", lambda df=parsed: measure(
+                lambda: forecast_core.validate_data(df, 'Date', 'GLD'), args.repeats)),
+            (f"preprocess_data[rows={rows}]", lambda s=series: measure(
+                lambda: forecast_core.preprocess_data(s, scaler), args.repeats)),
+            (f"csv_ingest[rows={rows}]", lambda b=csv_bytes: measure_ingest(b, args.repeats)),
+        ]
+
+    sequence = forecast_core.preprocess_data(series, scaler)
+    start_date = datetime(2025, 1, 1)
+    for horizon in args.horizons:
+        cases.append((f"predict_future[horizon={horizon}]", lambda h=horizon: measure(
+            lambda: forecast_core.predict_future(model, sequence, scaler, h, start_date), args.repeats)))
+    rng = np.random.default_rng(0)
+    for batch in args.batches:
+        windows = rng.uniform(0, 1, (batch, forecast_core.SEQUENCE_LENGTH, 1)).astype(np.float32)
+        cases.append((f"predict_future_batch[batch={batch},horizon={args.batch_horizon}]", lambda w=windows: measure(
+            lambda: forecast_core.predict_future_batch(model, w, scaler, args.batch_horizon, start_date),
+            args.repeats)))
+
+    render_daily, render_yearly = chart_renderers()
+    predictions, future_dates = forecast_core.predict_future(model, sequence, scaler, max(args.horizons), start_date)
+    yearly, _ = forecast_core.calculate_yearly_predictions(predictions, float(series[-1, 0]))
+    cases += [
+        (f"render_daily_plot[horizon={len(predictions)}]", lambda: measure(
+            lambda: render_daily(predictions, future_dates), args.repeats)),
+        ("render_yearly_plot", lambda: measure(lambda: render_yearly(yearly), args.repeats)),
+    ]
+    return cases
+
+
+def measure_ingest(csv_bytes, repeats):
+    """Ingest dingin (store kosong) sebuah file CSV lewat CsvIngestor"""
+    from ingest import CsvIngestor
+
+    workdir = tempfile.mkdtemp(prefix='gold-bench-')
+    csv_path = os.path.join(workdir, 'data.csv')
+    with open(csv_path, 'wb') as f:
+        f.write(csv_bytes)
+    runs = iter(range(repeats + 1))
+
+    def setup():
+        store_dir = os.path.join(workdir, f"store-{next(runs)}")
+        return CsvIngestor(csv_path, store_dir=store_dir)
+
+    try:
+        return measure(lambda ingestor: ingestor.refresh(), repeats, setup=setup)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def chart_renderers():
+    """Fungsi render grafik harian dan tahunan aplikasi, selalu cache miss"""
+    import streamlit as st
+    from streamlit import logger as st_logger
+    st.get_option('logger.level')  # parsing config me-reset level log, jadi paksa dulu
+    st_logger.set_log_level('error')
+    import chart_render
+    import gold_prediction as app
+    # Peringatan set_ticklabels dari fungsi gambar aplikasi hanya mengotori output
+    warnings.filterwarnings('ignore', category=UserWarning, module='gold_prediction')
+
+    def render_daily(predictions, future_dates):
+        return chart_render.render_chart('bench-daily', lambda fig: app.draw_daily_plot(fig, predictions, future_dates),
+                                         cache=chart_render.ChartCache())
+
+    def render_yearly(yearly):
+        return chart_render.render_chart('bench-yearly', lambda fig: app.draw_yearly_plot(fig, yearly),
+                                         cache=chart_render.ChartCache())
+
+    return render_daily, render_yearly
+
+
+def compare(results, baseline, threshold, min_delta_s, metric='median_s'):
+    """
+    Membandingkan metric (median_s atau min_s) dengan baseline
+    Returns:
+        list: (nama, median baseline, median sekarang, rasio, regresi?) per kasus yang ada di keduanya
+    """
+    rows = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        before, after = previous[metric], result[metric]
+        ratio = after / before if before > 0 else float('inf')
+        regressed = ratio > 1 + threshold and after - before > min_delta_s
+        rows.append((name, before, after, ratio, regressed))
+    return rows
+
+
+def parse_ints(text):
+    return [int(value) for value in text.split(',') if value]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-dir', default=STANDIN_DIR, help='Direktori model pengganti')
+    parser.add_argument('--rows', type=parse_ints, default=[1_000, 10_000, 100_000],
+                        help='Ukuran input CSV, dipisah koma')
+    parser.add_argument('--horizons', type=parse_ints, default=[1, 7, 30, 90])
+    parser.add_argument('--batches', type=parse_ints, default=[1, 8, 64, 256])
+    parser.add_argument('--batch-horizon', type=int, default=30)
+    parser.add_argument('--repeats', type=int, default=7)
+    parser.add_argument('--quick', action='store_true', help='Ukuran kecil dan sedikit ulangan (smoke test)')
+    parser.add_argument('--only', help='Hanya kasus yang namanya mengandung teks ini')
+    parser.add_argument('--output', default='bench_suite.json', help='File JSON hasil')
+    parser.add_argument('--baseline', help='File JSON hasil sebelumnya sebagai pembanding')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Kenaikan median relatif yang dianggap regresi (0.2 = 20%%)')
+    parser.add_argument('--metric', choices=['median_s', 'min_s'], default='median_s',
+                        help='Statistik yang dibandingkan; min_s lebih stabil di mesin yang sibuk')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05,
+                        help='Kenaikan absolut minimum (ms) yang dianggap regresi')
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.rows, args.horizons, args.batches, args.repeats = [1_000, 10_000], [1, 30], [1, 64], 3
+
+    results = {}
+    for name, run in build_cases(args):
+        if args.only and args.only not in name:
+            continue
+        results[name] = run()
+        r = results[name]
+        print(f"{name:<48} median {r['median_s'] * 1e3:10.3f} ms  min {r['min_s'] * 1e3:10.3f} ms")
+
+    report = {'meta': environment(args.model_dir), 'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan ke {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline['meta'].get('model_sha256') != report['meta']['model_sha256']:
+        print("Peringatan: baseline diukur dengan model pengganti yang berbeda")
+
+    rows = compare(results, baseline['results'], args.threshold, args.min_delta_ms / 1e3, args.metric)
+    print(f"\n{'Kasus':<48} {'baseline':>12} {'sekarang':>12} {'rasio':>7}")
+    for name, before, after, ratio, regressed in rows:
+        flag = '  REGRESI' if regressed else ''
+        print(f"{name:<48} {before * 1e3:10.3f}ms {after * 1e3:10.3f}ms {ratio:7.2f}{flag}")
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"GAGAL: {len(regressions)} kasus melambat lebih dari {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"OK: {len(rows)} kasus dibandingkan, tidak ada regresi di atas {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Rendering grafik ke bytes gambar tanpa state global pyplot.
+
+Setiap grafik digambar pada matplotlib.figure.Figure baru dengan canvas
+Agg sendiri (tidak terdaftar di pyplot), diserialisasi ke PNG/SVG, lalu
+figure langsung dibersihkan. Yang disimpan di cache hanya bytes gambar,
+dalam LRU yang dibatasi total ukurannya, sehingga memori server tidak
+bertambah seiring jumlah prediksi.
+"""
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import metrics
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def new_figure(figsize=(8, 4), **kwargs):
+    """Figure baru dengan canvas Agg sendiri, di luar pyplot"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, **kwargs)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def figure_to_bytes(fig, fmt='png', dpi=100):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi)
+    return buffer.getvalue()
+
+
+def close_figure(fig):
+    # Figure di luar pyplot tidak perlu plt.close; cukup lepaskan semua artist
+    # agar siklus referensi figure-axes tidak menahan memori sampai GC berjalan
+    fig.clear()
+
+
+class ChartCache:
+    """
+    Cache LRU bytes gambar yang dibatasi total ukuran (byte) dan jumlah entri
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=512):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            # Gambar yang lebih besar dari seluruh kapasitas tidak disimpan
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+# Cache bersama untuk seluruh sesi di proses ini; ukuran dari GOLD_CHART_CACHE_MB
+default_cache = ChartCache(
+    max_bytes=int(float(os.environ.get('GOLD_CHART_CACHE_MB', DEFAULT_MAX_BYTES / 2**20)) * 2**20)
+)
+
+
+def render_chart(key, draw, figsize=(8, 4), fmt='png', dpi=100, cache=None, stage=None, **figure_kwargs):
+    """
+    Menggambar grafik ke bytes gambar, atau mengambilnya dari cache
+    Args:
+        key: Key yang mewakili seluruh input grafik (hashable)
+        draw: Fungsi draw(fig) yang menggambar pada figure kosong
+        figsize: Ukuran figure dalam inci
+        fmt: 'png' atau 'svg'
+        dpi: Resolusi untuk format raster
+        cache: ChartCache yang dipakai (default: default_cache)
+        stage: Nama tahap di metrics untuk durasi penggambaran saat cache miss
+    Returns:
+        bytes: Isi file gambar
+    """
+    cache = default_cache if cache is None else cache
+    cache_key = (key, tuple(figsize), fmt, dpi)
+    data = cache.get(cache_key)
+    metrics.cache_lookup('chart', data is not None)
+    if data is not None:
+        return data
+
+    with metrics.timer(stage or 'chart'):
+        fig = new_figure(figsize, **figure_kwargs)
+        try:
+            draw(fig)
+            data = figure_to_bytes(fig, fmt, dpi)
+        finally:
+            close_figure(fig)
+    cache.put(cache_key, data)
+    return data
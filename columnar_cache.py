@@ -0,0 +1,269 @@
+"""
+Cache kolumnar dataset historis yang di-memory-map read-only.
+
+Setiap kolom disimpan sebagai file .npy terpisah (tanggal sebagai
+datetime64[ns], harga sebagai float64 atau float32) di direktori versi
+baru, lalu pointer CURRENT diganti secara atomik. Pembaca membuka file
+dengan mmap_mode='r' sehingga semua worker berbagi satu salinan di page
+cache OS, dan tidak ada parsing saat startup.
+
+Contoh build manual:
+    python columnar_cache.py build --csv gld_price_data.csv
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ingest import STORE_DIR, CsvIngestor, file_lock
+
+DATES_FILE = 'dates.npy'
+META_FILE = 'meta.json'
+CURRENT_FILE = 'CURRENT'
+
+_open_lock = threading.Lock()
+_open_tables = {}
+
+
+def _column_file(index, column):
+    # Nama kolom seperti "EUR/USD" tidak aman sebagai nama file
+    return f"col{index:03d}-{re.sub(r'[^A-Za-z0-9_.-]', '_', column)}.npy"
+
+
+def _write_array(path, values, dtype):
+    array = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=values.shape)
+    array[:] = values
+    array.flush()
+    del array
+
+
+class ColumnarTable:
+    """
+    Tampilan read-only atas satu versi cache kolumnar
+    Attributes:
+        index: DatetimeIndex (atau None) yang berbagi memori dengan file mmap
+        columns: Daftar nama kolom harga
+    """
+    def __init__(self, version_dir):
+        self.version_dir = version_dir
+        with open(os.path.join(version_dir, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.columns = [c['name'] for c in self.meta['columns']]
+        self._arrays = {
+            c['name']: np.load(os.path.join(version_dir, c['file']), mmap_mode='r')
+            for c in self.meta['columns']
+        }
+        dates_path = os.path.join(version_dir, DATES_FILE)
+        if os.path.exists(dates_path):
+            self.index = pd.DatetimeIndex(np.load(dates_path, mmap_mode='r'), copy=False,
+                                          name=self.meta.get('index_name'))
+        else:
+            self.index = None
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def __getitem__(self, column):
+        return self._arrays[column]
+
+    def to_frame(self, columns=None):
+        """DataFrame tanpa salinan: setiap kolom menunjuk langsung ke array mmap"""
+        columns = columns or self.columns
+        return pd.DataFrame({c: self._arrays[c] for c in columns}, index=self.index, copy=False)
+
+
+def _new_version_dir(out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    versions = [name for name in os.listdir(out_dir) if name.startswith('v-')]
+    version = max([int(name[2:]) for name in versions] + [0]) + 1
+    version_dir = os.path.join(out_dir, f"v-{version:06d}")
+    os.makedirs(version_dir)
+    return version_dir, versions
+
+
+def _publish_version(out_dir, version_dir, versions, meta):
+    with open(os.path.join(version_dir, META_FILE), 'w') as f:
+        json.dump(meta, f)
+
+    # Ganti pointer secara atomik; pembaca lama tetap memegang mmap versi lama
+    previous = current_version(out_dir)
+    tmp_path = os.path.join(out_dir, CURRENT_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(os.path.basename(version_dir))
+    os.replace(tmp_path, os.path.join(out_dir, CURRENT_FILE))
+
+    # Hapus versi lama kecuali versi yang baru diganti: proses lain mungkin baru saja
+    # membaca CURRENT lama dan belum membukanya. Di POSIX file yang masih di-mmap
+    # tetap valid sampai ditutup
+    keep = os.path.basename(previous) if previous else None
+    for name in versions:
+        if name == keep:
+            continue
+        shutil.rmtree(os.path.join(out_dir, name), ignore_errors=True)
+    return version_dir
+
+
+def build_columnar(table, out_dir, source_offset=0, float32=False, source_generation=None):
+    """
+    Menulis versi baru cache kolumnar dari tabel ber-tipe
+    Args:
+        table: DataFrame dengan index tanggal dan kolom harga numerik
+        out_dir: Direktori induk cache kolumnar
+        source_offset: Offset CSV sumber yang tercakup (untuk deteksi basi)
+        float32: Simpan harga sebagai float32 untuk menghemat memori
+        source_generation: Generasi store ingest sumber (lihat append_columnar)
+    Returns:
+        str: Path direktori versi yang baru
+    """
+    version_dir, versions = _new_version_dir(out_dir)
+
+    dtype = np.float32 if float32 else np.float64
+    numeric_columns = table.select_dtypes(include=[np.number]).columns
+    columns = []
+    for i, column in enumerate(numeric_columns):
+        file_name = _column_file(i, column)
+        _write_array(os.path.join(version_dir, file_name), table[column].to_numpy(dtype=dtype), dtype)
+        columns.append({'name': column, 'file': file_name, 'dtype': np.dtype(dtype).name})
+
+    if isinstance(table.index, pd.DatetimeIndex):
+        _write_array(os.path.join(version_dir, DATES_FILE),
+                     table.index.to_numpy(dtype='datetime64[ns]'), 'datetime64[ns]')
+
+    return _publish_version(out_dir, version_dir, versions, {
+        'rows': len(table), 'columns': columns, 'index_name': table.index.name,
+        'source_offset': source_offset, 'source_generation': source_generation})
+
+
+def _append_array(path, old, new, dtype):
+    array = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(len(old) + len(new),))
+    array[:len(old)] = old
+    array[len(old):] = new
+    array.flush()
+    del array
+
+
+def append_columnar(previous, tail, out_dir, source_offset, source_generation=None):
+    """
+    Menulis versi baru berisi kolom versi sebelumnya ditambah baris baru
+    tanpa membaca ulang histori dari store ingest
+    Args:
+        previous: ColumnarTable versi terkini
+        tail: DataFrame baris baru dengan kolom yang sama dengan previous
+    Returns:
+        str: Path direktori versi yang baru
+    """
+    version_dir, versions = _new_version_dir(out_dir)
+    for column in previous.meta['columns']:
+        dtype = np.dtype(column['dtype'])
+        _append_array(os.path.join(version_dir, column['file']), previous[column['name']],
+                      tail[column['name']].to_numpy(dtype=dtype), dtype)
+    if previous.index is not None:
+        _append_array(os.path.join(version_dir, DATES_FILE), previous.index.to_numpy(),
+                      tail.index.to_numpy(dtype='datetime64[ns]'), np.dtype('datetime64[ns]'))
+
+    meta = dict(previous.meta, rows=len(previous) + len(tail), source_offset=source_offset,
+                source_generation=source_generation)
+    return _publish_version(out_dir, version_dir, versions, meta)
+
+
+def _can_append(previous, tail, generation):
+    """Baris baru bisa disambung jika store tidak dibangun ulang dan kolomnya sama"""
+    if tail is None or previous.meta.get('source_generation') != generation:
+        return False
+    if list(tail.select_dtypes(include=[np.number]).columns) != previous.columns:
+        return False
+    return (previous.index is not None) == isinstance(tail.index, pd.DatetimeIndex)
+
+
+def current_version(out_dir):
+    try:
+        with open(os.path.join(out_dir, CURRENT_FILE)) as f:
+            return os.path.join(out_dir, f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def open_columnar(out_dir):
+    """Membuka versi terkini; objek yang sama dipakai ulang selama versinya sama"""
+    try:
+        return _open_current(out_dir)
+    except FileNotFoundError:
+        # Versi yang ditunjuk CURRENT sudah dihapus penulis di proses lain; baca ulang CURRENT
+        return _open_current(out_dir)
+
+
+def _open_current(out_dir):
+    version_dir = current_version(out_dir)
+    if version_dir is None:
+        return None
+    with _open_lock:
+        table = _open_tables.get(out_dir)
+        if table is None or table.version_dir != version_dir:
+            table = ColumnarTable(version_dir)
+            _open_tables[out_dir] = table
+        return table
+
+
+def columnar_dir(ingestor):
+    return os.path.join(ingestor.store_dir, 'columnar')
+
+
+def ensure_columnar(ingestor, float32=False):
+    """
+    Menjalankan ingestion lalu memperbarui cache kolumnar hanya jika CSV
+    memiliki baris baru sejak build terakhir. Baris baru disambung ke kolom
+    versi sebelumnya; build penuh hanya jika store ingest dibangun ulang
+    Returns:
+        ColumnarTable atau None jika dataset kosong
+    """
+    ingestor.refresh()
+    out_dir = columnar_dir(ingestor)
+    table = open_columnar(out_dir)
+    if table is not None and table.meta['source_offset'] == ingestor.offset:
+        return table
+
+    with file_lock(ingestor.lock_path):
+        # Periksa ulang: proses lain mungkin sudah membangun versi terbaru
+        table = open_columnar(out_dir)
+        if table is not None and table.meta['source_offset'] == ingestor.offset:
+            return table
+        tail = None
+        if table is not None and ingestor.rows >= len(table):
+            tail = ingestor.rows_since(len(table))
+        if table is not None and _can_append(table, tail, ingestor.generation):
+            # Hanya baris sejak build terakhir yang dibaca dari store ingest
+            append_columnar(table, tail, out_dir, ingestor.offset, ingestor.generation)
+        else:
+            source = ingestor.table
+            if source is None:
+                return None
+            build_columnar(source, out_dir, source_offset=ingestor.offset, float32=float32,
+                           source_generation=ingestor.generation)
+        # Cache kolumnar sudah terkini: salinan pandas histori di ingestor tidak diperlukan lagi
+        ingestor.release()
+    return open_columnar(out_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build cache kolumnar dataset historis")
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--csv', default='gld_price_data.csv')
+    parser.add_argument('--store-dir', default=STORE_DIR)
+    parser.add_argument('--float32', action='store_true', help='Simpan harga sebagai float32')
+    args = parser.parse_args(argv)
+
+    ingestor = CsvIngestor(args.csv, store_dir=args.store_dir)
+    table = ensure_columnar(ingestor, float32=args.float32)
+    if table is None:
+        print("Dataset kosong, tidak ada yang dibangun")
+        return
+    print(f"{len(table)} baris, kolom {', '.join(table.columns)} -> {table.version_dir}")
+
+
+if __name__ == '__main__':
+    main()
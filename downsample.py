@@ -0,0 +1,218 @@
+"""
+Downsampling deret waktu untuk grafik, sepenuhnya vektor NumPy.
+
+lttb_indices memakai varian Largest-Triangle-Three-Buckets di mana titik
+acuan kiri setiap bucket adalah centroid bucket sebelumnya (bukan titik
+yang terpilih di bucket itu), sehingga semua bucket bisa dihitung
+sekaligus tanpa loop Python. minmax_indices mengambil titik minimum dan
+maksimum per bucket. Semua fungsi mengembalikan indeks ke array asli
+sehingga tanggal dan nilai tetap berpasangan.
+
+DownsamplePyramid menyimpan beberapa resolusi yang sudah dihitung
+(masing-masing factor kali lebih kasar dari sebelumnya) agar tampilan
+yang di-zoom cukup men-downsample potongan kecil dari level yang sesuai.
+Ekstrem rentang yang ditampilkan dibaca dari tabel min/max per blok,
+bukan dengan memindai semua titik dalam rentang.
+"""
+import numpy as np
+
+
+def as_float_axis(x):
+    """Sumbu x numerik: tanggal dikonversi ke nanodetik sebagai float64"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').view(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def _bucket_edges(n, n_buckets):
+    # Titik pertama dan terakhir selalu dipertahankan; sisanya dibagi rata
+    return np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+
+
+def _first_argmax_per_bucket(values, bucket_id, starts):
+    """Indeks maksimum pertama di setiap bucket tanpa loop Python"""
+    maxima = np.maximum.reduceat(values, starts)
+    candidates = np.flatnonzero(values == maxima[bucket_id])
+    _, first = np.unique(bucket_id[candidates], return_index=True)
+    return candidates[first]
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indeks titik yang dipertahankan oleh LTTB
+    Args:
+        x: Sumbu x (angka atau datetime64), naik
+        y: Nilai, tanpa NaN
+        n_out: Jumlah titik keluaran (minimal 3)
+    Returns:
+        np.ndarray: Indeks terurut, panjang min(n_out, len(y))
+    """
+    x = as_float_axis(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    n_buckets = n_out - 2
+    edges = _bucket_edges(n, n_buckets)
+    starts = edges[:-1]
+    counts = np.diff(edges)
+    bucket_id = np.repeat(np.arange(n_buckets), counts)
+    inner = slice(1, n - 1)
+
+    # Centroid setiap bucket, ditambah titik ujung sebagai bucket ke -1 dan ke n_buckets
+    centroid_x = np.add.reduceat(x[inner], starts - 1) / counts
+    centroid_y = np.add.reduceat(y[inner], starts - 1) / counts
+    anchor_x = np.concatenate([[x[0]], centroid_x, [x[-1]]])
+    anchor_y = np.concatenate([[y[0]], centroid_y, [y[-1]]])
+
+    # Luas segitiga (kiri = centroid bucket sebelumnya, kanan = centroid bucket berikutnya)
+    left_x, left_y = anchor_x[bucket_id], anchor_y[bucket_id]
+    right_x, right_y = anchor_x[bucket_id + 2], anchor_y[bucket_id + 2]
+    area = np.abs((left_x - right_x) * (y[inner] - left_y)
+                  - (left_x - x[inner]) * (right_y - left_y))
+
+    chosen = _first_argmax_per_bucket(area, bucket_id, starts - 1) + 1
+    return np.concatenate([[0], chosen, [n - 1]])
+
+
+def minmax_indices(y, n_buckets):
+    """
+    Indeks titik minimum dan maksimum di setiap bucket (maks. 2 per bucket)
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if 2 * n_buckets >= n or n_buckets < 1:
+        return np.arange(n)
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1]
+    bucket_id = np.repeat(np.arange(n_buckets), np.diff(np.append(starts, n)))
+    maxima = _first_argmax_per_bucket(y, bucket_id, starts)
+    minima = _first_argmax_per_bucket(-y, bucket_id, starts)
+    return np.union1d(maxima, minima)
+
+
+def with_extremes(indices, y):
+    """Menambahkan indeks nilai maksimum dan minimum global ke hasil downsampling"""
+    y = np.asarray(y)
+    if not len(y):
+        return indices
+    return np.union1d(indices, [np.argmax(y), np.argmin(y)])
+
+
+def downsample_indices(x, y, n_out, method='lttb'):
+    """Downsampling dengan metode 'lttb' atau 'minmax', ekstrem selalu dipertahankan"""
+    if method == 'minmax':
+        indices = minmax_indices(y, max(n_out // 2, 1))
+    else:
+        indices = lttb_indices(x, y, n_out)
+    return with_extremes(indices, y)
+
+
+class DownsamplePyramid:
+    """
+    Piramida multi-resolusi atas satu deret
+    Args:
+        x: Sumbu x (angka atau datetime64), naik
+        y: Nilai; NaN diabaikan
+        factor: Rasio jumlah titik antar level
+        min_points: Level terkasar tidak dibuat di bawah jumlah ini
+        oversample: Level dipilih jika titik dalam rentang <= n_out * oversample
+    """
+    def __init__(self, x, y, factor=4, min_points=2048, oversample=4, method='lttb'):
+        self.x = as_float_axis(x)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.factor = factor
+        self.oversample = oversample
+        self.method = method
+
+        # Level 0 = semua titik valid; level berikutnya diturunkan dari level sebelumnya
+        level = np.flatnonzero(np.isfinite(self.y))
+        self.levels = [level]
+        self._level_x = [self.x[level]]
+        self._build_blocks()
+        self._global_extremes = self._extremes(0, len(level))
+        while len(level) // factor >= min_points:
+            subset = downsample_indices(self._level_x[-1], self.y[level], len(level) // factor, method)
+            level = level[subset]
+            self.levels.append(level)
+            self._level_x.append(self.x[level])
+
+    def __len__(self):
+        return len(self.levels[0])
+
+    def select(self, n_out, start=None, stop=None):
+        """
+        Indeks (ke array asli) untuk menampilkan rentang [start, stop] dengan n_out titik
+        Args:
+            n_out: Anggaran titik, biasanya sekitar lebar grafik dalam piksel
+            start, stop: Batas rentang dalam satuan x (datetime64 atau angka), None = ujung data
+        """
+        bounds = [None if b is None else as_float_axis(np.array([b]))[0] for b in (start, stop)]
+        chosen = self.levels[0][:0]
+        for level, level_x in zip(self.levels, self._level_x):
+            lo, hi = self._range(level_x, bounds)
+            chosen = level[lo:hi]
+            # Level pertama (dari yang paling halus) yang cukup kecil untuk rentang ini
+            if len(chosen) <= n_out * self.oversample:
+                break
+
+        if len(chosen) > n_out:
+            chosen = chosen[downsample_indices(self.x[chosen], self.y[chosen], n_out, self.method)]
+        return self._add_range_extremes(chosen, bounds)
+
+    @staticmethod
+    def _range(level_x, bounds):
+        lo = 0 if bounds[0] is None else np.searchsorted(level_x, bounds[0], side='left')
+        hi = len(level_x) if bounds[1] is None else np.searchsorted(level_x, bounds[1], side='right')
+        return lo, hi
+
+    def _build_blocks(self):
+        """
+        Posisi maksimum dan minimum per blok level 0 berukuran factor, factor^2, ...
+        sehingga ekstrem sebuah rentang cukup dibaca dari beberapa blok saja
+        """
+        valid = self.y[self.levels[0]]
+        self._block_sizes, self._block_max, self._block_min = [], [], []
+        size, maxima, minima = 1, np.arange(len(valid)), np.arange(len(valid))
+        while len(maxima) >= self.factor:
+            count = len(maxima) // self.factor
+            offsets = np.arange(count) * self.factor
+            # Blok baru = factor blok sebelumnya; argmax/argmin mengambil kemunculan pertama
+            maxima = maxima[offsets + np.argmax(valid[maxima[:count * self.factor]].reshape(count, -1), axis=1)]
+            minima = minima[offsets + np.argmin(valid[minima[:count * self.factor]].reshape(count, -1), axis=1)]
+            size *= self.factor
+            self._block_sizes.append(size)
+            self._block_max.append(maxima)
+            self._block_min.append(minima)
+
+    def _extremes(self, lo, hi):
+        """Indeks maksimum dan minimum data resolusi penuh di posisi [lo, hi)"""
+        if hi <= lo:
+            return self.levels[0][:0]
+        # Bagian tengah rentang diambil dari blok terbesar yang muat, sisa di kedua
+        # ujung turun ke blok yang lebih kecil; hanya sisa < factor titik dibaca langsung
+        candidates, segments = [], [(lo, hi)]
+        for size, maxima, minima in zip(self._block_sizes[::-1], self._block_max[::-1], self._block_min[::-1]):
+            remaining = []
+            for a, b in segments:
+                first, last = -(-a // size), b // size
+                if first >= last:
+                    remaining.append((a, b))
+                    continue
+                candidates += [maxima[first:last], minima[first:last]]
+                remaining += [(a, first * size), (last * size, b)]
+            segments = [(a, b) for a, b in remaining if a < b]
+        candidates += [np.arange(a, b) for a, b in segments]
+
+        candidates = np.unique(np.concatenate(candidates))
+        positions = self.levels[0][candidates]
+        window = self.y[positions]
+        return positions[[np.argmax(window), np.argmin(window)]]
+
+    def _add_range_extremes(self, chosen, bounds):
+        # Ekstrem diambil dari data resolusi penuh dalam rentang, bukan dari level kasar
+        lo, hi = self._range(self._level_x[0], bounds)
+        if lo == 0 and hi == len(self.levels[0]):
+            return np.union1d(chosen, self._global_extremes)
+        return np.union1d(chosen, self._extremes(lo, hi))
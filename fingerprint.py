@@ -0,0 +1,62 @@
+"""
+Fingerprint isi data untuk key cache yang murah.
+
+st.cache_data meng-hash seluruh argumen di setiap rerun. Untuk DataFrame
+besar biaya itu setara dengan pekerjaan yang ingin dilewati. Fungsi di
+sini menghitung digest sekali (dari byte file upload, atau buffer numpy
+per kolom) sehingga fungsi ter-cache cukup menerima string pendek sebagai
+key, sementara DataFrame-nya dilewatkan sebagai argumen ber-underscore
+yang tidak di-hash.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+DIGEST_SIZE = 16
+
+
+def _hasher():
+    return hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+
+def digest_bytes(data):
+    """Digest dari bytes atau buffer apa pun"""
+    hasher = _hasher()
+    hasher.update(memoryview(data))
+    return hasher.hexdigest()
+
+
+def _update_array(hasher, values):
+    values = np.asarray(values)
+    if values.dtype == object:
+        # String/objek tidak punya buffer tetap: hash per elemen lewat pandas
+        values = pd.util.hash_array(values.ravel())
+    hasher.update(f"{values.dtype.str}{values.shape}".encode('utf-8'))
+    hasher.update(np.ascontiguousarray(values).reshape(-1).view(np.uint8))
+
+
+def digest_array(values):
+    """Digest array numpy (atau list angka) dari buffer mentahnya"""
+    hasher = _hasher()
+    _update_array(hasher, values)
+    return hasher.hexdigest()
+
+
+def digest_frame(df):
+    """Digest DataFrame dari nama, dtype dan buffer setiap kolom serta index"""
+    hasher = _hasher()
+    for column in df.columns:
+        hasher.update(f"|{column}|".encode('utf-8'))
+        _update_array(hasher, df[column].to_numpy())
+    hasher.update(b'|index|')
+    _update_array(hasher, df.index.to_numpy())
+    return hasher.hexdigest()
+
+
+def combine(*parts):
+    """Menggabungkan beberapa digest/nilai kecil menjadi satu key"""
+    hasher = _hasher()
+    for part in parts:
+        hasher.update(f"{part}\x1f".encode('utf-8'))
+    return hasher.hexdigest()
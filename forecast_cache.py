@@ -0,0 +1,171 @@
+import atexit
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+from ingest import file_lock
+
+_digest_lock = threading.Lock()
+_digest_memo = {}
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    Checksum SHA-256 sebuah file, di-memo berdasarkan (path, ukuran, mtime)
+    sehingga file yang tidak berubah tidak dibaca ulang. File yang tidak
+    ada menghasilkan string kosong.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return ''
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        if memo_key in _digest_memo:
+            return _digest_memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    with _digest_lock:
+        _digest_memo[memo_key] = digest.hexdigest()
+    return digest.hexdigest()
+
+
+class ForecastCache:
+    """
+    Cache LRU hasil prediksi dengan persistensi opsional ke disk.
+
+    Key dibentuk dari window ter-skala, horizon, serta checksum model dan
+    scaler, sehingga mengganti salah satu artefak otomatis membuat entri
+    lama tidak terpakai. Jika path diberikan, entri baru dikumpulkan lalu
+    ditulis paling sering sekali per flush_interval detik (dan saat proses
+    berakhir). Penulisan digabung dengan isi file di disk di bawah kunci
+    file, sehingga beberapa proses yang berbagi path tidak saling menimpa
+    entri, lalu file diganti secara atomik.
+    """
+    def __init__(self, max_entries=256, path=None, flush_interval=5.0):
+        self.max_entries = max_entries
+        self.path = path
+        self.flush_interval = flush_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._timer = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            self._entries = self._read()
+            self._evict()
+            atexit.register(self.flush)
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return OrderedDict()
+        try:
+            with open(self.path, 'rb') as f:
+                return OrderedDict(pickle.load(f))
+        except Exception:
+            # File rusak atau format lama: mulai dengan cache kosong
+            return OrderedDict()
+
+    @staticmethod
+    def make_key(window, horizon, model_digest, scaler_digest):
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(window, dtype=np.float32).tobytes())
+        digest.update(f"|{int(horizon)}|{model_digest}|{scaler_digest}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.cache_lookup('forecast', value is not None)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+            if not self.path:
+                return
+            self._dirty = True
+            if self.flush_interval > 0:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.flush_interval, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def flush(self):
+        """Menulis entri yang belum tersimpan ke disk, digabung dengan isi file saat ini"""
+        with self._flush_lock:
+            with self._lock:
+                self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                entries = list(self._entries.items())
+            self._persist(entries, merge=True)
+
+    def _persist(self, entries, merge):
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with file_lock(f"{self.path}.lock"):
+                if merge:
+                    # Entri proses lain tetap ada; entri proses ini dianggap paling baru
+                    merged = self._read()
+                    for key, value in entries:
+                        merged[key] = value
+                        merged.move_to_end(key)
+                    while len(merged) > self.max_entries:
+                        merged.popitem(last=False)
+                    entries = list(merged.items())
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.path)
+        except OSError:
+            # Persistensi bersifat opsional; cache di memori tetap berjalan
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self):
+        with self._flush_lock:
+            with self._lock:
+                self._entries.clear()
+                self._dirty = False
+            if self.path:
+                self._persist([], merge=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'persistent': bool(self.path),
+            }
@@ -0,0 +1,201 @@
+"""
+CLI prediksi batch tanpa Streamlit.
+
+Memprediksi setiap file CSV dalam sebuah direktori secara paralel di
+process pool dan menulis hasil harian serta tahunan ke direktori output.
+Beberapa kolom aset dapat diprediksi sekaligus (--value-column GLD,SLV
+atau all): setiap kolom di-skala dengan scaler-nya sendiri dari
+scalers.npz, kolom satu file dimajukan bersama dalam satu rollout
+berbatch, dan jika file lebih sedikit dari worker, kolomnya dibagi ke
+beberapa worker agar semua core terpakai.
+
+Contoh:
+    python forecast_cli.py data/ hasil/ --date-column Date --value-column GLD --days 30
+    python forecast_cli.py data/ hasil/ --value-column all --scalers scalers.npz
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import forecast_core
+from scaler_registry import load_registry
+
+# State per proses worker, diisi oleh _init_worker
+_worker = {}
+
+
+def _init_worker(model_path, scaler_path, scalers_path, num_threads):
+    from interpreter_pool import create_interpreter
+    _worker['model'] = create_interpreter(model_path, num_threads=num_threads)
+    _worker['registry'] = load_registry(scalers_path, scaler_path)
+
+
+def _output_stem(csv_path, column, multiple):
+    if not multiple:
+        return csv_path.stem
+    # Nama kolom seperti EUR/USD tidak boleh dipakai langsung sebagai nama file
+    return f"{csv_path.stem}_{''.join(c if c.isalnum() else '_' for c in column)}"
+
+
+def forecast_file(csv_path, output_dir, date_column, value_columns, days_to_predict, multiple=False):
+    """
+    Memprediksi kolom-kolom satu file CSV dalam satu rollout berbatch dan
+    menulis <nama>[_<kolom>]_daily.csv dan <nama>[_<kolom>]_yearly.csv
+    Args:
+        value_columns: Nama kolom aset yang diprediksi
+        multiple: Sertakan nama kolom di nama file output
+    Returns:
+        dict: Ringkasan hasil untuk file (dan kolom) tersebut
+    """
+    start = time.perf_counter()
+    csv_path = Path(csv_path)
+    df = pd.read_csv(csv_path)
+
+    for column in (date_column, *value_columns):
+        if column not in df.columns:
+            raise ValueError(f"Kolom {column} tidak ditemukan di {csv_path.name}")
+
+    for column in value_columns:
+        is_valid, error_message = forecast_core.validate_data(df, date_column, column)
+        if not is_valid:
+            raise ValueError(f"{column}: {error_message}")
+
+    df[date_column] = pd.to_datetime(df[date_column])
+    df = df.sort_values(by=date_column)
+
+    # Kolom yang tidak ada di registry di-fit dari data file itu sendiri
+    histories, scalers = [], []
+    for column in value_columns:
+        data, _ = forecast_core.prepare_prediction_data(df, column, date_column)
+        histories.append(data)
+        scalers.append(_worker['registry'].scaler_for(column, data))
+    windows = np.stack([forecast_core.preprocess_data(data, scaler) for data, scaler in zip(histories, scalers)])
+    predictions, future_dates = forecast_core.predict_future_assets(_worker['model'], windows, scalers,
+                                                                    days_to_predict)
+
+    outputs = []
+    for column, data, column_predictions in zip(value_columns, histories, predictions):
+        column_predictions = column_predictions.tolist()
+        yearly_predictions, years = forecast_core.calculate_yearly_predictions(column_predictions, data[-1][0])
+        df_daily, df_yearly = forecast_core.format_prediction_results(column_predictions, future_dates,
+                                                                      yearly_predictions, years)
+        stem = _output_stem(csv_path, column, multiple)
+        daily_path = Path(output_dir) / f"{stem}_daily.csv"
+        yearly_path = Path(output_dir) / f"{stem}_yearly.csv"
+        df_daily.to_csv(daily_path, index=False)
+        df_yearly.to_csv(yearly_path, index=False)
+        outputs.append({'column': column, 'daily': daily_path.name, 'yearly': yearly_path.name})
+
+    return {
+        'file': csv_path.name,
+        'status': 'ok',
+        'rows': len(df),
+        'columns': outputs,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _forecast_file_safe(*args):
+    try:
+        return forecast_file(*args)
+    except Exception as e:
+        return {'file': Path(args[0]).name, 'columns': [{'column': c} for c in args[3]],
+                'status': 'error', 'error': str(e)}
+
+
+def resolve_columns(csv_path, date_column, value_column):
+    """Daftar kolom aset dari --value-column (nama, daftar dipisah koma, atau all)"""
+    if value_column != 'all':
+        return [c.strip() for c in value_column.split(',') if c.strip()]
+    header = pd.read_csv(csv_path, nrows=100)
+    return [c for c in header.select_dtypes(include=[np.number]).columns if c != date_column]
+
+
+def plan_tasks(files, date_column, value_column, workers):
+    """
+    Pembagian (file, kolom) ke task: satu task per file, atau kolom satu file
+    dipecah ke beberapa task jika jumlah file lebih sedikit dari worker
+    """
+    tasks = []
+    groups = max(1, workers // len(files))
+    for path in files:
+        columns = resolve_columns(path, date_column, value_column)
+        for group in np.array_split(np.array(columns, dtype=object), min(groups, len(columns)) or 1):
+            if len(group):
+                tasks.append((path, list(group)))
+    return tasks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prediksi harga emas untuk seluruh CSV dalam direktori")
+    parser.add_argument('input_dir', help='Direktori berisi file CSV')
+    parser.add_argument('output_dir', help='Direktori untuk hasil prediksi')
+    parser.add_argument('--date-column', default='Date')
+    parser.add_argument('--value-column', default='GLD',
+                        help='Kolom aset: satu nama, beberapa dipisah koma, atau all (semua kolom numerik)')
+    parser.add_argument('--days', type=int, default=30, help='Jumlah hari prediksi')
+    parser.add_argument('--pattern', default='*.csv')
+    parser.add_argument('--model', default='model.tflite')
+    parser.add_argument('--scaler', default='scaler.pkl', help='Scaler lama (GLD), jika GLD tidak ada di --scalers')
+    parser.add_argument('--scalers', default='scalers.npz',
+                        help='Registry scaler per kolom; kolom yang tidak terdaftar di-fit dari file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--num-threads', type=int, default=1, help='Thread TFLite per worker')
+    args = parser.parse_args(argv)
+
+    files = sorted(Path(args.input_dir).glob(args.pattern))
+    if not files:
+        print(f"Tidak ada file {args.pattern} di {args.input_dir}", file=sys.stderr)
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    multiple = args.value_column == 'all' or ',' in args.value_column
+    tasks = plan_tasks(files, args.date_column, args.value_column, args.workers)
+    scaler_path = args.scaler if os.path.exists(args.scaler) else None
+    scalers_path = args.scalers if args.scalers and os.path.exists(args.scalers) else None
+    results = []
+    # spawn: TensorFlow tidak aman di-fork setelah diinisialisasi
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(tasks)),
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker,
+                             initargs=(args.model, scaler_path, scalers_path, args.num_threads)) as executor:
+        futures = [executor.submit(_forecast_file_safe, str(path), args.output_dir,
+                                   args.date_column, columns, args.days, multiple)
+                   for path, columns in tasks]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            columns = ', '.join(c['column'] for c in result['columns'])
+            if result['status'] == 'ok':
+                print(f"✓ {result['file']} [{columns}] ({result['seconds']:.2f}s)")
+            else:
+                print(f"✗ {result['file']} [{columns}]: {result['error']}", file=sys.stderr)
+
+    results.sort(key=lambda r: (r['file'], r['columns'][0]['column'] if r['columns'] else ''))
+    failed = sum(r['status'] != 'ok' for r in results)
+    summary = {
+        'files': len(files),
+        'tasks': len(results),
+        'failed': failed,
+        'days': args.days,
+        'seconds': time.perf_counter() - start,
+        'results': results,
+    }
+    with open(Path(args.output_dir) / 'summary.json', 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"{len(results) - failed}/{len(results)} task berhasil ({len(files)} file) dalam {summary['seconds']:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
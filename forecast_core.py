@@ -0,0 +1,336 @@
+"""
+Logika inti prediksi harga emas tanpa ketergantungan UI.
+
+Modul ini dipakai oleh aplikasi Streamlit (gold_prediction.py) maupun
+CLI batch (forecast_cli.py). Kegagalan dilaporkan lewat exception;
+pemanggil yang memutuskan cara menampilkannya.
+"""
+import pickle
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from rollout import RolloutEngine, RolloutError
+from upload_validation import validate_frame
+
+SEQUENCE_LENGTH = 60
+
+# Persentil pita ketidakpastian Monte Carlo
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+NOISE_DISTRIBUTIONS = ('residual', 'normal', 't')
+
+
+def load_scaler_file(path='scaler.pkl'):
+    """Memuat scaler yang sudah di-fit dari file pickle"""
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def load_series(csv_path, value_column, date_column='Date'):
+    """
+    Kolom nilai dari CSV, diurutkan menurut tanggal, tanpa baris kosong
+    Returns:
+        tuple: (values float64, dates)
+    """
+    df = pd.read_csv(csv_path, usecols=[date_column, value_column])
+    df[date_column] = pd.to_datetime(df[date_column])
+    df[value_column] = pd.to_numeric(df[value_column], errors='coerce')
+    df = df.dropna().sort_values(date_column, kind='stable')
+    return df[value_column].to_numpy(dtype=np.float64), df[date_column].to_numpy()
+
+
+def validate_data(df, date_column, value_column):
+    """
+    Memvalidasi data yang diupload tanpa mengubah DataFrame asli
+    Args:
+        df: DataFrame yang akan divalidasi
+        date_column: Nama kolom tanggal
+        value_column: Nama kolom nilai
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    try:
+        report = validate_frame(df, date_column, value_column, min_rows=SEQUENCE_LENGTH)
+        return report.is_valid, report.first_error()
+    except Exception as e:
+        return False, f"Error validasi data: {str(e)}"
+
+
+def prepare_prediction_data(df, value_column, date_column=None):
+    """
+    Mengambil kolom nilai (N, 1) dan tanggal dari DataFrame
+    Returns:
+        tuple: (data, dates)
+    """
+    # Ambil hanya data numerik dari kolom nilai
+    data = pd.to_numeric(df[value_column]).values.reshape(-1, 1)
+
+    if date_column:
+        dates = pd.to_datetime(df[date_column]).values
+    else:
+        dates = range(len(data))
+
+    return data, dates
+
+
+def preprocess_data(data, scaler, sequence_length=SEQUENCE_LENGTH):
+    """
+    Men-skala data dan mengambil sequence terakhir sebagai input model
+    Raises:
+        ValueError: Jika data kurang dari sequence_length
+    """
+    if len(data) < sequence_length:
+        raise ValueError(f"Data terlalu sedikit. Minimal {sequence_length} data point diperlukan.")
+
+    scaled_data = scaler.transform(data)
+    # Hanya ambil sequence terakhir untuk prediksi
+    return scaled_data[-sequence_length:].reshape(sequence_length, 1)
+
+
+def make_future_dates(start_date, days):
+    """Tanggal kalender untuk setiap hari prediksi setelah start_date"""
+    return [start_date + timedelta(days=i+1) for i in range(days)]
+
+
+def iter_predict_future(model, data, scaler, days_to_predict=30):
+    """
+    Prediksi autoregresif satu series sebagai generator
+    Args:
+        model: Interpreter TFLite
+        data: Sequence ter-skala berbentuk (60, 1)
+        scaler: Scaler untuk inverse transform
+        days_to_predict: Jumlah hari prediksi
+    Yields:
+        float: Prediksi harga satu hari, segera setelah langkahnya selesai
+    Raises:
+        ValueError: Jika bentuk data tidak sesuai
+        RolloutError: Jika salah satu langkah gagal (partial dalam skala model)
+    """
+    if data.shape != (SEQUENCE_LENGTH, 1):
+        raise ValueError(f"Format data tidak sesuai. Dibutuhkan ({SEQUENCE_LENGTH}, 1) tetapi mendapat {data.shape}")
+
+    for values in RolloutEngine(model).iter_batch(data.reshape(1, -1), days_to_predict):
+        yield float(inverse_predictions(scaler, values)[0])
+
+
+def predict_future(model, data, scaler, days_to_predict=30, start_date=None):
+    """
+    Prediksi autoregresif satu series
+    Args:
+        model: Interpreter TFLite
+        data: Sequence ter-skala berbentuk (60, 1)
+        scaler: Scaler untuk inverse transform
+        days_to_predict: Jumlah hari prediksi
+        start_date: Tanggal acuan (default: sekarang)
+    Returns:
+        tuple: (predictions, future_dates)
+    Raises:
+        ValueError: Jika bentuk data tidak sesuai
+        RolloutError: Jika salah satu langkah gagal; atribut predictions dan
+            future_dates berisi hasil parsial dalam satuan harga
+    """
+    if data.shape != (SEQUENCE_LENGTH, 1):
+        raise ValueError(f"Format data tidak sesuai. Dibutuhkan ({SEQUENCE_LENGTH}, 1) tetapi mendapat {data.shape}")
+
+    start_date = start_date or datetime.now()
+
+    # Rollout berjalan di ruang ter-skala, inverse transform hanya sekali di akhir
+    try:
+        scaled_predictions = RolloutEngine(model).run(data, days_to_predict)
+    except RolloutError as e:
+        e.predictions = inverse_predictions(scaler, e.partial).tolist()
+        e.future_dates = make_future_dates(start_date, len(e.predictions))
+        raise
+
+    predictions = inverse_predictions(scaler, scaled_predictions).tolist()
+    return predictions, make_future_dates(start_date, len(predictions))
+
+
+def predict_future_batch(model, windows, scaler, days_to_predict=30, start_date=None):
+    """
+    Prediksi beberapa series sekaligus, satu invoke per langkah untuk seluruh batch
+    Args:
+        model: Interpreter TFLite
+        windows: Window ter-skala berbentuk (N, 60, 1)
+        scaler: Scaler untuk inverse transform
+        days_to_predict: Jumlah hari prediksi
+        start_date: Tanggal acuan (default: sekarang)
+    Returns:
+        tuple: (prediksi berbentuk (N, days_to_predict), tanggal prediksi)
+    """
+    windows = np.asarray(windows)
+    if windows.ndim != 3 or windows.shape[1:] != (SEQUENCE_LENGTH, 1):
+        raise ValueError(f"Format data tidak sesuai. Dibutuhkan (N, {SEQUENCE_LENGTH}, 1) tetapi mendapat {windows.shape}")
+
+    start_date = start_date or datetime.now()
+    scaled_predictions = RolloutEngine(model).run_batch(windows, days_to_predict)
+    return inverse_predictions(scaler, scaled_predictions), make_future_dates(start_date, days_to_predict)
+
+
+def predict_future_assets(model, windows, scalers, days_to_predict=30, start_date=None):
+    """
+    Prediksi beberapa aset sekaligus dalam satu rollout berbatch; setiap
+    aset di-skala dan di-inverse dengan scaler kolomnya sendiri
+    Args:
+        model: Interpreter TFLite
+        windows: Window berbentuk (N, 60, 1), baris ke-i di-skala dengan scalers[i]
+        scalers: N scaler per aset (mis. dari ScalerRegistry)
+    Returns:
+        tuple: (prediksi berbentuk (N, days_to_predict), tanggal prediksi)
+    """
+    windows = np.asarray(windows)
+    if len(windows) != len(scalers):
+        raise ValueError(f"Jumlah window ({len(windows)}) dan scaler ({len(scalers)}) tidak sama")
+    start_date = start_date or datetime.now()
+    scaled_predictions = RolloutEngine(model).run_batch(windows, days_to_predict)
+    predictions = np.stack([inverse_predictions(scaler, row) for scaler, row in zip(scalers, scaled_predictions)])
+    return predictions, make_future_dates(start_date, days_to_predict)
+
+
+def one_step_residuals(model, scaled_series, max_windows=500):
+    """
+    Residual prediksi satu langkah (aktual - prediksi, ruang ter-skala)
+    pada window terakhir histori, dalam satu rollout berbatch
+    Args:
+        model: Interpreter TFLite
+        scaled_series: Histori ter-skala (n,) atau (n, 1), n > SEQUENCE_LENGTH
+        max_windows: Jumlah window terbaru yang dievaluasi
+    """
+    scaled = np.asarray(scaled_series, dtype=np.float32).ravel()
+    if len(scaled) <= SEQUENCE_LENGTH:
+        raise ValueError(f"Data terlalu sedikit. Minimal {SEQUENCE_LENGTH + 1} data point diperlukan "
+                         f"untuk menghitung residual.")
+    windows = sliding_window_view(scaled[:-1], SEQUENCE_LENGTH)[-max_windows:]
+    targets = scaled[-len(windows):]
+    predicted = RolloutEngine(model).run_batch(windows[..., None], 1)[:, 0]
+    return targets - predicted
+
+
+def sample_noise(rng, shape, residuals, distribution='residual', noise_scale=1.0):
+    """
+    Gangguan ter-skala untuk simulasi Monte Carlo
+    Args:
+        rng: np.random.Generator
+        shape: (paths, days)
+        residuals: Residual satu langkah historis (acuan sebaran)
+        distribution: 'residual' (bootstrap residual historis), 'normal' atau
+            't' (Student-t df=4) dengan simpangan baku residual
+        noise_scale: Pengali simpangan gangguan
+    """
+    residuals = np.asarray(residuals, dtype=np.float64)
+    # Bias model sudah ada di jalur deterministik; pita hanya mewakili sebaran
+    centered = residuals - residuals.mean()
+    std = centered.std()
+    if distribution == 'residual':
+        noise = rng.choice(centered, size=shape)
+    elif distribution == 'normal':
+        noise = rng.normal(0.0, std, size=shape)
+    elif distribution == 't':
+        df = 4
+        noise = rng.standard_t(df, size=shape) * std * np.sqrt((df - 2) / df)
+    else:
+        raise ValueError(f"Distribusi gangguan '{distribution}' tidak dikenal. "
+                         f"Pilihan: {', '.join(NOISE_DISTRIBUTIONS)}")
+    return noise * noise_scale
+
+
+def predict_future_bands(model, data, scaler, days_to_predict=30, paths=1000, residuals=None,
+                         distribution='residual', noise_scale=1.0, seed=0,
+                         percentiles=BAND_PERCENTILES):
+    """
+    Pita ketidakpastian dari K jalur Monte Carlo yang dimajukan bersama:
+    setiap langkah rollout adalah satu invoke berbatch K, dan output setiap
+    jalur diberi gangguan sebelum diumpankan kembali.
+    Args:
+        model: Interpreter TFLite
+        data: Sequence ter-skala berbentuk (60, 1)
+        scaler: Scaler untuk inverse transform
+        paths: Jumlah jalur (K)
+        residuals: Residual satu langkah historis (lihat one_step_residuals)
+        seed: Seed generator acak agar hasil dapat diulang
+    Returns:
+        dict: {persentil: np.ndarray (days_to_predict,)} dalam satuan harga
+    """
+    if data.shape != (SEQUENCE_LENGTH, 1):
+        raise ValueError(f"Format data tidak sesuai. Dibutuhkan ({SEQUENCE_LENGTH}, 1) tetapi mendapat {data.shape}")
+    if residuals is None or len(residuals) == 0:
+        raise ValueError("Residual historis dibutuhkan untuk menentukan sebaran gangguan")
+
+    rng = np.random.default_rng(seed)
+    noise = sample_noise(rng, (paths, days_to_predict), residuals, distribution, noise_scale)
+    windows = np.broadcast_to(data.reshape(1, SEQUENCE_LENGTH, 1), (paths, SEQUENCE_LENGTH, 1))
+    simulated = inverse_predictions(scaler, RolloutEngine(model).run_batch(windows, days_to_predict, noise))
+    bands = np.percentile(simulated, percentiles, axis=0)
+    return dict(zip(percentiles, bands))
+
+
+def inverse_predictions(scaler, scaled_predictions):
+    """Inverse transform prediksi ter-skala dengan bentuk apa pun dalam satu panggilan"""
+    scaled_predictions = np.asarray(scaled_predictions, dtype=np.float64)
+    return scaler.inverse_transform(scaled_predictions.reshape(-1, 1)).reshape(scaled_predictions.shape)
+
+
+def calculate_yearly_predictions(daily_predictions, start_value=None):
+    """
+    Menghitung prediksi tahunan berdasarkan tren harian dengan pembatasan pertumbuhan
+    """
+    # Menggunakan nilai terakhir prediksi harian sebagai dasar
+    current_value = daily_predictions[-1]
+
+    yearly_predictions = []
+    current_year = datetime.now().year
+    years = []
+
+    # Hitung rata-rata perubahan harian
+    daily_changes = [(daily_predictions[i] - daily_predictions[i-1])/daily_predictions[i-1]
+                     for i in range(1, len(daily_predictions))]
+    # Horizon 1 hari tidak memiliki perubahan harian, anggap datar
+    avg_daily_change = np.mean(daily_changes) if daily_changes else 0.0
+
+    # Batasi perubahan harian rata-rata ke maksimum 0.5%
+    avg_daily_change = np.clip(avg_daily_change, -0.005, 0.005)
+
+    # Konversi ke perubahan tahunan (252 hari trading)
+    # Menggunakan compound growth yang lebih moderat
+    yearly_growth_rate = (1 + avg_daily_change) ** 252 - 1
+
+    # Batasi pertumbuhan tahunan maksimum ke 20%
+    yearly_growth_rate = np.clip(yearly_growth_rate, -0.20, 0.20)
+
+    # Prediksi 5 tahun ke depan dengan pertumbuhan yang lebih realistis
+    for i in range(5):
+        yearly_predictions.append(float(current_value))
+        years.append(current_year + i + 1)
+
+        # Terapkan pertumbuhan dengan faktor penurunan untuk tahun-tahun berikutnya
+        growth_factor = 1.0 / (i + 1)
+        adjusted_growth = yearly_growth_rate * growth_factor
+        current_value = current_value * (1 + adjusted_growth)
+
+    return yearly_predictions, years
+
+
+def format_prediction_results(predictions, future_dates, yearly_predictions, years):
+    """
+    Memformat hasil prediksi menjadi tabel harian dan tahunan
+    """
+    # Format prediksi harian
+    df_daily = pd.DataFrame({
+        'Tanggal': [d.strftime('%Y-%m-%d') for d in future_dates],
+        'Prediksi (USD)': predictions,
+        'Perubahan (USD)': [0] + [predictions[i] - predictions[i-1] for i in range(1, len(predictions))],
+        'Perubahan (%)': [0] + [(predictions[i] - predictions[i-1])/predictions[i-1]*100 for i in range(1, len(predictions))]
+    })
+
+    # Format prediksi tahunan
+    df_yearly = pd.DataFrame({
+        'Tahun': years,
+        'Prediksi (USD)': yearly_predictions,
+        'Perubahan (USD)': [0] + [yearly_predictions[i] - yearly_predictions[i-1] for i in range(1, len(yearly_predictions))],
+        'Perubahan (%)': ['Base'] + [f"{((yearly_predictions[i] - yearly_predictions[i-1])/yearly_predictions[i-1]*100):.2f}%"
+                                    for i in range(1, len(yearly_predictions))]
+    })
+
+    return df_daily, df_yearly
@@ -0,0 +1,209 @@
+"""
+Eksekutor job prediksi di latar belakang.
+
+Rollout tidak lagi berjalan di thread script Streamlit: submit()
+mengembalikan ForecastJob segera, lalu worker bersama meminjam satu
+interpreter dari pool dan menjalankan rollout sebagai generator. Setiap
+hari prediksi ditambahkan ke job begitu selesai, sehingga UI dapat
+menampilkan tabel dan grafik yang terisi bertahap. Job dapat dibatalkan;
+worker berhenti setelah langkah yang sedang berjalan dan interpreter
+langsung kembali ke pool.
+
+stats() melaporkan kedalaman antrean, job yang berjalan serta waktu
+tunggu dan durasi job terakhir sebagai dasar menentukan jumlah worker
+(GOLD_FORECAST_WORKERS).
+"""
+import contextvars
+import itertools
+import math
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import forecast_core
+import metrics
+from rollout import RolloutError
+
+QUEUED, RUNNING, DONE, CANCELLED, FAILED = 'queued', 'running', 'done', 'cancelled', 'failed'
+
+
+class ForecastJob:
+    """
+    Handle satu job prediksi
+    Attributes:
+        id: Nomor job
+        key: Key input job (dipakai pemanggil untuk mengenali job yang sama)
+        days: Jumlah hari yang diminta
+        status: queued, running, done, cancelled atau failed
+        error: Pesan error jika status failed
+    """
+    def __init__(self, job_id, key, days):
+        self.id = job_id
+        self.key = key
+        self.days = days
+        self.status = QUEUED
+        self.error = None
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self._predictions = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    def predictions(self):
+        """Salinan prediksi yang sudah selesai sejauh ini"""
+        with self._lock:
+            return list(self._predictions)
+
+    def progress(self):
+        with self._lock:
+            return len(self._predictions) / self.days if self.days else 1.0
+
+    def cancel(self):
+        """Meminta job berhenti; job yang belum mulai tidak akan dijalankan"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Menunggu job selesai; True jika sudah selesai"""
+        return self._done.wait(timeout)
+
+    @property
+    def queue_wait(self):
+        """Detik di antrean sampai worker mendapat interpreter untuk job ini"""
+        end = self.started or self.finished or time.perf_counter()
+        return end - self.submitted
+
+    @property
+    def runtime(self):
+        """Detik sejak rollout job dimulai"""
+        if self.started is None:
+            return 0.0
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def _append(self, value):
+        with self._lock:
+            self._predictions.append(value)
+
+
+class ForecastExecutor:
+    """
+    Worker bersama untuk job prediksi
+    Args:
+        workers: Jumlah worker (default: jumlah CPU); rollout paralel tetap
+            dibatasi oleh ukuran pool interpreter masing-masing job
+        history: Jumlah job selesai yang disimpan untuk statistik durasi
+    """
+    def __init__(self, workers=None, history=256):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='forecast-job')
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._counts = {DONE: 0, CANCELLED: 0, FAILED: 0}
+        self._runtimes = deque(maxlen=history)
+        self._queue_waits = deque(maxlen=history)
+
+    @classmethod
+    def from_env(cls):
+        """Jumlah worker dari GOLD_FORECAST_WORKERS"""
+        workers = os.environ.get('GOLD_FORECAST_WORKERS')
+        return cls(workers=int(workers) if workers else None)
+
+    def submit(self, pool, data, scaler, days_to_predict, key=None, on_done=None):
+        """
+        Menjadwalkan rollout satu series
+        Args:
+            pool: InterpreterPool tempat interpreter dipinjam
+            data: Sequence ter-skala berbentuk (60, 1)
+            scaler: Scaler untuk inverse transform
+            days_to_predict: Jumlah hari prediksi
+            key: Key input, disimpan di job
+            on_done: Fungsi on_done(predictions) yang dipanggil di worker jika
+                job selesai lengkap (mis. untuk mengisi cache)
+        Returns:
+            ForecastJob
+        """
+        job = ForecastJob(next(self._ids), key, days_to_predict)
+        with self._lock:
+            self._queued += 1
+        # Context disalin agar metrik worker ikut tercatat di registry sesi pemanggil
+        self._executor.submit(contextvars.copy_context().run, self._run, job, pool, data, scaler, on_done)
+        return job
+
+    def _run(self, job, pool, data, scaler, on_done):
+        try:
+            if not job.cancelled:
+                # Job tetap dihitung di antrean sampai mendapat interpreter dari pool
+                with pool.checkout() as model:
+                    self._start(job)
+                    for value in forecast_core.iter_predict_future(model, data, scaler, job.days):
+                        job._append(value)
+                        if job.cancelled:
+                            break
+            job.status = CANCELLED if job.cancelled else DONE
+        except RolloutError as e:
+            # Hari-hari sebelum langkah yang gagal tetap tersedia lewat predictions()
+            job.status, job.error = FAILED, str(e)
+        except Exception as e:
+            job.status, job.error = FAILED, f"Error dalam prediksi: {str(e)}"
+        job.finished = time.perf_counter()
+
+        if job.status == DONE and on_done is not None:
+            try:
+                on_done(job.predictions())
+            except Exception:
+                pass
+        with self._lock:
+            if job.started is None:
+                self._queued -= 1
+            else:
+                self._running -= 1
+                self._runtimes.append(job.runtime)
+            self._counts[job.status] += 1
+            self._queue_waits.append(job.queue_wait)
+        metrics.observe(metrics.STAGE_METRIC, job.queue_wait, stage='queue_wait')
+        if job.started is not None:
+            metrics.observe(metrics.STAGE_METRIC, job.runtime, stage='rollout')
+        job._done.set()
+
+    def _start(self, job):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        job.started = time.perf_counter()
+        job.status = RUNNING
+
+    def stats(self):
+        """Kedalaman antrean, job berjalan, dan durasi job terakhir"""
+        with self._lock:
+            runtimes = sorted(self._runtimes)
+            queue_waits = list(self._queue_waits)
+            return {
+                'workers': self.workers,
+                'queued': self._queued,
+                'running': self._running,
+                'done': self._counts[DONE],
+                'cancelled': self._counts[CANCELLED],
+                'failed': self._counts[FAILED],
+                'runtime_p50_s': statistics.median(runtimes) if runtimes else 0.0,
+                'runtime_p95_s': runtimes[math.ceil(0.95 * len(runtimes)) - 1] if runtimes else 0.0,
+                'runtime_max_s': runtimes[-1] if runtimes else 0.0,
+                'queue_wait_mean_s': statistics.fmean(queue_waits) if queue_waits else 0.0,
+                'queue_wait_max_s': max(queue_waits) if queue_waits else 0.0,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
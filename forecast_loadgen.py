@@ -0,0 +1,119 @@
+"""
+Load generator lokal untuk forecast_server.py.
+
+Membuka sejumlah koneksi keep-alive dan mengirim window harga acak dari
+gld_price_data.csv, lalu melaporkan throughput dan latensi p50/p90/p99.
+
+Contoh:
+    python forecast_server.py --port 8080 &
+    python forecast_loadgen.py --port 8080 --concurrency 64 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+
+async def _request(reader, writer, host, method, path, body=b''):
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\n"
+        f"Host: {host}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value.strip())
+    return status, await reader.readexactly(length)
+
+
+async def _client(args, prices, deadline, latencies, errors, rng):
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    try:
+        while time.perf_counter() < deadline:
+            start = rng.integers(0, len(prices) - args.window)
+            body = json.dumps({
+                'prices': prices[start:start + args.window].tolist(),
+                'horizon': int(rng.integers(1, args.horizon + 1)) if args.random_horizon else args.horizon,
+            }).encode('utf-8')
+
+            sent = time.perf_counter()
+            status, _ = await _request(reader, writer, args.host, 'POST', '/forecast', body)
+            if status == 200:
+                latencies.append(time.perf_counter() - sent)
+            else:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    prices = pd.read_csv(args.csv)[args.column].to_numpy(dtype=np.float64)
+    latencies, errors = [], []
+
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*[
+        _client(args, prices, deadline, latencies, errors, np.random.default_rng(seed))
+        for seed in range(args.concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    _, stats = await _request(reader, writer, args.host, 'GET', '/stats')
+    writer.close()
+
+    latencies_ms = np.array(latencies) * 1000
+    report = {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': elapsed,
+        'throughput_rps': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies_ms, 50)) if len(latencies_ms) else None,
+        'p90_ms': float(np.percentile(latencies_ms, 90)) if len(latencies_ms) else None,
+        'p99_ms': float(np.percentile(latencies_ms, 99)) if len(latencies_ms) else None,
+        'server': json.loads(stats),
+    }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator untuk layanan prediksi")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--csv', default='gld_price_data.csv')
+    parser.add_argument('--column', default='GLD')
+    parser.add_argument('--window', type=int, default=60, help='Jumlah harga per request')
+    parser.add_argument('--horizon', type=int, default=30)
+    parser.add_argument('--random-horizon', action='store_true', help='Horizon acak 1..horizon')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0, help='Durasi uji dalam detik')
+    parser.add_argument('--json', help='Simpan laporan ke file JSON')
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print(f"Request: {report['requests']} (error: {report['errors']}) dalam {report['seconds']:.1f}s")
+    print(f"Throughput: {report['throughput_rps']:.1f} req/s")
+    if report['requests']:
+        print(f"Latensi p50/p90/p99: {report['p50_ms']:.1f} / {report['p90_ms']:.1f} / {report['p99_ms']:.1f} ms")
+    print(f"Rata-rata ukuran batch server: {report['server']['mean_batch_size']:.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+"""
+Layanan HTTP prediksi harga emas dengan micro-batching.
+
+Request yang datang dalam beberapa milidetik dikumpulkan dan dijalankan
+sebagai satu rollout berbatch (satu invoke TFLite per langkah untuk semua
+request). Hanya memakai asyncio dari standard library.
+
+Endpoint:
+    POST /forecast   JSON {"prices": [...], "horizon": 30, "column": "GLD"}
+                     atau CSV (Content-Type: text/csv) dengan query
+                     ?value_column=GLD&date_column=Date&horizon=30
+
+Setiap request di-skala dengan scaler kolomnya sendiri dari scalers.npz
+(column di JSON, default GLD; value_column untuk CSV). Kolom yang tidak
+terdaftar di-fit dari harga di request itu. Rollout berbatch berjalan di
+ruang ter-skala, jadi request dengan kolom berbeda tetap satu batch.
+    GET  /health
+    GET  /stats
+    GET  /metrics    format teks Prometheus (lihat metrics.py)
+
+Contoh:
+    python forecast_server.py --port 8080 --model model.tflite --scalers scalers.npz
+"""
+import argparse
+import asyncio
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import forecast_core
+import metrics
+from rollout import RolloutEngine
+from scaler_registry import load_registry
+
+MAX_HORIZON = 90
+MAX_BODY_BYTES = 50 * 1024 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class MicroBatcher:
+    """
+    Mengumpulkan window yang masuk dalam max_wait_ms lalu menjalankannya
+    sebagai satu rollout berbatch pada interpreter pinjaman dari pool.
+    Horizon tiap request boleh berbeda; batch dijalankan sampai horizon
+    terpanjang lalu dipotong per request.
+    """
+    def __init__(self, pool, max_batch=64, max_wait_ms=5.0):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix='rollout')
+        self._tasks = set()
+        self.batches = 0
+        self.requests = 0
+        self.max_batch_seen = 0
+
+    async def submit(self, window, horizon):
+        """Mengembalikan prediksi ter-skala berbentuk (horizon,)"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((window, horizon, future))
+        return await future
+
+    async def run(self):
+        while True:
+            batch = [await self._queue.get()]
+            # Beri kesempatan request lain yang datang hampir bersamaan untuk ikut
+            await asyncio.sleep(self.max_wait)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch):
+        windows = np.stack([window for window, _, _ in batch])
+        steps = max(horizon for _, horizon, _ in batch)
+        self.batches += 1
+        self.requests += len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+        loop = asyncio.get_running_loop()
+        try:
+            outputs = await loop.run_in_executor(self._executor, self._rollout, windows, steps)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for i, (_, horizon, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(outputs[i, :horizon])
+
+    def _rollout(self, windows, steps):
+        with self.pool.checkout() as interpreter:
+            return RolloutEngine(interpreter).run_batch(windows, steps)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'requests': self.requests,
+            'mean_batch_size': self.requests / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_batch_seen,
+            'queued': self._queue.qsize(),
+            'pool': self.pool.stats(),
+        }
+
+
+def parse_forecast_request(headers, query, body):
+    """
+    Mengambil deret harga, horizon dan nama kolom dari body JSON atau CSV
+    Returns:
+        tuple: (prices sebagai np.ndarray (N,), horizon, column)
+    Raises:
+        ValueError: Jika request tidak valid
+    """
+    content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+
+    if content_type in ('text/csv', 'application/csv'):
+        value_column = query.get('value_column')
+        if not value_column:
+            raise ValueError("Parameter value_column wajib untuk body CSV")
+        date_column = query.get('date_column')
+        horizon = query.get('horizon', 30)
+
+        df = pd.read_csv(io.BytesIO(body))
+        if value_column not in df.columns:
+            raise ValueError(f"Kolom {value_column} tidak ditemukan")
+        if date_column:
+            if date_column not in df.columns:
+                raise ValueError(f"Kolom {date_column} tidak ditemukan")
+            is_valid, error_message = forecast_core.validate_data(df, date_column, value_column)
+            if not is_valid:
+                raise ValueError(error_message)
+            df[date_column] = pd.to_datetime(df[date_column])
+            df = df.sort_values(by=date_column)
+        prices = pd.to_numeric(df[value_column], errors='coerce').to_numpy(dtype=np.float64)
+    else:
+        try:
+            payload = json.loads(body or b'{}')
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON tidak valid: {e}")
+        if not isinstance(payload, dict) or 'prices' not in payload:
+            raise ValueError("Body JSON harus berisi 'prices'")
+        horizon = payload.get('horizon', 30)
+        value_column = payload.get('column', 'GLD')
+        if not isinstance(value_column, str) or not value_column:
+            raise ValueError("'column' harus berupa nama kolom")
+        try:
+            prices = np.asarray(payload['prices'], dtype=np.float64).reshape(-1)
+        except (TypeError, ValueError):
+            raise ValueError("'prices' harus berupa daftar angka")
+
+    try:
+        horizon = int(horizon)
+    except (TypeError, ValueError):
+        raise ValueError("horizon harus berupa bilangan bulat")
+    if not 1 <= horizon <= MAX_HORIZON:
+        raise ValueError(f"horizon harus antara 1 dan {MAX_HORIZON}")
+    if len(prices) < forecast_core.SEQUENCE_LENGTH:
+        raise ValueError(f"Data minimal {forecast_core.SEQUENCE_LENGTH} harga untuk melakukan prediksi")
+    if not np.isfinite(prices).all():
+        raise ValueError("Harga mengandung nilai yang tidak valid")
+    if (prices < 0).any():
+        raise ValueError("Harga tidak boleh negatif")
+    return prices, horizon, value_column
+
+
+class ForecastServer:
+    """
+    Args:
+        pool: InterpreterPool
+        scalers: ScalerRegistry; scaler dipilih per request menurut kolom
+    """
+    def __init__(self, pool, scalers, max_batch=64, max_wait_ms=5.0):
+        self.scalers = scalers
+        self.batcher = MicroBatcher(pool, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        self.started = time.time()
+
+    async def forecast(self, prices, horizon, column='GLD'):
+        scaler = self.scalers.scaler_for(column, prices)
+        window = forecast_core.preprocess_data(prices.reshape(-1, 1), scaler)
+        scaled = await self.batcher.submit(window, horizon)
+
+        predictions = forecast_core.inverse_predictions(scaler, scaled).tolist()
+        future_dates = forecast_core.make_future_dates(datetime.now(), horizon)
+        yearly_predictions, years = forecast_core.calculate_yearly_predictions(predictions, prices[-1])
+        return {
+            'column': column,
+            'horizon': horizon,
+            'daily': [{'date': d.strftime('%Y-%m-%d'), 'prediction': p}
+                      for d, p in zip(future_dates, predictions)],
+            'yearly': [{'year': y, 'prediction': p} for y, p in zip(years, yearly_predictions)],
+        }
+
+    async def dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if url.path == '/health':
+            return 200, {'status': 'ok', 'uptime_s': time.time() - self.started}
+        if url.path == '/stats':
+            return 200, self.batcher.stats()
+        if url.path == '/metrics':
+            return 200, metrics.REGISTRY.render()
+        if url.path != '/forecast':
+            return 404, {'error': f"Path {url.path} tidak ditemukan"}
+        if method != 'POST':
+            return 405, {'error': "Gunakan POST untuk /forecast"}
+
+        try:
+            # Parsing CSV/JSON hingga MAX_BODY_BYTES di thread terpisah agar event loop
+            # (koneksi lain dan jendela pengumpulan MicroBatcher) tidak tertahan
+            prices, horizon, column = await asyncio.get_running_loop().run_in_executor(
+                None, parse_forecast_request, headers, query, body)
+            return 200, await self.forecast(prices, horizon, column)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': f"Error dalam prediksi: {str(e)}"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    status, payload = 400, {'error': "Content-Length tidak valid"}
+                    keep_alive = False
+                elif length > MAX_BODY_BYTES:
+                    status, payload = 413, {'error': "Body terlalu besar"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = await self.dispatch(method.upper(), target, headers, body)
+                    keep_alive = (version.upper() == 'HTTP/1.1' and
+                                  headers.get('connection', '').lower() != 'close')
+
+                if isinstance(payload, str):
+                    data, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+                else:
+                    data, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        batcher_task = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Melayani di http://{host}:{port} (batch maks {self.batcher.max_batch}, "
+              f"jendela {self.batcher.max_wait * 1000:.1f} ms)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan HTTP prediksi harga emas")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--model', default='model.tflite')
+    parser.add_argument('--scaler', default='scaler.pkl', help='Scaler lama (GLD), jika GLD tidak ada di --scalers')
+    parser.add_argument('--scalers', default='scalers.npz', help='Registry scaler per kolom')
+    parser.add_argument('--pool-size', type=int, default=None)
+    parser.add_argument('--num-threads', type=int, default=1)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    from interpreter_pool import InterpreterPool
+    pool = InterpreterPool(args.model, size=args.pool_size, num_threads=args.num_threads)
+    scalers = load_registry(args.scalers, args.scaler)
+    server = ForecastServer(pool, scalers, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,27 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import tensorflow as tf
-import pickle
-import matplotlib.pyplot as plt
-from sklearn.preprocessing import MinMaxScaler
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 
+import forecast_core
+from forecast_cache import ForecastCache, file_digest
+from columnar_cache import ensure_columnar
+from ingest import CsvIngestor
+from interpreter_pool import InterpreterPool, model_variant_path
+from model_registry import ModelManager
+from rollout import RolloutError
+import fingerprint
+import upload_reader
+from upload_validation import validate_stream
+from chart_render import render_chart
+from downsample import DownsamplePyramid
+from running_stats import ensure_stats
+from scaler_registry import REGISTRY_FILE, ScalerRegistry
+from pipeline_state import PipelineState
+from forecast_jobs import CANCELLED, DONE, QUEUED, ForecastExecutor
+import metrics
+
 # Konfigurasi halaman
 st.set_page_config(
     page_title="Gold Price Forecasting",
@@ -35,78 +49,168 @@ def local_css():
 # Konfigurasi cache untuk model dan scaler
 @st.cache_resource
 def load_model():
+    """
+    Memuat pool interpreter bersama. Setiap prediksi meminjam satu
+    interpreter lewat pool.checkout() agar sesi yang berjalan bersamaan
+    tidak saling menimpa tensor. Varian model (float32, float16,
+    int8_dynamic, int8_full) dipilih lewat GOLD_MODEL_VARIANT.
+    """
     try:
-        interpreter = tf.lite.Interpreter(model_path="model.tflite")
-        interpreter.allocate_tensors()
-        return interpreter
+        return InterpreterPool.from_env(model_variant_path())
     except Exception as e:
         st.error(f"Error loading model: {str(e)}")
         return None
 
 @st.cache_resource
-def load_scaler():
+def load_scaler_registry():
+    """
+    Registry scaler per kolom dari scalers.npz. Jika belum ada, dibuat dari
+    min/max statistik historis; scaler.pkl lama (dilatih pada GLD) tetap
+    dipakai untuk kolom GLD agar sesuai dengan model.
+    """
     try:
-        with open('scaler.pkl', 'rb') as f:
-            return pickle.load(f)
+        return ScalerRegistry.load(REGISTRY_FILE)
+    except FileNotFoundError:
+        pass
     except Exception as e:
-        st.warning("Membuat scaler baru...")
-        scaler = MinMaxScaler(feature_range=(0, 1))
-        if os.path.exists('gld_price_data.csv'):
-            df = pd.read_csv('gld_price_data.csv')
-            numeric_columns = df.select_dtypes(include=[np.number]).columns
-            if len(numeric_columns) > 0:
-                data = df[numeric_columns[0]].values.reshape(-1, 1)
-                scaler.fit(data)
-        else:
-            scaler.fit([[0], [1]])
-        with open('scaler.pkl', 'wb') as f:
-            pickle.dump(scaler, f)
-        return scaler
+        st.warning(f"⚠️ {REGISTRY_FILE} tidak dapat dibaca ({str(e)}), membuat ulang dari data historis")
+
+    st.warning("Membuat scaler per kolom... Jalankan train_model.py untuk membuat scalers.npz yang sesuai dengan model.")
+    table = load_history_table()
+    registry = ScalerRegistry.from_stats(load_history_stats(table)) if table is not None else ScalerRegistry()
+    try:
+        legacy = forecast_core.load_scaler_file('scaler.pkl')
+        registry.set('GLD', legacy.data_min_[0], legacy.data_max_[0])
+    except Exception:
+        pass
+    try:
+        registry.save(REGISTRY_FILE)
+    except OSError as e:
+        st.warning(f"⚠️ Gagal menyimpan {REGISTRY_FILE}: {str(e)}")
+    return registry
+
+@st.cache_resource
+def load_model_manager():
+    """
+    Registry model berversi (GOLD_MODEL_REGISTRY, default models/). Thread
+    latar memeriksa versi baru setiap GOLD_MODEL_WATCH_INTERVAL detik dan
+    menukarnya tanpa restart aplikasi.
+    """
+    try:
+        manager = ModelManager.from_env()
+        manager.start_watcher(float(os.environ.get('GOLD_MODEL_WATCH_INTERVAL', 5)))
+        return manager
+    except Exception as e:
+        st.error(f"Error loading model registry: {str(e)}")
+        return None
+
+def select_model_version():
+    """
+    Memilih versi model dari registry. Snapshot yang dikembalikan dipakai
+    sampai akhir run ini, sehingga pergantian versi oleh watcher tidak
+    memengaruhi prediksi yang sedang berjalan. Tanpa registry, model.tflite
+    dan scalers.npz di direktori kerja yang dipakai.
+    Returns:
+        tuple: (pool, scaler_registry)
+    """
+    manager = load_model_manager()
+    versions = manager.versions() if manager is not None else []
+    if not versions:
+        return load_model(), load_scaler_registry()
+
+    latest_label = "Terbaru (otomatis)"
+    choice = st.selectbox("Versi model:", [latest_label] + versions[::-1])
+    try:
+        loaded = manager.current() if choice == latest_label else manager.get(choice)
+    except Exception as e:
+        st.error(f"❌ Gagal memuat model versi {choice}: {str(e)}")
+        return None, None
+    if manager.last_error:
+        st.warning(f"⚠️ Versi terbaru tidak dapat dimuat ({manager.last_error})")
+    if loaded is None:
+        return None, None
+    st.caption(f"🧠 Model versi {loaded.version}")
+    return loaded.pool, loaded.scalers
+
+@st.cache_resource
+def load_ingestor():
+    return CsvIngestor('gld_price_data.csv')
+
+def load_history_table():
+    """
+    Cache kolumnar (ColumnarTable) dari gld_price_data.csv. Hanya baris yang
+    baru ditambahkan sejak pemanggilan sebelumnya yang di-parse, dan kolomnya
+    di-mmap sehingga dibagi antar worker.
+    """
+    if not os.path.exists('gld_price_data.csv'):
+        return None
+    return ensure_columnar(load_ingestor())
+
+def load_history():
+    """
+    Tabel historis ber-tipe dari gld_price_data.csv tanpa salinan data
+    """
+    table = load_history_table()
+    return table.to_frame() if table is not None else None
+
+def load_history_stats(table):
+    """
+    Statistik ringkasan dan korelasi historis (RunningStats). Hanya baris
+    yang belum pernah diproses yang dibaca; state disimpan di store ingest.
+    """
+    return ensure_stats(load_ingestor(), table)
+
+# Anggaran titik grafik historis, kira-kira lebar gambar dalam piksel (10 inci x 150 dpi)
+HISTORY_CHART_POINTS = 1500
+
+@st.cache_resource(max_entries=8)
+def load_history_pyramid(version_dir, column, _dates, _values):
+    """
+    Piramida downsampling untuk satu kolom historis, dibangun sekali per
+    versi cache kolumnar
+    """
+    return DownsamplePyramid(_dates, _values)
+
+@st.cache_resource
+def load_forecast_cache():
+    """
+    Cache prediksi bersama. Persisten ke file GOLD_FORECAST_CACHE
+    (default forecast_cache.pkl, kosongkan untuk menonaktifkan persistensi)
+    dengan ukuran maksimum GOLD_FORECAST_CACHE_SIZE entri, ditulis paling
+    sering setiap GOLD_FORECAST_CACHE_FLUSH detik.
+    """
+    return ForecastCache(
+        max_entries=int(os.environ.get('GOLD_FORECAST_CACHE_SIZE', 256)),
+        path=os.environ.get('GOLD_FORECAST_CACHE', 'forecast_cache.pkl') or None,
+        flush_interval=float(os.environ.get('GOLD_FORECAST_CACHE_FLUSH', 5.0)),
+    )
 
 @st.cache_data
-def preprocess_data(data, _scaler, sequence_length=60):
+@metrics.timed('preprocess')
+def preprocess_data(fingerprint_key, _data, _scaler, sequence_length=60):
     """
     Preprocess data dengan menggunakan scaler yang diberikan
     Args:
-        data: Data yang akan di-preprocess
+        fingerprint_key: Key cache yang mewakili isi data dan scaler
+        _data: Data yang akan di-preprocess (tidak di-hash)
         _scaler: Scaler yang digunakan
         sequence_length: Panjang sequence untuk input model
     """
     try:
-        if len(data) < sequence_length:
-            st.error(f"❌ Data terlalu sedikit. Minimal {sequence_length} data point diperlukan.")
-            return np.array([])
-            
-        scaled_data = _scaler.transform(data)
-        X = []
-        
-        # Hanya ambil sequence terakhir untuk prediksi
-        last_sequence = scaled_data[-sequence_length:].reshape(sequence_length, 1)
-        return last_sequence
-        
+        return forecast_core.preprocess_data(_data, _scaler, sequence_length)
     except Exception as e:
         st.error(f"❌ Error dalam preprocessing data: {str(e)}")
         return np.array([])
 
 @st.cache_data
-def prepare_prediction_data(df, value_column, date_column=None):
+@metrics.timed('prepare')
+def prepare_prediction_data(fingerprint_key, _df, value_column, date_column=None):
     """
-    Menyiapkan data untuk prediksi dengan caching
+    Menyiapkan data untuk prediksi dengan caching, di-key dengan fingerprint
+    upload sehingga DataFrame tidak di-hash ulang di setiap rerun
     """
     try:
-        # Konversi tanggal jika ada
-        if date_column:
-            df[date_column] = pd.to_datetime(df[date_column])
-            
-        # Ambil hanya data numerik dari kolom nilai
-        data = df[value_column].values.reshape(-1, 1)
-        
-        if date_column:
-            dates = df[date_column].values
-        else:
-            dates = range(len(data))
-            
-        return data, dates
+        return forecast_core.prepare_prediction_data(_df, value_column, date_column)
     except Exception as e:
         st.error(f"❌ Error dalam persiapan data: {str(e)}")
         return None, None
@@ -117,435 +221,589 @@ def predict_future(model, data, _scaler, days_to_predict=30):
         return [], []
     
     try:
-        # Pastikan data memiliki dimensi yang benar (60 timesteps)
-        if data.shape != (60, 1):
-            st.error(f"❌ Format data tidak sesuai. Dibutuhkan (60, 1) tetapi mendapat {data.shape}")
-            return [], []
-        
-        predictions = []
-        current_sequence = data.reshape(1, 60, 1)  # Reshape ke format (batch_size, timesteps, features)
-        current_date = datetime.now()
-        future_dates = []
-        
-        # Dapatkan nilai terakhir yang diketahui
-        last_known_value = float(_scaler.inverse_transform(data[-1].reshape(1, -1))[-1][0])
-        
-        for i in range(days_to_predict):
-            try:
-                # Set input tensor
-                input_details = model.get_input_details()
-                model.set_tensor(input_details[0]['index'], current_sequence.astype(np.float32))
-                
-                # Jalankan inferensi
-                model.invoke()
-                
-                # Dapatkan output
-                output_details = model.get_output_details()
-                prediction = model.get_tensor(output_details[0]['index'])
-                prediction_value = float(_scaler.inverse_transform(prediction)[0][0])
-                
-                # Tambahkan hasil prediksi
-                predictions.append(prediction_value)
-                future_dates.append(current_date + timedelta(days=i+1))
-                
-                # Update sequence untuk prediksi berikutnya
-                new_value = _scaler.transform([[prediction_value]])[0]
-                current_sequence = np.append(current_sequence[:, 1:, :], 
-                                          new_value.reshape(1, 1, 1), 
-                                          axis=1)
-                
-            except Exception as e:
-                st.error(f"❌ Error pada prediksi hari ke-{i+1}: {str(e)}")
-                if len(predictions) > 0:
-                    return predictions, future_dates[:len(predictions)]
-                return [], []
-        
-        return predictions, future_dates
-        
+        return forecast_core.predict_future(model, data, _scaler, days_to_predict)
+    except RolloutError as e:
+        # Tampilkan error dan kembalikan hasil parsial jika ada
+        st.error(f"❌ {str(e)}")
+        return e.predictions, e.future_dates
+    except ValueError as e:
+        st.error(f"❌ {str(e)}")
+        return [], []
     except Exception as e:
         st.error(f"❌ Error dalam prediksi: {str(e)}")
         return [], []
 
+def predict_future_batch(model, windows, _scaler, days_to_predict=30):
+    """
+    Prediksi beberapa series sekaligus, satu invoke per langkah untuk seluruh batch
+    Args:
+        model: Interpreter TFLite
+        windows: Window ter-skala berbentuk (N, 60, 1)
+        _scaler: Scaler yang digunakan
+        days_to_predict: Jumlah hari prediksi
+    Returns:
+        tuple: (prediksi berbentuk (N, days_to_predict), tanggal prediksi)
+    """
+    if model is None:
+        st.error("Model tidak dapat dimuat")
+        return np.empty((0, 0)), []
+
+    try:
+        return forecast_core.predict_future_batch(model, windows, _scaler, days_to_predict)
+    except Exception as e:
+        st.error(f"❌ Error dalam prediksi batch: {str(e)}")
+        return np.empty((0, 0)), []
+
+def forecast_cache_key(pool, data, _scaler, days_to_predict=30):
+    """Key cache persisten sekaligus key job untuk satu permintaan prediksi"""
+    return ForecastCache.make_key(data, days_to_predict, file_digest(pool.model_path), _scaler.fingerprint)
+
+def cached_forecast(pool, data, _scaler, days_to_predict=30, session=None):
+    """
+    Prediksi dari cache tanpa menjalankan rollout
+    Args:
+        session: PipelineState sesi ini (opsional). Rollout terpanjang yang
+            pernah dihitung disimpan di sana dan horizon yang lebih pendek
+            diambil dari prefiksnya.
+    Returns:
+        list: Prediksi, atau None jika belum ada di cache
+    """
+    rollout_key = fingerprint.combine(fingerprint.digest_array(data), file_digest(pool.model_path),
+                                      _scaler.fingerprint)
+    if session is not None:
+        predictions = session.prefix('rollout', rollout_key, days_to_predict)
+        if predictions is not None:
+            return predictions
+    predictions = load_forecast_cache().get(forecast_cache_key(pool, data, _scaler, days_to_predict))
+    if predictions is not None and session is not None:
+        session.remember('rollout', rollout_key, predictions)
+    return predictions
+
+def remember_forecast(pool, data, _scaler, predictions, session):
+    """Menyimpan rollout lengkap ke state sesi agar horizon lebih pendek diambil dari prefiksnya"""
+    rollout_key = fingerprint.combine(fingerprint.digest_array(data), file_digest(pool.model_path),
+                                      _scaler.fingerprint)
+    session.remember('rollout', rollout_key, predictions)
+
+@st.cache_resource
+def load_forecast_executor():
+    """
+    Worker bersama untuk rollout di latar belakang. Jumlah worker diatur
+    lewat GOLD_FORECAST_WORKERS (default: jumlah CPU).
+    """
+    executor = ForecastExecutor.from_env()
+    def job_gauge():
+        stats = executor.stats()
+        return {(('state', state),): stats[state] for state in ('queued', 'running')}
+    metrics.REGISTRY.gauge('gold_forecast_jobs', 'Job prediksi di antrean dan yang sedang berjalan', job_gauge)
+    return executor
+
+def submit_forecast(pool, data, _scaler, days_to_predict=30):
+    """
+    Menjadwalkan rollout di worker latar; hasil lengkap langsung disimpan
+    ke cache persisten oleh worker
+    Returns:
+        ForecastJob
+    """
+    cache = load_forecast_cache()
+    cache_key = forecast_cache_key(pool, data, _scaler, days_to_predict)
+    return load_forecast_executor().submit(pool, data, _scaler, days_to_predict, key=cache_key,
+                                           on_done=lambda predictions: cache.put(cache_key, predictions))
+
+def follow_forecast_job(job, start_date, poll_interval=0.25):
+    """
+    Menampilkan hasil job secara bertahap sampai job selesai. Tombol batal
+    memicu rerun; job tetap di session_state sehingga rerun tersebut yang
+    membatalkannya dan menampilkan hasil parsial.
+    Returns:
+        list: Prediksi yang selesai (parsial jika job dibatalkan atau gagal)
+    """
+    cancel_slot = st.empty()
+    if not job.done() and cancel_slot.button("⏹️ Batalkan Prediksi", key='cancel_forecast'):
+        job.cancel()
+    progress_slot, table_slot, chart_slot = st.empty(), st.empty(), st.empty()
+    executor = load_forecast_executor()
+    while True:
+        finished = job.wait(poll_interval)
+        predictions = job.predictions()
+        if finished:
+            break
+        queued = executor.stats()['queued']
+        status = f"⏳ Menunggu di antrean ({queued} job)" if job.status == QUEUED \
+            else f"🔄 Memprediksi hari {len(predictions)}/{job.days}..."
+        progress_slot.progress(job.progress(), text=status)
+        if predictions:
+            partial = pd.DataFrame({'Prediksi (USD)': predictions},
+                                   index=pd.Index(forecast_core.make_future_dates(start_date, len(predictions)),
+                                                  name='Tanggal'))
+            table_slot.dataframe(partial.tail(10).style.format(format_currency))
+            chart_slot.line_chart(partial)
+    for slot in (cancel_slot, progress_slot, table_slot, chart_slot):
+        slot.empty()
+    return predictions
+
+@st.cache_data(max_entries=16)
+@metrics.timed('bands')
+def predict_future_bands(fingerprint_key, _pool, _data, _sequence, _scaler, days_to_predict=30, paths=1000,
+                         distribution='residual'):
+    """
+    Pita ketidakpastian Monte Carlo: K jalur dimajukan bersama dalam satu
+    invoke berbatch per hari, dengan gangguan dari residual satu langkah
+    model pada histori upload
+    Args:
+        fingerprint_key: Key cache yang mewakili data, model dan scaler
+        _data: Histori nilai (N, 1) untuk menghitung residual
+        _sequence: Sequence ter-skala (60, 1) sebagai titik awal
+    Returns:
+        dict: {persentil: array harga per hari}, atau None jika gagal
+    """
+    try:
+        # Residual cukup dari 500 window terakhir
+        recent = _scaler.transform(_data[-(500 + forecast_core.SEQUENCE_LENGTH):])
+        with _pool.checkout() as model:
+            residuals = forecast_core.one_step_residuals(model, recent)
+            return forecast_core.predict_future_bands(model, _sequence, _scaler, days_to_predict, paths,
+                                                      residuals, distribution)
+    except Exception as e:
+        st.error(f"❌ Error dalam simulasi Monte Carlo: {str(e)}")
+        return None
+
 @st.cache_data
-def calculate_yearly_predictions(_daily_predictions, _start_value):
+@metrics.timed('yearly')
+def calculate_yearly_predictions(fingerprint_key, _daily_predictions, _start_value):
     """
     Menghitung prediksi tahunan berdasarkan tren harian dengan pembatasan pertumbuhan
     """
     try:
-        # Menggunakan nilai terakhir prediksi harian sebagai dasar
-        current_value = _daily_predictions[-1]  # Menggunakan nilai prediksi terakhir
-        
-        yearly_predictions = []
-        current_year = datetime.now().year
-        years = []
-        
-        # Hitung rata-rata perubahan harian
-        daily_changes = [(_daily_predictions[i] - _daily_predictions[i-1])/_daily_predictions[i-1] 
-                        for i in range(1, len(_daily_predictions))]
-        avg_daily_change = np.mean(daily_changes)
-        
-        # Batasi perubahan harian rata-rata ke maksimum 0.5%
-        avg_daily_change = np.clip(avg_daily_change, -0.005, 0.005)
-        
-        # Konversi ke perubahan tahunan (252 hari trading)
-        # Menggunakan compound growth yang lebih moderat
-        yearly_growth_rate = (1 + avg_daily_change) ** 252 - 1
-        
-        # Batasi pertumbuhan tahunan maksimum ke 20%
-        yearly_growth_rate = np.clip(yearly_growth_rate, -0.20, 0.20)
-        
-        # Prediksi 5 tahun ke depan dengan pertumbuhan yang lebih realistis
-        for i in range(5):
-            yearly_predictions.append(float(current_value))
-            years.append(current_year + i + 1)
-            
-            # Terapkan pertumbuhan dengan faktor penurunan untuk tahun-tahun berikutnya
-            growth_factor = 1.0 / (i + 1)  # Faktor penurunan berdasarkan tahun
-            adjusted_growth = yearly_growth_rate * growth_factor
-            current_value = current_value * (1 + adjusted_growth)
-        
-        return yearly_predictions, years
+        return forecast_core.calculate_yearly_predictions(_daily_predictions, _start_value)
     except Exception as e:
         st.error(f"❌ Error dalam perhitungan tahunan: {str(e)}")
+        current_year = datetime.now().year
         return [float(_start_value)] * 5, list(range(current_year + 1, current_year + 6))
 
 def format_currency(x):
     """Format nilai ke dalam format currency USD"""
     return f'${x:,.2f}'
 
-@st.cache_data
-def create_daily_plot(_df_index, _data, _predictions, _future_dates, date_column, value_column):
+def create_daily_plot(fingerprint_key, _df_index, _data, _predictions, _future_dates, date_column, value_column,
+                      _bands=None):
     """
     Membuat plot prediksi harian dengan ukuran yang lebih kecil
+    Args:
+        fingerprint_key: Key yang mewakili prediksi (dan pita, jika ada)
+        _bands: Pita persentil dari predict_future_bands (opsional)
+    Returns:
+        bytes: Gambar PNG (dari cache jika input sama), atau None jika gagal
     """
     try:
-        # Buat figure dengan ukuran yang lebih kecil
-        fig, ax = plt.subplots(figsize=(8, 4), facecolor='white')
-        ax.set_facecolor('#f8f9fa')
-        
-        # Plot hanya data prediksi
-        ax.plot(_future_dates, _predictions, 
-               label='Prediksi', 
-               color='#E74C3C', 
-               linewidth=2,
-               marker='s',
-               markersize=4,
-               markerfacecolor='white',
-               markeredgecolor='#E74C3C',
-               markeredgewidth=1)
-        
-        # Tambahkan area fill di bawah garis prediksi
-        ax.fill_between(_future_dates, _predictions, 
-                       alpha=0.1, 
-                       color='#E74C3C')
-        
-        # Format x-axis
-        plt.gcf().autofmt_xdate()
-        
-        # Styling plot yang lebih jelas
-        ax.grid(True, linestyle='--', alpha=0.8, color='#cccccc')
-        
-        # Atur warna dan ukuran font untuk judul dan label
-        ax.set_title('Prediksi Harga Emas 30 Hari Kedepan', 
-                    pad=10, 
-                    fontsize=10, 
-                    fontweight='bold',
-                    color='#2C3E50')
-        ax.set_xlabel('Tanggal', 
-                     labelpad=5, 
-                     fontsize=8, 
-                     fontweight='bold',
-                     color='#2C3E50')
-        ax.set_ylabel('Harga (USD)', 
-                     labelpad=5, 
-                     fontsize=8, 
-                     fontweight='bold',
-                     color='#2C3E50')
-        
-        # Legend dengan ukuran lebih kecil
-        legend = ax.legend(loc='upper left', 
-                         fontsize=8, 
-                         bbox_to_anchor=(0.02, 0.98),
-                         facecolor='white',
-                         edgecolor='none')
-        
-        # Format y-axis values dengan ukuran lebih kecil
-        y_min, y_max = min(_predictions), max(_predictions)
-        margin = (y_max - y_min) * 0.05
-        ax.set_ylim(y_min - margin, y_max + margin)
-        
-        # Format y-axis ticks dengan ukuran lebih kecil
-        yticks = ax.get_yticks()
-        ax.set_yticklabels(['${:,.0f}'.format(x) for x in yticks], 
-                          fontsize=7,
-                          color='#2C3E50')
-        ax.tick_params(axis='both', 
-                      which='major', 
-                      labelsize=7, 
-                      colors='#2C3E50')
-        
-        # Tambahkan label nilai dengan format yang lebih kecil
-        if len(_predictions) > 0:
-            # Label untuk nilai awal prediksi
-            plt.annotate(f'${_predictions[0]:,.2f}', 
-                        xy=(_future_dates[0], _predictions[0]),
-                        xytext=(5, 5), 
-                        textcoords='offset points',
-                        fontsize=7,
-                        color='#2C3E50',
-                        bbox=dict(facecolor='white', 
-                                edgecolor='#E74C3C',
-                                alpha=0.9,
-                                boxstyle='round,pad=0.3'))
-            
-            # Label untuk nilai akhir prediksi
-            plt.annotate(f'${_predictions[-1]:,.2f}',
-                        xy=(_future_dates[-1], _predictions[-1]),
-                        xytext=(5, -5), 
-                        textcoords='offset points',
-                        fontsize=7,
-                        color='#2C3E50',
-                        bbox=dict(facecolor='white', 
-                                edgecolor='#E74C3C',
-                                alpha=0.9,
-                                boxstyle='round,pad=0.3'))
-            
-            # Tambahkan label persentase perubahan
-            pct_change = ((_predictions[-1] - _predictions[0]) / _predictions[0]) * 100
-            color = '#27AE60' if pct_change >= 0 else '#E74C3C'
-            plt.annotate(f'Perubahan: {pct_change:+.1f}%',
-                        xy=(0.98, 0.02),
-                        xycoords='axes fraction',
-                        fontsize=8,
-                        color=color,
-                        bbox=dict(facecolor='white', 
-                                edgecolor=color,
-                                alpha=0.9,
-                                boxstyle='round,pad=0.3'),
-                        ha='right',
-                        va='bottom')
-        
-        # Atur margin plot
-        plt.tight_layout()
-        
-        # Tambahkan background grid yang lebih halus
-        ax.grid(True, which='minor', linestyle=':', alpha=0.4, color='#dddddd')
-        ax.minorticks_on()
-        
-        # Atur spines (border plot)
-        for spine in ax.spines.values():
-            spine.set_color('#cccccc')
-            spine.set_linewidth(0.5)
-        
-        return fig
-        
+        return render_chart(('daily', fingerprint_key, value_column),
+                            lambda fig: draw_daily_plot(fig, _predictions, _future_dates, _bands),
+                            figsize=(8, 4), dpi=150, stage='daily_plot', facecolor='white')
     except Exception as e:
         st.error(f"❌ Error dalam pembuatan plot harian: {str(e)}")
         return None
 
-@st.cache_data
-def create_yearly_plot(_yearly_predictions, value_column):
+def draw_daily_plot(fig, predictions, future_dates, bands=None):
     """
-    Membuat plot prediksi tahunan dengan ukuran yang lebih kecil
+    Menggambar plot prediksi harian pada figure yang diberikan, dengan pita
+    interval 50% dan 90% jika bands diberikan
     """
-    try:
-        # Buat figure dengan ukuran yang lebih kecil
-        fig, ax = plt.subplots(figsize=(8, 4), facecolor='white')
-        ax.set_facecolor('#f8f9fa')
-        
-        # Siapkan data
-        current_year = datetime.now().year
-        years = [current_year + i for i in range(1, 6)]
-        x_positions = range(len(years))
-        
-        # Plot batang untuk prediksi tahunan
-        bars = ax.bar(x_positions, _yearly_predictions,
-                     color='#3498db',
-                     alpha=0.7,
-                     width=0.5)
-        
-        # Tambahkan garis trend
-        ax.plot(x_positions, _yearly_predictions,
-                color='#e74c3c',
-                linewidth=2,
-                marker='o',
-                markersize=5,
-                markerfacecolor='white',
-                markeredgecolor='#e74c3c',
-                markeredgewidth=1,
-                zorder=5)
-        
-        # Styling yang lebih jelas
-        ax.grid(True, linestyle='--', alpha=0.3, color='#cccccc', zorder=0)
-        
-        # Atur warna dan ukuran font untuk judul dan label
-        ax.set_title('Proyeksi Harga Emas 5 Tahun Kedepan', 
-                    pad=10, 
-                    fontsize=10, 
-                    fontweight='bold',
-                    color='#2C3E50')
-        ax.set_xlabel('Tahun', 
-                     labelpad=5, 
-                     fontsize=8, 
-                     fontweight='bold',
-                     color='#2C3E50')
-        ax.set_ylabel('Harga (USD)', 
-                     labelpad=5, 
+    ax = fig.subplots()
+    ax.set_facecolor('#f8f9fa')
+
+    # Plot hanya data prediksi
+    ax.plot(future_dates, predictions, 
+           label='Prediksi', 
+           color='#E74C3C', 
+           linewidth=2,
+           marker='s',
+           markersize=4,
+           markerfacecolor='white',
+           markeredgecolor='#E74C3C',
+           markeredgewidth=1)
+
+    if bands:
+        # Pita ketidakpastian Monte Carlo
+        ax.fill_between(future_dates, bands[5], bands[95],
+                       alpha=0.12,
+                       color='#E74C3C',
+                       label='Interval 90%')
+        ax.fill_between(future_dates, bands[25], bands[75],
+                       alpha=0.25,
+                       color='#E74C3C',
+                       label='Interval 50%')
+    else:
+        # Tambahkan area fill di bawah garis prediksi
+        ax.fill_between(future_dates, predictions, 
+                       alpha=0.1, 
+                       color='#E74C3C')
+
+    # Format x-axis
+    fig.autofmt_xdate()
+
+    # Styling plot yang lebih jelas
+    ax.grid(True, linestyle='--', alpha=0.8, color='#cccccc')
+
+    # Atur warna dan ukuran font untuk judul dan label
+    ax.set_title('Prediksi Harga Emas 30 Hari Kedepan', 
+                pad=10, 
+                fontsize=10, 
+                fontweight='bold',
+                color='#2C3E50')
+    ax.set_xlabel('Tanggal', 
+                 labelpad=5, 
+                 fontsize=8, 
+                 fontweight='bold',
+                 color='#2C3E50')
+    ax.set_ylabel('Harga (USD)', 
+                 labelpad=5, 
+                 fontsize=8, 
+                 fontweight='bold',
+                 color='#2C3E50')
+
+    # Legend dengan ukuran lebih kecil
+    legend = ax.legend(loc='upper left', 
                      fontsize=8, 
-                     fontweight='bold',
-                     color='#2C3E50')
-        
-        # Format axis
-        ax.set_xticks(x_positions)
-        ax.set_xticklabels([str(year) for year in years], 
-                          fontsize=7,
-                          color='#2C3E50')
-        
-        # Format y-axis dengan style currency
-        yticks = ax.get_yticks()
-        ax.set_yticklabels(['${:,.0f}'.format(x) for x in yticks], 
-                          fontsize=7,
-                          color='#2C3E50')
-        
-        # Tambahkan label nilai dan persentase perubahan
-        prev_value = _yearly_predictions[0]
-        for i, value in enumerate(_yearly_predictions):
-            # Label nilai di atas bar
-            ax.text(i, value, f'${value:,.0f}',
-                   ha='center',
-                   va='bottom',
+                     bbox_to_anchor=(0.02, 0.98),
+                     facecolor='white',
+                     edgecolor='none')
+
+    # Format y-axis values dengan ukuran lebih kecil
+    y_min, y_max = min(predictions), max(predictions)
+    if bands:
+        y_min, y_max = min(y_min, np.min(bands[5])), max(y_max, np.max(bands[95]))
+    margin = (y_max - y_min) * 0.05
+    ax.set_ylim(y_min - margin, y_max + margin)
+
+    # Format y-axis ticks dengan ukuran lebih kecil
+    yticks = ax.get_yticks()
+    ax.set_yticklabels(['${:,.0f}'.format(x) for x in yticks], 
+                      fontsize=7,
+                      color='#2C3E50')
+    ax.tick_params(axis='both', 
+                  which='major', 
+                  labelsize=7, 
+                  colors='#2C3E50')
+
+    # Tambahkan label nilai dengan format yang lebih kecil
+    if len(predictions) > 0:
+        # Label untuk nilai awal prediksi
+        ax.annotate(f'${predictions[0]:,.2f}', 
+                   xy=(future_dates[0], predictions[0]),
+                   xytext=(5, 5), 
+                   textcoords='offset points',
                    fontsize=7,
                    color='#2C3E50',
-                   bbox=dict(facecolor='white',
-                           edgecolor='#3498db',
+                   bbox=dict(facecolor='white', 
+                           edgecolor='#E74C3C',
                            alpha=0.9,
                            boxstyle='round,pad=0.3'))
-            
-            # Label persentase perubahan
-            if i > 0:
-                pct_change = ((value - prev_value) / prev_value) * 100
-                color = '#27AE60' if pct_change >= 0 else '#E74C3C'
-                y_pos = min(value, prev_value)
-                
-                # Tambahkan panah dan label persentase
-                ax.annotate(f'{pct_change:+.1f}%',
-                          xy=(i-0.5, y_pos),
-                          xytext=(0, -15),
-                          textcoords='offset points',
-                          ha='center',
-                          va='top',
-                          fontsize=7,
-                          color=color,
-                          bbox=dict(facecolor='white',
-                                  edgecolor=color,
-                                  alpha=0.9,
-                                  boxstyle='round,pad=0.3'),
-                          arrowprops=dict(arrowstyle='->',
-                                        color=color,
-                                        alpha=0.6))
-            prev_value = value
-        
-        # Tambahkan total perubahan
-        total_change = ((_yearly_predictions[-1] - _yearly_predictions[0]) / _yearly_predictions[0]) * 100
-        color = '#27AE60' if total_change >= 0 else '#E74C3C'
-        ax.text(0.98, 0.02,
-                f'Total: {total_change:+.1f}%',
-                transform=ax.transAxes,
-                ha='right',
-                va='bottom',
-                fontsize=8,
-                bbox=dict(facecolor='white',
-                        edgecolor=color,
-                        alpha=0.9,
-                        boxstyle='round,pad=0.3'),
-                color=color)
-        
-        # Atur spines (border plot)
-        for spine in ax.spines.values():
-            spine.set_color('#cccccc')
-            spine.set_linewidth(0.5)
-        
-        # Atur margin plot
-        plt.tight_layout()
-        
-        return fig
-        
+
+        # Label untuk nilai akhir prediksi
+        ax.annotate(f'${predictions[-1]:,.2f}',
+                   xy=(future_dates[-1], predictions[-1]),
+                   xytext=(5, -5), 
+                   textcoords='offset points',
+                   fontsize=7,
+                   color='#2C3E50',
+                   bbox=dict(facecolor='white', 
+                           edgecolor='#E74C3C',
+                           alpha=0.9,
+                           boxstyle='round,pad=0.3'))
+
+        # Tambahkan label persentase perubahan
+        pct_change = ((predictions[-1] - predictions[0]) / predictions[0]) * 100
+        color = '#27AE60' if pct_change >= 0 else '#E74C3C'
+        ax.annotate(f'Perubahan: {pct_change:+.1f}%',
+                   xy=(0.98, 0.02),
+                   xycoords='axes fraction',
+                   fontsize=8,
+                   color=color,
+                   bbox=dict(facecolor='white', 
+                           edgecolor=color,
+                           alpha=0.9,
+                           boxstyle='round,pad=0.3'),
+                   ha='right',
+                   va='bottom')
+
+    # Atur margin plot
+    fig.tight_layout()
+
+    # Tambahkan background grid yang lebih halus
+    ax.grid(True, which='minor', linestyle=':', alpha=0.4, color='#dddddd')
+    ax.minorticks_on()
+
+    # Atur spines (border plot)
+    for spine in ax.spines.values():
+        spine.set_color('#cccccc')
+        spine.set_linewidth(0.5)
+
+def create_yearly_plot(fingerprint_key, _yearly_predictions, value_column):
+    """
+    Membuat plot prediksi tahunan dengan ukuran yang lebih kecil
+    Returns:
+        bytes: Gambar PNG (dari cache jika input sama), atau None jika gagal
+    """
+    try:
+        return render_chart(('yearly', fingerprint_key, value_column),
+                            lambda fig: draw_yearly_plot(fig, _yearly_predictions),
+                            figsize=(8, 4), dpi=150, stage='yearly_plot', facecolor='white')
     except Exception as e:
         st.error(f"❌ Error dalam pembuatan plot tahunan: {str(e)}")
         return None
 
+def draw_yearly_plot(fig, yearly_predictions):
+    """
+    Menggambar plot prediksi tahunan pada figure yang diberikan
+    """
+    ax = fig.subplots()
+    ax.set_facecolor('#f8f9fa')
+
+    # Siapkan data
+    current_year = datetime.now().year
+    years = [current_year + i for i in range(1, 6)]
+    x_positions = range(len(years))
+
+    # Plot batang untuk prediksi tahunan
+    bars = ax.bar(x_positions, yearly_predictions,
+                 color='#3498db',
+                 alpha=0.7,
+                 width=0.5)
+
+    # Tambahkan garis trend
+    ax.plot(x_positions, yearly_predictions,
+            color='#e74c3c',
+            linewidth=2,
+            marker='o',
+            markersize=5,
+            markerfacecolor='white',
+            markeredgecolor='#e74c3c',
+            markeredgewidth=1,
+            zorder=5)
+
+    # Styling yang lebih jelas
+    ax.grid(True, linestyle='--', alpha=0.3, color='#cccccc', zorder=0)
+
+    # Atur warna dan ukuran font untuk judul dan label
+    ax.set_title('Proyeksi Harga Emas 5 Tahun Kedepan', 
+                pad=10, 
+                fontsize=10, 
+                fontweight='bold',
+                color='#2C3E50')
+    ax.set_xlabel('Tahun', 
+                 labelpad=5, 
+                 fontsize=8, 
+                 fontweight='bold',
+                 color='#2C3E50')
+    ax.set_ylabel('Harga (USD)', 
+                 labelpad=5, 
+                 fontsize=8, 
+                 fontweight='bold',
+                 color='#2C3E50')
+
+    # Format axis
+    ax.set_xticks(x_positions)
+    ax.set_xticklabels([str(year) for year in years], 
+                      fontsize=7,
+                      color='#2C3E50')
+
+    # Format y-axis dengan style currency
+    yticks = ax.get_yticks()
+    ax.set_yticklabels(['${:,.0f}'.format(x) for x in yticks], 
+                      fontsize=7,
+                      color='#2C3E50')
+
+    # Tambahkan label nilai dan persentase perubahan
+    prev_value = yearly_predictions[0]
+    for i, value in enumerate(yearly_predictions):
+        # Label nilai di atas bar
+        ax.text(i, value, f'${value:,.0f}',
+               ha='center',
+               va='bottom',
+               fontsize=7,
+               color='#2C3E50',
+               bbox=dict(facecolor='white',
+                       edgecolor='#3498db',
+                       alpha=0.9,
+                       boxstyle='round,pad=0.3'))
+
+        # Label persentase perubahan
+        if i > 0:
+            pct_change = ((value - prev_value) / prev_value) * 100
+            color = '#27AE60' if pct_change >= 0 else '#E74C3C'
+            y_pos = min(value, prev_value)
+
+            # Tambahkan panah dan label persentase
+            ax.annotate(f'{pct_change:+.1f}%',
+                      xy=(i-0.5, y_pos),
+                      xytext=(0, -15),
+                      textcoords='offset points',
+                      ha='center',
+                      va='top',
+                      fontsize=7,
+                      color=color,
+                      bbox=dict(facecolor='white',
+                              edgecolor=color,
+                              alpha=0.9,
+                              boxstyle='round,pad=0.3'),
+                      arrowprops=dict(arrowstyle='->',
+                                    color=color,
+                                    alpha=0.6))
+        prev_value = value
+
+    # Tambahkan total perubahan
+    total_change = ((yearly_predictions[-1] - yearly_predictions[0]) / yearly_predictions[0]) * 100
+    color = '#27AE60' if total_change >= 0 else '#E74C3C'
+    ax.text(0.98, 0.02,
+            f'Total: {total_change:+.1f}%',
+            transform=ax.transAxes,
+            ha='right',
+            va='bottom',
+            fontsize=8,
+            bbox=dict(facecolor='white',
+                    edgecolor=color,
+                    alpha=0.9,
+                    boxstyle='round,pad=0.3'),
+            color=color)
+
+    # Atur spines (border plot)
+    for spine in ax.spines.values():
+        spine.set_color('#cccccc')
+        spine.set_linewidth(0.5)
+
+    # Atur margin plot
+    fig.tight_layout()
+
+def draw_history_plot(fig, prices):
+    """
+    Menggambar grafik historis harga beserta anotasi nilai tertinggi dan terendah
+    """
+    ax = fig.subplots()
+    ax.plot(prices.index, prices, label='Harga Emas (USD)')
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.set_title('Historis Harga Emas SPDR Gold Shares (GLD)')
+    ax.set_xlabel('Periode')
+    ax.set_ylabel('Harga (USD)')
+    ax.legend()
+    
+    # Menambahkan anotasi untuk nilai tertinggi dan terendah
+    max_price = prices.max()
+    min_price = prices.min()
+    
+    ax.annotate(f'Tertinggi: ${max_price:.2f}',
+                xy=(prices.idxmax(), max_price),
+                xytext=(10, 10),
+                textcoords='offset points')
+    ax.annotate(f'Terendah: ${min_price:.2f}',
+                xy=(prices.idxmin(), min_price),
+                xytext=(10, -10),
+                textcoords='offset points')
+
+def draw_correlation_heatmap(fig, correlation_matrix):
+    """
+    Menggambar heatmap korelasi beserta nilainya di setiap sel
+    """
+    ax = fig.subplots()
+    image = ax.imshow(correlation_matrix, cmap='coolwarm', aspect='auto')
+    fig.colorbar(image, ax=ax)
+    ax.set_xticks(range(len(correlation_matrix.columns)), correlation_matrix.columns, rotation=45)
+    ax.set_yticks(range(len(correlation_matrix.columns)), correlation_matrix.columns)
+    ax.set_title('Peta Korelasi Antar Variabel')
+    
+    # Menambahkan nilai korelasi di dalam heatmap
+    for i in range(len(correlation_matrix.columns)):
+        for j in range(len(correlation_matrix.columns)):
+            ax.text(j, i, f'{correlation_matrix.iloc[i, j]:.2f}',
+                    ha='center', va='center')
+
+def session_pipeline():
+    """
+    PipelineState milik sesi ini: hasil tahap upload, validasi, pengurutan,
+    preprocessing dan rollout dipakai ulang di setiap rerun selama input
+    tahap tersebut tidak berubah
+    """
+    if 'prediction_pipeline' not in st.session_state:
+        st.session_state['prediction_pipeline'] = PipelineState()
+    return st.session_state['prediction_pipeline']
+
+def upload_fingerprint(uploaded_file):
+    """
+    Digest isi file upload, dihitung sekali per file lalu disimpan di
+    session_state; rerun berikutnya (mis. menggeser slider) memakai ulang
+    """
+    memo_key = (uploaded_file.file_id, uploaded_file.size)
+    memo = st.session_state.get('upload_fingerprint')
+    if memo is None or memo[0] != memo_key:
+        memo = (memo_key, fingerprint.digest_bytes(uploaded_file.getbuffer()))
+        st.session_state['upload_fingerprint'] = memo
+        metrics.count('gold_upload_bytes_total', uploaded_file.size)
+    return memo[1]
+
+@st.cache_data(max_entries=4)
+@metrics.timed('csv_preview')
+def read_upload_preview(fingerprint_key, _uploaded_file):
+    """
+    Header dan beberapa baris pertama file upload untuk preview dan pilihan kolom
+    """
+    return upload_reader.read_preview(_uploaded_file)
+
+@st.cache_data(max_entries=4)
+@metrics.timed('csv_parse')
+def read_upload(fingerprint_key, _uploaded_file, date_column, value_column):
+    """
+    Membaca hanya kolom tanggal dan harga dari file upload, di-key dengan
+    fingerprint isi file dan kolom yang dipilih
+    """
+    return upload_reader.read_columns(_uploaded_file, date_column, value_column)
+
+@st.cache_data(max_entries=4)
+@metrics.timed('sort')
+def sort_upload(fingerprint_key, _df, date_column, date_format=None):
+    """
+    Mengonversi kolom tanggal dan mengurutkan data, sekali per upload dan kolom
+    """
+    df = _df.copy()
+    df[date_column] = pd.to_datetime(df[date_column], format=date_format)
+    return df.sort_values(by=date_column)
+
 @st.cache_data
-def validate_data(df, date_column, value_column):
+@metrics.timed('validate')
+def validate_upload(fingerprint_key, _uploaded_file, date_column, value_column):
     """
-    Memvalidasi data yang diupload
+    Memvalidasi file yang diupload secara streaming per chunk
     Args:
-        df: DataFrame yang akan divalidasi
+        fingerprint_key: Fingerprint isi file upload
+        _uploaded_file: File CSV yang diupload (tidak di-hash)
         date_column: Nama kolom tanggal
         value_column: Nama kolom nilai
     Returns:
-        tuple: (is_valid, error_message)
+        ValidationReport: Hasil validasi beserta indeks baris bermasalah
     """
-    try:
-        # Validasi jumlah data
-        if len(df) < 60:
-            return False, "Data minimal 60 baris untuk melakukan prediksi"
-            
-        # Validasi kolom tanggal
-        try:
-            df[date_column] = pd.to_datetime(df[date_column])
-        except Exception as e:
-            return False, f"Kolom {date_column} harus berformat tanggal yang valid (contoh: YYYY-MM-DD, MM/DD/YYYY)"
-            
-        # Validasi kolom nilai
-        try:
-            df[value_column] = pd.to_numeric(df[value_column], errors='coerce')
-            if df[value_column].isnull().any():
-                return False, f"Kolom {value_column} mengandung nilai yang tidak valid"
-        except Exception as e:
-            return False, f"Kolom {value_column} harus berisi nilai numerik"
-            
-        # Validasi nilai negatif
-        if (df[value_column] < 0).any():
-            return False, f"Kolom {value_column} tidak boleh mengandung nilai negatif"
-            
-        # Validasi nilai yang hilang
-        if df[value_column].isnull().any() or df[date_column].isnull().any():
-            return False, "Data tidak boleh mengandung nilai yang hilang (NA/null)"
-            
-        # Validasi urutan tanggal
-        if not df[date_column].is_monotonic_increasing:
-            return False, "Data harus diurutkan berdasarkan tanggal secara ascending"
-            
-        return True, ""
-        
-    except Exception as e:
-        return False, f"Error validasi data: {str(e)}"
+    _uploaded_file.seek(0)
+    report = validate_stream(_uploaded_file, date_column, value_column,
+                             min_rows=forecast_core.SEQUENCE_LENGTH)
+    metrics.count('gold_rows_ingested_total', report.rows, source='upload')
+    return report
+
+def show_validation_report(report):
+    """
+    Menampilkan ringkasan seluruh masalah dan tabel baris bermasalah
+    """
+    st.error(f"❌ {report.first_error()}")
+    if report.rows >= report.min_rows:
+        st.write(f"Ringkasan masalah: {report.summary()}")
+        with st.expander("Detail baris bermasalah"):
+            st.dataframe(report.error_frame(), hide_index=True)
 
 @st.cache_data
-def format_prediction_results(predictions, future_dates, yearly_predictions, years):
+@metrics.timed('format')
+def format_prediction_results(fingerprint_key, _predictions, _future_dates, _yearly_predictions, _years):
     """
     Memformat hasil prediksi untuk ditampilkan
     """
     try:
-        # Format prediksi harian
-        df_daily = pd.DataFrame({
-            'Tanggal': [d.strftime('%Y-%m-%d') for d in future_dates],
-            'Prediksi (USD)': predictions,
-            'Perubahan (USD)': [0] + [predictions[i] - predictions[i-1] for i in range(1, len(predictions))],
-            'Perubahan (%)': [0] + [(predictions[i] - predictions[i-1])/predictions[i-1]*100 for i in range(1, len(predictions))]
-        })
-        
-        # Format prediksi tahunan
-        df_yearly = pd.DataFrame({
-            'Tahun': years,
-            'Prediksi (USD)': yearly_predictions,
-            'Perubahan (USD)': [0] + [yearly_predictions[i] - yearly_predictions[i-1] for i in range(1, len(yearly_predictions))],
-            'Perubahan (%)': ['Base'] + [f"{((yearly_predictions[i] - yearly_predictions[i-1])/yearly_predictions[i-1]*100):.2f}%" 
-                                        for i in range(1, len(yearly_predictions))]
-        })
-        
-        return df_daily, df_yearly
-        
+        return forecast_core.format_prediction_results(_predictions, _future_dates, _yearly_predictions, _years)
     except Exception as e:
         st.error(f"❌ Error dalam format hasil prediksi: {str(e)}")
         return pd.DataFrame(), pd.DataFrame()
@@ -729,13 +987,14 @@ def home_page():
 def visualization_page():
     st.title("Visualisasi Data Emas")
     
-    if os.path.exists('gld_price_data.csv'):
-        df = pd.read_csv('gld_price_data.csv')
-        
-        # Konversi kolom Date ke datetime
-        if 'Date' in df.columns:
-            df['Date'] = pd.to_datetime(df['Date'])
-            df.set_index('Date', inplace=True)
+    table = load_history_table()
+    df = table.to_frame() if table is not None else None
+    if df is not None:
+        history_stats = load_history_stats(table)
+        # Baris yang melanggar urutan tanggal tidak ikut ditampilkan
+        rejected_count = load_ingestor().rejected_count
+        if rejected_count:
+            st.warning(f"⚠️ {rejected_count} baris diabaikan karena tanggal tidak valid atau tidak berurutan")
         
         st.markdown("""
         ### Informasi Dataset
@@ -747,32 +1006,25 @@ def visualization_page():
         """)
         
         st.subheader("Grafik Historis Harga Emas (USD)")
-        fig, ax = plt.subplots(figsize=(10, 6))
         if 'GLD' in df.columns:
-            ax.plot(df.index, df['GLD'], label='Harga Emas (USD)')
-            plt.xticks(rotation=45)
-            plt.grid(True, linestyle='--', alpha=0.7)
-            ax.set_title('Historis Harga Emas SPDR Gold Shares (GLD)')
-            ax.set_xlabel('Periode')
-            ax.set_ylabel('Harga (USD)')
-            ax.legend()
-            
-            # Menambahkan anotasi untuk nilai tertinggi dan terendah
-            max_price = df['GLD'].max()
-            min_price = df['GLD'].min()
-            max_date = df['GLD'].idxmax()
-            min_date = df['GLD'].idxmin()
+            gld = history_stats.columns.index('GLD')
+            max_price = history_stats.max[gld]
+            min_price = history_stats.min[gld]
             
-            plt.annotate(f'Tertinggi: ${max_price:.2f}',
-                        xy=(max_date, max_price),
-                        xytext=(10, 10),
-                        textcoords='offset points')
-            plt.annotate(f'Terendah: ${min_price:.2f}',
-                        xy=(min_date, min_price),
-                        xytext=(10, -10),
-                        textcoords='offset points')
+            # Grafik hanya memuat titik sebanyak lebar gambar; ekstrem dalam rentang tetap ada
+            pyramid = load_history_pyramid(table.version_dir, 'GLD', df.index.to_numpy(), table['GLD'])
+            start, end = None, None
+            if isinstance(df.index, pd.DatetimeIndex) and len(df) > 1:
+                first_date, last_date = df.index[0].to_pydatetime(), df.index[-1].to_pydatetime()
+                start, end = st.slider("Rentang tanggal:", min_value=first_date, max_value=last_date,
+                                       value=(first_date, last_date), format="YYYY-MM-DD")
+                start, end = np.datetime64(start, 'ns'), np.datetime64(end, 'ns')
+            positions = pyramid.select(HISTORY_CHART_POINTS, start, end)
             
-            st.pyplot(fig)
+            history_key = ('history', table.version_dir, str(start), str(end), HISTORY_CHART_POINTS)
+            st.image(render_chart(history_key, lambda fig: draw_history_plot(fig, df['GLD'].iloc[positions]),
+                                  figsize=(10, 6), dpi=150),
+                     use_container_width=True)
             
             # Menampilkan statistik harga
             col1, col2, col3 = st.columns(3)
@@ -787,32 +1039,20 @@ def visualization_page():
             st.warning("Kolom 'GLD' tidak ditemukan dalam dataset")
         
         st.subheader("Statistik Deskriptif (dalam USD)")
-        # Hanya tampilkan statistik untuk kolom numerik
-        numeric_columns = df.select_dtypes(include=[np.number]).columns
-        stats_df = df[numeric_columns].describe()
+        # Dihitung dari state inkremental, bukan dari seluruh histori setiap rerun
+        stats_df = history_stats.describe()
         # Format nilai dalam statistik
         stats_df = stats_df.round(2)
         st.write(stats_df)
         
         st.subheader("Korelasi Antar Variabel")
-        # Hitung korelasi hanya untuk kolom numerik
-        correlation_matrix = df[numeric_columns].corr()
+        correlation_matrix = history_stats.corr()
         
         # Plot heatmap korelasi
-        fig, ax = plt.subplots(figsize=(10, 8))
-        plt.imshow(correlation_matrix, cmap='coolwarm', aspect='auto')
-        plt.colorbar()
-        plt.xticks(range(len(correlation_matrix.columns)), correlation_matrix.columns, rotation=45)
-        plt.yticks(range(len(correlation_matrix.columns)), correlation_matrix.columns)
-        plt.title('Peta Korelasi Antar Variabel')
-        
-        # Menambahkan nilai korelasi di dalam heatmap
-        for i in range(len(correlation_matrix.columns)):
-            for j in range(len(correlation_matrix.columns)):
-                plt.text(j, i, f'{correlation_matrix.iloc[i, j]:.2f}',
-                        ha='center', va='center')
-        
-        st.pyplot(fig)
+        correlation_key = ('correlation', fingerprint.digest_frame(correlation_matrix))
+        st.image(render_chart(correlation_key, lambda fig: draw_correlation_heatmap(fig, correlation_matrix),
+                              figsize=(10, 8), dpi=150),
+                 use_container_width=True)
         
         # Tampilkan data mentah
         st.subheader("Data Mentah (5 Baris Pertama)")
@@ -844,45 +1084,57 @@ def prediction_page():
         return
     
     try:
-        # Baca data
-        df = pd.read_csv(uploaded_file)
+        # Baca data; fingerprint isi file menjadi key semua cache turunan upload ini
+        # Setiap tahap disimpan di state sesi dan hanya dihitung ulang jika inputnya berubah
+        pipeline = session_pipeline()
+        upload_key = upload_fingerprint(uploaded_file)
+        # Hanya header dan beberapa baris pertama yang dibaca untuk preview dan pilihan kolom
+        preview = pipeline.stage('preview', upload_key, lambda: read_upload_preview(upload_key, uploaded_file))
         
         # Tampilkan preview data
         st.subheader("📋 Preview Data")
-        st.write(df.head())
+        st.write(preview)
         
         # Validasi format data
-        if len(df.columns) < 2:
+        if len(preview.columns) < 2:
             st.error("❌ File CSV harus memiliki minimal 2 kolom (tanggal dan harga)")
             return
             
         # Pilihan kolom
-        date_column = st.selectbox("Pilih kolom tanggal:", df.columns)
-        value_column = st.selectbox("Pilih kolom harga:", df.columns)
+        date_column = st.selectbox("Pilih kolom tanggal:", preview.columns)
+        value_column = st.selectbox("Pilih kolom harga:", preview.columns)
         
-        # Validasi data
-        is_valid, error_message = validate_data(df, date_column, value_column)
-        if not is_valid:
-            st.error(f"❌ {error_message}")
+        # Validasi data secara streaming, seluruh baris bermasalah dilaporkan sekaligus
+        report = pipeline.stage('report', fingerprint.combine(upload_key, date_column, value_column),
+                                lambda: validate_upload(upload_key, uploaded_file, date_column, value_column))
+        if not report.is_valid:
+            show_validation_report(report)
             return
             
-        # Urutkan data berdasarkan tanggal
-        df[date_column] = pd.to_datetime(df[date_column])
-        df = df.sort_values(by=date_column)
+        # Baca hanya dua kolom yang dipilih, lalu urutkan berdasarkan tanggal
+        data_key = fingerprint.combine(upload_key, date_column, value_column)
+        df = pipeline.stage('upload', data_key,
+                            lambda: read_upload(data_key, uploaded_file, date_column, value_column))
+        df = pipeline.stage('sorted', data_key,
+                            lambda: sort_upload(data_key, df, date_column, report.date_format))
         
-        # Load model dan scaler
-        model = load_model()
-        scaler = load_scaler()
+        # Load model dan registry scaler dari versi yang dipilih
+        pool, registry = select_model_version()
         
-        if model is None or scaler is None:
+        if pool is None or registry is None:
             st.error("❌ Gagal memuat model atau scaler")
             return
             
         # Persiapkan data
-        data, dates = prepare_prediction_data(df, value_column, date_column)
+        data, dates = pipeline.stage('prepared', data_key,
+                                     lambda: prepare_prediction_data(data_key, df, value_column, date_column),
+                                     valid=lambda prepared: prepared[0] is not None)
         if data is None or dates is None:
             st.error("❌ Gagal mempersiapkan data")
             return
+        
+        # Setiap kolom memakai scaler-nya sendiri; kolom baru di-fit dari data upload
+        scaler = registry.scaler_for(value_column, data)
             
         # Tampilkan informasi data
         st.info(f"ℹ️ Menggunakan {len(data)} data point untuk prediksi")
@@ -890,35 +1142,91 @@ def prediction_page():
         # Tambahkan slider untuk jumlah hari prediksi
         days_to_predict = st.slider("Jumlah hari untuk prediksi:", 1, 90, 30)
         
+        # Opsi pita ketidakpastian Monte Carlo
+        show_bands = st.checkbox("Tampilkan pita ketidakpastian (Monte Carlo)")
+        if show_bands:
+            col1, col2 = st.columns(2)
+            with col1:
+                band_paths = st.slider("Jumlah jalur simulasi:", 100, 2000, 1000, step=100)
+            with col2:
+                noise_labels = {'residual': "Residual historis", 'normal': "Normal", 't': "Student-t"}
+                noise_distribution = st.selectbox("Distribusi gangguan:", list(noise_labels),
+                                                  format_func=noise_labels.get)
+        
         # Tambahkan tombol prediksi
         col1, col2, col3 = st.columns([1,1,1])
         with col2:
             predict_button = st.button("🔮 Mulai Prediksi", use_container_width=True)
         
-        if predict_button:
+        # Job prediksi yang belum selesai ditampilkan dari rerun sebelumnya (mis. tombol Batalkan ditekan)
+        job = st.session_state.get('forecast_job')
+        
+        if predict_button or job is not None:
             # Preprocessing
-            sequence = preprocess_data(data, scaler)
+            sequence_key = fingerprint.combine(data_key, scaler.fingerprint)
+            sequence = pipeline.stage('sequence', sequence_key, lambda: preprocess_data(sequence_key, data, scaler),
+                                      valid=len)
             if len(sequence) == 0:
                 st.error("❌ Gagal melakukan preprocessing data")
                 return
+            
+            # Job lama tidak dipakai lagi jika input berubah atau prediksi baru diminta
+            if job is not None and (predict_button or job.key != forecast_cache_key(pool, sequence, scaler,
+                                                                                     days_to_predict)):
+                job.cancel()
+                st.session_state.pop('forecast_job', None)
+                job = None
+                if not predict_button:
+                    return
                 
-            # Prediksi
-            with st.spinner('🔄 Melakukan prediksi...'):
-                predictions, future_dates = predict_future(model, sequence, scaler, days_to_predict)
+            # Prediksi: dari cache jika ada, jika tidak dijalankan di worker latar
+            predictions = cached_forecast(pool, sequence, scaler, days_to_predict, pipeline) if job is None else None
+            from_cache = predictions is not None
+            if predictions is None:
+                if job is None:
+                    job = submit_forecast(pool, sequence, scaler, days_to_predict)
+                    st.session_state['forecast_job'] = job
+                predictions = follow_forecast_job(job, datetime.now())
+                del st.session_state['forecast_job']
+                if job.status == DONE:
+                    remember_forecast(pool, sequence, scaler, predictions, pipeline)
+                    st.caption(f"⏱️ Prediksi selesai dalam {job.runtime:.2f} detik "
+                               f"(antrean {job.queue_wait:.2f} detik)")
+                elif job.status == CANCELLED:
+                    st.warning(f"⏹️ Prediksi dibatalkan setelah {len(predictions)} dari {job.days} hari")
+                    if not predictions:
+                        return
+                else:
+                    st.error(f"❌ {job.error}")
+            future_dates = forecast_core.make_future_dates(datetime.now(), len(predictions))
                 
             if len(predictions) == 0:
                 st.error("❌ Gagal melakukan prediksi")
                 return
+            if from_cache:
+                st.caption("⚡ Hasil prediksi diambil dari cache")
                 
-            # Format hasil prediksi
-            df_daily, df_yearly = format_prediction_results(predictions, future_dates, 
-                                                          *calculate_yearly_predictions(predictions, data[-1][0]))
+            # Format hasil prediksi; key dari isi prediksi dan tanggal awal
+            forecast_key = fingerprint.combine(fingerprint.digest_array(predictions), future_dates[0].date())
+            df_daily, df_yearly = format_prediction_results(forecast_key, predictions, future_dates,
+                                                          *calculate_yearly_predictions(forecast_key, predictions, data[-1][0]))
+            
+            bands, daily_key = None, forecast_key
+            if show_bands and len(predictions) == days_to_predict:
+                with st.spinner(f'🔄 Mensimulasikan {band_paths} jalur...'):
+                    bands_key = fingerprint.combine(data_key, file_digest(pool.model_path), scaler.fingerprint,
+                                                    days_to_predict, band_paths, noise_distribution)
+                    bands = predict_future_bands(bands_key, pool, data, sequence, scaler, days_to_predict,
+                                                 band_paths, noise_distribution)
+                if bands:
+                    daily_key = fingerprint.combine(forecast_key, bands_key)
+                    df_daily = df_daily.assign(**{'P5 (USD)': bands[5], 'P95 (USD)': bands[95]})
             
             # Buat tab untuk prediksi harian dan tahunan
             tab1, tab2 = st.tabs(["📈 Prediksi Harian", "📊 Prediksi Tahunan"])
             
             with tab1:
-                st.subheader(f"Prediksi {days_to_predict} Hari Kedepan")
+                st.subheader(f"Prediksi {len(predictions)} Hari Kedepan")
                 
                 # Tampilkan metrik harian
                 col1, col2, col3, col4 = st.columns(4)
@@ -939,15 +1247,19 @@ def prediction_page():
                     .format({
                         'Prediksi (USD)': format_currency,
                         'Perubahan (USD)': format_currency,
-                        'Perubahan (%)': '{:.2f}%'
+                        'Perubahan (%)': '{:.2f}%',
+                        **{column: format_currency for column in ('P5 (USD)', 'P95 (USD)') if column in df_daily}
                     })
                     .background_gradient(subset=['Perubahan (%)'], cmap='RdYlGn')
                 )
                 
                 # Plot prediksi harian
-                fig_daily = create_daily_plot(df[date_column], data, predictions, future_dates, date_column, value_column)
-                if fig_daily:
-                    st.pyplot(fig_daily)
+                chart_daily = create_daily_plot(daily_key, df[date_column], data, predictions, future_dates, date_column, value_column,
+                                                bands)
+                if chart_daily:
+                    st.image(chart_daily, use_container_width=True)
+                if bands:
+                    st.caption(f"Pita arsir: interval 50% dan 90% dari {band_paths} jalur Monte Carlo")
             
             with tab2:
                 st.subheader("Prediksi 5 Tahun Kedepan")
@@ -972,9 +1284,9 @@ def prediction_page():
                 )
                 
                 # Plot prediksi tahunan
-                fig_yearly = create_yearly_plot(df_yearly['Prediksi (USD)'].values, value_column)
-                if fig_yearly:
-                    st.pyplot(fig_yearly)
+                chart_yearly = create_yearly_plot(forecast_key, df_yearly['Prediksi (USD)'].values, value_column)
+                if chart_yearly:
+                    st.image(chart_yearly, use_container_width=True)
                 
                 # Tambahkan catatan yang diperbarui
                 st.markdown("""
@@ -991,8 +1303,74 @@ def prediction_page():
         st.error(f"❌ Terjadi error: {str(e)}")
         st.error("Silakan periksa kembali format data Anda")
 
+def show_forecast_queue_stats():
+    """
+    Kedalaman antrean dan durasi job prediksi, dasar menentukan
+    GOLD_FORECAST_WORKERS dan GOLD_POOL_SIZE
+    """
+    stats = load_forecast_executor().stats()
+    st.write(f"Worker: {stats['workers']} · Antrean: {stats['queued']} · Berjalan: {stats['running']}")
+    st.write(f"Selesai: {stats['done']} · Dibatalkan: {stats['cancelled']} · Gagal: {stats['failed']}")
+    st.write(f"Durasi job p50/p95/maks: {stats['runtime_p50_s']:.2f} / {stats['runtime_p95_s']:.2f} / "
+             f"{stats['runtime_max_s']:.2f} detik")
+    st.write(f"Tunggu antrean rata-rata/maks: {stats['queue_wait_mean_s']:.2f} / "
+             f"{stats['queue_wait_max_s']:.2f} detik")
+
+@st.cache_resource
+def start_metrics_server():
+    """
+    Endpoint Prometheus /metrics untuk seluruh proses, di
+    GOLD_METRICS_HOST:GOLD_METRICS_PORT (default 127.0.0.1:9464; port 0
+    atau kosong menonaktifkan)
+    Returns:
+        tuple: (url endpoint atau None, pesan error atau None)
+    """
+    port = int(os.environ.get('GOLD_METRICS_PORT', 9464) or 0)
+    if not port:
+        return None, None
+    host = os.environ.get('GOLD_METRICS_HOST', '127.0.0.1')
+    try:
+        metrics.start_http_server(port, host)
+    except OSError as e:
+        return None, f"Port {port} tidak dapat dibuka: {str(e)}"
+    return f"http://{host}:{port}/metrics", None
+
+def session_metrics():
+    """Registry metrik milik sesi ini, terpisah dari registry global proses"""
+    if 'metrics' not in st.session_state:
+        st.session_state['metrics'] = metrics.MetricsRegistry()
+    return st.session_state['metrics']
+
+def show_metrics_panel(registry):
+    """
+    Durasi per tahap dan counter untuk sesi ini; angka yang sama untuk
+    seluruh proses tersedia di endpoint Prometheus
+    """
+    summary = registry.stage_summary()
+    if summary:
+        stages = pd.DataFrame.from_dict(summary, orient='index')
+        table = (stages[['mean_s', 'p50_s', 'p95_s', 'p99_s', 'total_s']] * 1e3).round(2)
+        table.columns = ['rata-rata (ms)', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'total (ms)']
+        st.dataframe(table.assign(n=stages['count']))
+    else:
+        st.caption("Belum ada tahap yang diukur di sesi ini")
+
+    counters = registry.counters()
+    if counters:
+        rows = [(name.removeprefix('gold_').removesuffix('_total') +
+                 ''.join(f" {value}" for _, value in labels), count)
+                for (name, labels), count in sorted(counters.items())]
+        st.dataframe(pd.DataFrame(rows, columns=['Counter', 'Nilai']).set_index('Counter'))
+
+    endpoint, error = start_metrics_server()
+    if endpoint:
+        st.caption(f"Prometheus: {endpoint}")
+    elif error:
+        st.caption(f"⚠️ Endpoint metrik tidak aktif. {error}")
+
 def main():
     local_css()
+    start_metrics_server()
     
     # Sidebar navigation
     st.sidebar.title("Navigasi")
@@ -1004,6 +1382,10 @@ def main():
         index=0
     )
     
+    if page == "PREDIKSI":
+        with st.sidebar.expander("⚙️ Antrean Prediksi"):
+            show_forecast_queue_stats()
+    
     st.sidebar.markdown("---")
     st.sidebar.markdown("""
     <div style='background: linear-gradient(120deg, #FFD700, #FFA500); padding: 10px; border-radius: 5px;'>
@@ -1018,13 +1400,17 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Page routing
-    if page == "HOME":
-        home_page()
-    elif page == "PREDIKSI":
-        prediction_page()
-    else:
-        visualization_page()
+    # Page routing; metrik tahap juga dicatat ke registry sesi ini
+    with metrics.session_scope(session_metrics()) as registry:
+        if page == "HOME":
+            home_page()
+        elif page == "PREDIKSI":
+            prediction_page()
+        else:
+            visualization_page()
+    
+    with st.sidebar.expander("🛠️ Admin: Metrik Sesi"):
+        show_metrics_panel(registry)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
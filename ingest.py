@@ -0,0 +1,321 @@
+"""
+Ingestion inkremental untuk gld_price_data.csv yang terus bertambah.
+
+Ingestor mengingat offset byte dan tanggal terakhir yang sudah diproses.
+Setiap refresh() hanya mem-parse baris yang baru ditambahkan di akhir
+file, lalu menyimpannya sebagai segmen tabel ber-tipe di direktori store.
+Baris yang melanggar urutan tanggal ditolak dan dicatat.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa kunci antar-proses
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from upload_validation import detect_date_format
+
+STORE_DIR = '.gold_cache'
+
+# Jumlah byte awal file yang di-hash untuk mendeteksi file ditulis ulang
+HEAD_BYTES = 4096
+# Segmen digabung menjadi satu setelah jumlahnya melewati batas ini
+MAX_SEGMENTS = 16
+
+IngestResult = namedtuple('IngestResult', ['new_rows', 'rejected', 'rebuilt'])
+
+
+@contextmanager
+def file_lock(path):
+    """Kunci eksklusif antar-proses (flock) selama blok berjalan"""
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class CsvIngestor:
+    """
+    Ingestor append-only untuk satu file CSV harga
+    Args:
+        csv_path: Path file CSV sumber
+        store_dir: Direktori untuk state dan segmen tabel
+        date_column: Nama kolom tanggal yang menjadi index
+    """
+    def __init__(self, csv_path='gld_price_data.csv', store_dir=STORE_DIR, date_column='Date'):
+        self.csv_path = csv_path
+        self.date_column = date_column
+        name = os.path.splitext(os.path.basename(csv_path))[0]
+        self.store_dir = os.path.join(store_dir, name)
+        self._state_path = os.path.join(self.store_dir, 'ingest_state.json')
+        self._rejected_path = os.path.join(self.store_dir, 'rejected.csv')
+        self.lock_path = os.path.join(self.store_dir, '.lock')
+        self._lock = threading.Lock()
+        # Segmen hanya dimuat ke memori saat tabel diminta
+        self._frames = None
+        self._state = None
+
+    # State dan segmen
+
+    def _empty_state(self, generation=0):
+        return {'offset': 0, 'head_digest': '', 'header': None, 'date_format': None,
+                'last_date': None, 'rows': 0, 'rejected': 0, 'segments': [], 'segment_rows': [],
+                'generation': generation}
+
+    def _load_state(self):
+        try:
+            with open(self._state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return self._empty_state()
+        if 'segment_rows' not in state:
+            # State dari versi lama: jumlah baris per segmen dihitung sekali lalu disimpan
+            state['segment_rows'] = [len(pd.read_pickle(os.path.join(self.store_dir, name)))
+                                     for name in state['segments']]
+            state.setdefault('generation', 0)
+            self._save_state(state)
+        return state
+
+    def _save_state(self, state=None):
+        tmp_path = self._state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._state if state is None else state, f)
+        os.replace(tmp_path, self._state_path)
+
+    def _head_digest(self, length):
+        with open(self.csv_path, 'rb') as f:
+            return hashlib.sha256(f.read(min(length, HEAD_BYTES))).hexdigest()
+
+    def _load_segments(self):
+        return [pd.read_pickle(os.path.join(self.store_dir, name)) for name in self._state['segments']]
+
+    def _concat_frames(self):
+        if self._frames is None:
+            self._frames = self._load_segments()
+        # Segmen baru hanya digabung saat tabel dibaca, bukan di setiap refresh
+        if len(self._frames) > 1:
+            self._frames = [pd.concat(self._frames)]
+        return self._frames[0] if self._frames else None
+
+    def _write_segment(self, frame):
+        # Nomor lanjut dari segmen terakhir: setelah kompaksi segmen terbaru tetap
+        # dipertahankan sehingga jumlah segmen tidak bisa dipakai sebagai nomor
+        numbers = [int(name[5:11]) for name in self._state['segments'] if name.startswith('part-')]
+        name = f"part-{max(numbers + [0]) + 1:06d}.pkl"
+        frame.to_pickle(os.path.join(self.store_dir, name))
+        self._state['segments'].append(name)
+        self._state['segment_rows'].append(len(frame))
+
+    def _compact(self):
+        if len(self._state['segments']) <= MAX_SEGMENTS:
+            return
+        # Segmen terbaru tidak ikut digabung agar rows_since() untuk baris baru
+        # tetap cukup membaca segmen kecil itu saja
+        old_segments = self._state['segments'][:-1]
+        rows = sum(self._state['segment_rows'][:-1])
+        name = f"compact-{rows:012d}.pkl"
+        frames = [pd.read_pickle(os.path.join(self.store_dir, old)) for old in old_segments]
+        pd.concat(frames).to_pickle(os.path.join(self.store_dir, name))
+        del frames
+        self._state['segments'] = [name, self._state['segments'][-1]]
+        self._state['segment_rows'] = [rows, self._state['segment_rows'][-1]]
+        self._save_state()
+        self._frames = None
+        for old in old_segments:
+            if old != name:
+                os.remove(os.path.join(self.store_dir, old))
+
+    def _reset(self):
+        for name in (self._state or {}).get('segments', []):
+            path = os.path.join(self.store_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.exists(self._rejected_path):
+            os.remove(self._rejected_path)
+        # Generasi naik agar cache turunan (mis. kolumnar) tahu isinya tidak bisa disambung
+        self._state = self._empty_state((self._state or {}).get('generation', 0) + 1)
+        self._frames = []
+
+    # Parsing
+
+    def _parse(self, raw, header):
+        if header is None:
+            frame = pd.read_csv(io.BytesIO(raw))
+            header = list(frame.columns)
+        else:
+            frame = pd.read_csv(io.BytesIO(raw), header=None, names=header)
+
+        if self.date_column in frame.columns:
+            if self._state['date_format'] is None:
+                self._state['date_format'] = detect_date_format(frame[self.date_column])
+            frame[self.date_column] = pd.to_datetime(frame[self.date_column],
+                                                     format=self._state['date_format'],
+                                                     errors='coerce')
+        for column in frame.columns:
+            if column != self.date_column:
+                frame[column] = pd.to_numeric(frame[column], errors='coerce').astype(np.float64)
+        return frame, header
+
+    def _split_monotonic(self, frame):
+        """Memisahkan baris yang tanggalnya tidak lebih besar dari tanggal sebelumnya"""
+        if self.date_column not in frame.columns:
+            frame.index = frame.index + self._state['rows']
+            return frame, frame.iloc[0:0].assign(reason=pd.Series(dtype=str))
+
+        # NaT direpresentasikan sebagai int64 minimum, jadi tidak pernah menaikkan maksimum
+        dates = frame[self.date_column].to_numpy(dtype='datetime64[ns]')
+        as_int = dates.view(np.int64)
+        last_date = self._state['last_date']
+        start = np.datetime64(last_date, 'ns') if last_date else np.datetime64('NaT', 'ns')
+
+        # Tanggal maksimum sebelum setiap baris
+        previous = np.concatenate([[start.view(np.int64)], as_int[:-1]])
+        running_max = np.maximum.accumulate(previous)
+
+        missing = np.isnat(dates)
+        rejected_mask = missing | (as_int <= running_max)
+
+        rejected = frame[rejected_mask].assign(
+            reason=np.where(missing[rejected_mask], 'tanggal tidak valid', 'urutan tanggal tidak naik')
+        )
+        accepted = frame[~rejected_mask].set_index(self.date_column)
+        return accepted, rejected
+
+    # API publik
+
+    def refresh(self):
+        """
+        Memproses baris baru sejak refresh terakhir
+        Returns:
+            IngestResult: (new_rows, rejected, rebuilt)
+        """
+        os.makedirs(self.store_dir, exist_ok=True)
+        with self._lock, file_lock(self.lock_path):
+            return self._refresh_locked()
+
+    def _refresh_locked(self):
+        # Proses lain mungkin sudah meng-ingest baris baru: ikuti state di disk
+        disk_state = self._load_state()
+        if disk_state != self._state:
+            self._state = disk_state
+            self._frames = None
+
+        size = os.path.getsize(self.csv_path)
+        offset = self._state['offset']
+        rebuilt = False
+        # File mengecil atau bagian awalnya berubah: bangun ulang dari awal
+        if size < offset or (offset and self._head_digest(offset) != self._state['head_digest']):
+            self._reset()
+            offset = 0
+            rebuilt = True
+
+        if size == offset:
+            return IngestResult(None, None, rebuilt)
+
+        with open(self.csv_path, 'rb') as f:
+            f.seek(offset)
+            raw = f.read(size - offset)
+        # Hanya baris yang sudah diakhiri newline yang diproses
+        end = raw.rfind(b'\n') + 1
+        if end == 0:
+            return IngestResult(None, None, rebuilt)
+        raw = raw[:end]
+
+        frame, header = self._parse(raw, self._state['header'])
+        accepted, rejected = self._split_monotonic(frame)
+
+        if len(accepted):
+            self._write_segment(accepted)
+            if self._frames is not None:
+                self._frames.append(accepted)
+            if isinstance(accepted.index, pd.DatetimeIndex):
+                self._state['last_date'] = accepted.index[-1].isoformat()
+        if len(rejected):
+            rejected.to_csv(self._rejected_path, mode='a', index=False,
+                            header=not os.path.exists(self._rejected_path))
+
+        self._state['header'] = header
+        self._state['offset'] = offset + end
+        self._state['head_digest'] = self._head_digest(offset + end)
+        self._state['rows'] += len(accepted)
+        self._state['rejected'] += len(rejected)
+        metrics.count('gold_rows_ingested_total', len(accepted) + len(rejected), source='history')
+        self._save_state()
+        self._compact()
+
+        return IngestResult(accepted, rejected, rebuilt)
+
+    @property
+    def table(self):
+        """Tabel ber-tipe hasil ingestion (index tanggal jika kolom tanggal ada)"""
+        with self._lock:
+            if self._state is None or not self._state['segments']:
+                return None
+            return self._concat_frames()
+
+    def rows_since(self, start):
+        """
+        Baris ke-start dan seterusnya dari tabel ingestion; hanya segmen yang
+        memuat baris tersebut yang dibaca
+        Returns:
+            DataFrame (bisa kosong), atau None jika belum ada data
+        """
+        with self._lock:
+            if self._state is None or not self._state['segments']:
+                return None
+            if self._frames is not None:
+                return self._concat_frames().iloc[start:]
+            frames = []
+            end = self._state['rows']
+            for name, rows in zip(reversed(self._state['segments']), reversed(self._state['segment_rows'])):
+                # Minimal satu segmen dibaca agar hasil kosong tetap memiliki kolom
+                if end <= start and frames:
+                    break
+                frame = pd.read_pickle(os.path.join(self.store_dir, name))
+                frames.append(frame.iloc[max(start - (end - rows), 0):])
+                end -= rows
+            return pd.concat(frames[::-1]) if len(frames) > 1 else frames[0]
+
+    def release(self):
+        """Melepas tabel di memori; dimuat ulang dari segmen jika table diminta lagi"""
+        with self._lock:
+            self._frames = None
+
+    @property
+    def rows(self):
+        """Jumlah baris yang sudah di-ingest"""
+        return self._state['rows'] if self._state else 0
+
+    @property
+    def generation(self):
+        """Naik setiap kali store dibangun ulang dari awal (CSV ditulis ulang)"""
+        return self._state['generation'] if self._state else 0
+
+    @property
+    def offset(self):
+        """Offset byte CSV yang sudah diproses"""
+        return self._state['offset'] if self._state else 0
+
+    @property
+    def rejected_count(self):
+        return self._state['rejected'] if self._state else 0
+
+    def rejected_rows(self):
+        """Baris yang pernah ditolak beserta alasannya"""
+        if not os.path.exists(self._rejected_path):
+            return pd.DataFrame()
+        return pd.read_csv(self._rejected_path)
@@ -0,0 +1,168 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Nama file setiap varian model, seperti yang ditulis oleh train_model.py
+MODEL_VARIANTS = {
+    'float32': 'model.tflite',
+    'float16': 'model_float16.tflite',
+    'int8_dynamic': 'model_int8_dynamic.tflite',
+    'int8_full': 'model_int8_full.tflite',
+}
+DEFAULT_VARIANT = 'float32'
+
+
+def model_variant_path(variant=None, model_dir='.'):
+    """
+    Path file model untuk sebuah varian
+    Args:
+        variant: Nama varian (default: GOLD_MODEL_VARIANT, lalu float32)
+        model_dir: Direktori file model
+    Raises:
+        ValueError: Jika nama varian tidak dikenal
+        FileNotFoundError: Jika file varian belum dibuat
+    """
+    variant = variant or os.environ.get('GOLD_MODEL_VARIANT') or DEFAULT_VARIANT
+    if variant not in MODEL_VARIANTS:
+        raise ValueError(f"Varian model '{variant}' tidak dikenal. Pilihan: {', '.join(MODEL_VARIANTS)}")
+    path = os.path.join(model_dir, MODEL_VARIANTS[variant])
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File model varian {variant} ({path}) tidak ditemukan. "
+                                f"Jalankan train_model.py untuk membuatnya.")
+    return path
+
+
+def load_tflite_module():
+    """
+    Modul interpreter TFLite, diimpor saat pertama kali dibutuhkan.
+    Runtime mandiri (tflite_runtime / ai_edge_litert) jauh lebih ringan dari
+    TensorFlow penuh, jadi dipakai jika terpasang.
+    """
+    try:
+        from tflite_runtime import interpreter as tflite
+    except ImportError:
+        try:
+            from ai_edge_litert import interpreter as tflite
+        except ImportError:
+            import tensorflow as tf
+            tflite = tf.lite
+    return tflite
+
+
+def create_interpreter(model_path, num_threads=None, use_xnnpack=True):
+    """
+    Membuat interpreter TFLite dengan tensor yang sudah dialokasikan
+    Args:
+        model_path: Path file .tflite
+        num_threads: Jumlah thread per interpreter (None = default TFLite)
+        use_xnnpack: Gunakan delegate XNNPACK bawaan TFLite
+    """
+    tflite = load_tflite_module()
+    kwargs = {'model_path': model_path, 'num_threads': num_threads}
+    if not use_xnnpack:
+        resolver_types = getattr(tflite, 'experimental', tflite).OpResolverType
+        kwargs['experimental_op_resolver_type'] = resolver_types.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+    interpreter = tflite.Interpreter(**kwargs)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+class InterpreterPool:
+    """
+    Pool interpreter TFLite berukuran tetap.
+
+    Interpreter TFLite tidak thread-safe, sehingga setiap pemanggil meminjam
+    satu interpreter secara eksklusif lewat checkout() dan mengembalikannya
+    setelah selesai. Tiap interpreter memiliki tensor sendiri, jadi beberapa
+    sesi dapat melakukan prediksi secara paralel.
+    """
+    def __init__(self, model_path, size=None, num_threads=1, use_xnnpack=True):
+        self.model_path = model_path
+        self.size = size or os.cpu_count() or 1
+        self.num_threads = num_threads
+        self.use_xnnpack = use_xnnpack
+
+        # LIFO agar interpreter yang baru dipakai (cache CPU masih hangat) dipakai lagi
+        self._idle = queue.LifoQueue(maxsize=self.size)
+        for _ in range(self.size):
+            self._idle.put(create_interpreter(model_path, num_threads, use_xnnpack))
+
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._in_use = 0
+        self._peak_in_use = 0
+
+    @classmethod
+    def from_env(cls, model_path):
+        """
+        Membuat pool dengan konfigurasi dari environment variable:
+        GOLD_POOL_SIZE, GOLD_NUM_THREADS, GOLD_USE_XNNPACK (0/1)
+        """
+        size = os.environ.get('GOLD_POOL_SIZE')
+        return cls(
+            model_path,
+            size=int(size) if size else None,
+            num_threads=int(os.environ.get('GOLD_NUM_THREADS', 1)),
+            use_xnnpack=os.environ.get('GOLD_USE_XNNPACK', '1') != '0',
+        )
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """
+        Meminjam satu interpreter dari pool
+        Args:
+            timeout: Batas waktu menunggu dalam detik (None = tunggu terus)
+        Raises:
+            TimeoutError: Jika tidak ada interpreter yang tersedia dalam batas waktu
+        """
+        start = time.perf_counter()
+        waited = False
+        try:
+            interpreter = self._idle.get_nowait()
+        except queue.Empty:
+            waited = True
+            try:
+                interpreter = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._timeouts += 1
+                raise TimeoutError(f"Tidak ada interpreter tersedia dalam {timeout} detik")
+        wait = time.perf_counter() - start
+
+        with self._lock:
+            self._checkouts += 1
+            self._waits += int(waited)
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+        try:
+            yield interpreter
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(interpreter)
+
+    def stats(self):
+        """Statistik checkout dan waktu tunggu pool"""
+        with self._lock:
+            return {
+                'size': self.size,
+                'num_threads': self.num_threads,
+                'use_xnnpack': self.use_xnnpack,
+                'in_use': self._in_use,
+                'peak_in_use': self._peak_in_use,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'total_wait_s': self._total_wait,
+                'mean_wait_s': self._total_wait / self._checkouts if self._checkouts else 0.0,
+                'max_wait_s': self._max_wait,
+            }
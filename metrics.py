@@ -0,0 +1,326 @@
+"""
+Metrik latensi per tahap, counter dan resource proses.
+
+Setiap tahap pipeline prediksi (parse CSV, validasi, persiapan data,
+preprocessing, invoke interpreter, prediksi tahunan, format hasil, dan
+pembuatan grafik) diukur dengan time.perf_counter (monotonic) ke dalam
+histogram. Counter mencatat cache hit/miss, jumlah invoke, baris yang
+di-ingest dan byte yang di-upload.
+
+Semua nilai dicatat ke REGISTRY global milik proses dan, jika ada, ke
+registry sesi yang sedang aktif (lihat session_scope). Registry sesi
+disimpan lewat ContextVar sehingga ikut ke thread worker yang dijalankan
+dengan contextvars.copy_context().
+
+REGISTRY.render() menghasilkan format teks Prometheus (histogram dengan
+bucket kumulatif ditambah gauge persentil dari sampel terbaru), yang
+dilayani oleh start_http_server() di /metrics.
+
+Contoh:
+    with metrics.timer('preprocess'):
+        ...
+    metrics.count('gold_upload_bytes_total', len(data))
+"""
+import bisect
+import contextvars
+import functools
+import math
+import os
+import resource
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STAGE_METRIC = 'gold_stage_duration_seconds'
+# Bucket latensi dari 50 µs (satu invoke) sampai 10 detik (upload besar)
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+RESERVOIR_SIZE = 1024
+
+_HELP = {
+    STAGE_METRIC: 'Durasi setiap tahap pipeline prediksi',
+    'gold_cache_requests_total': 'Lookup cache menurut cache dan hasil (hit/miss)',
+    'gold_interpreter_invokes_total': 'Jumlah invoke interpreter TFLite',
+    'gold_rows_ingested_total': 'Baris data yang dibaca menurut sumber',
+    'gold_upload_bytes_total': 'Byte file CSV yang di-upload',
+}
+
+
+class Histogram:
+    """
+    Histogram bucket tetap ditambah reservoir sampel terbaru untuk persentil
+    Args:
+        buckets: Batas atas bucket (detik), terurut naik
+        reservoir: Jumlah sampel terbaru yang disimpan untuk persentil
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS, reservoir=RESERVOIR_SIZE):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=reservoir)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+    def quantile(self, q):
+        """Persentil (nearest-rank) dari sampel terbaru"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    def cumulative(self):
+        """Pasangan (le, jumlah kumulatif) termasuk +Inf"""
+        total = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            total += count
+            yield bound, total
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, **extra):
+    items = list(labels) + sorted(extra.items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in items) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Kumpulan counter, histogram dan gauge callback
+    Attributes:
+        created: Waktu registry dibuat (time.time)
+    """
+    def __init__(self):
+        self.created = time.time()
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        self.observe_many(name, (value,), **labels)
+
+    def observe_many(self, name, values, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            for value in values:
+                histogram.observe(value)
+
+    def gauge(self, name, help_text, callback):
+        """
+        Mendaftarkan gauge yang nilainya dibaca saat ekspor
+        Args:
+            callback: Fungsi tanpa argumen yang mengembalikan angka, atau
+                dict {tuple label (nama, nilai): angka}
+        """
+        with self._lock:
+            self._gauges[name] = (help_text, callback)
+
+    def counters(self):
+        """Salinan semua counter sebagai {(nama, label): nilai}"""
+        with self._lock:
+            return dict(self._counters)
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def stage_summary(self):
+        """
+        Ringkasan histogram tahap: {stage: {count, total_s, mean_s, p50_s, p95_s, p99_s}}
+        """
+        with self._lock:
+            histograms = [(dict(labels).get('stage', name), h) for (name, labels), h in self._histograms.items()
+                          if name == STAGE_METRIC]
+            return {stage: {
+                'count': h.count,
+                'total_s': h.sum,
+                'mean_s': h.sum / h.count if h.count else 0.0,
+                **{f"p{int(q * 100)}_s": h.quantile(q) for q in QUANTILES},
+            } for stage, h in sorted(histograms)}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """Semua metrik dalam format teks Prometheus (text/plain; version=0.0.4)"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            gauges = sorted(self._gauges.items())
+            snapshot = [(key, h.count, h.sum, list(h.cumulative()), [(q, h.quantile(q)) for q in QUANTILES])
+                        for key, h in histograms]
+
+        previous = None
+        for (name, labels), value in counters:
+            if name != previous:
+                lines += [f"# HELP {name} {_HELP.get(name, name)}", f"# TYPE {name} counter"]
+                previous = name
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        previous = None
+        for (name, labels), count, total, cumulative, _ in snapshot:
+            if name != previous:
+                lines += [f"# HELP {name} {_HELP.get(name, name)}", f"# TYPE {name} histogram"]
+                previous = name
+            for bound, bucket_count in cumulative:
+                lines.append(f"{name}_bucket{_format_labels(labels, le=_format_value(bound))} {bucket_count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        previous = None
+        for (name, labels), _, _, _, quantiles in snapshot:
+            quantile_name = f"{name}_quantile"
+            if quantile_name != previous:
+                lines += [f"# HELP {quantile_name} Persentil dari {RESERVOIR_SIZE} sampel terbaru",
+                          f"# TYPE {quantile_name} gauge"]
+                previous = quantile_name
+            for q, value in quantiles:
+                lines.append(f"{quantile_name}{_format_labels(labels, quantile=q)} {_format_value(value)}")
+
+        for name, (help_text, callback) in gauges:
+            try:
+                value = callback()
+            except Exception:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            values = value.items() if isinstance(value, dict) else [((), value)]
+            for labels, number in values:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(number)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+_session = contextvars.ContextVar('gold_metrics_session', default=None)
+
+
+def _process_rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+REGISTRY.gauge('process_resident_memory_bytes', 'Resident set size proses', _process_rss_bytes)
+REGISTRY.gauge('process_cpu_seconds_total', 'Waktu CPU user + system proses', time.process_time)
+REGISTRY.gauge('process_threads', 'Jumlah thread Python yang aktif', threading.active_count)
+
+
+@contextmanager
+def session_scope(registry):
+    """Mencatat metrik juga ke registry sesi selama blok berjalan"""
+    token = _session.set(registry)
+    try:
+        yield registry
+    finally:
+        _session.reset(token)
+
+
+def count(name, value=1, **labels):
+    """Menambah counter di registry global dan registry sesi aktif"""
+    REGISTRY.inc(name, value, **labels)
+    session = _session.get()
+    if session is not None:
+        session.inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    observe_many(name, (value,), **labels)
+
+
+def observe_many(name, values, **labels):
+    """Mencatat banyak sampel sekaligus (satu lock per registry), mis. durasi semua invoke satu rollout"""
+    REGISTRY.observe_many(name, values, **labels)
+    session = _session.get()
+    if session is not None:
+        session.observe_many(name, values, **labels)
+
+
+def cache_lookup(cache, hit):
+    """Mencatat satu lookup cache sebagai hit atau miss"""
+    count('gold_cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+
+@contextmanager
+def timer(stage):
+    """Mengukur durasi blok sebagai tahap stage (juga saat blok melempar exception)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(STAGE_METRIC, time.perf_counter() - start, stage=stage)
+
+
+def timed(stage):
+    """Decorator: setiap pemanggilan fungsi diukur sebagai tahap stage"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port, host='127.0.0.1', registry=REGISTRY):
+    """
+    Melayani GET /metrics di thread latar
+    Returns:
+        ThreadingHTTPServer: Server yang berjalan (server.shutdown() untuk berhenti)
+    """
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
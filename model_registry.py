@@ -0,0 +1,338 @@
+"""
+Registry model berversi dengan hot reload.
+
+Setiap versi adalah direktori immutable di dalam registry (default
+models/, atau GOLD_MODEL_REGISTRY) yang berisi file model (varian dari
+interpreter_pool.MODEL_VARIANTS), scalers.npz dan/atau scaler.pkl, serta
+manifest.json berisi checksum SHA-256 setiap file. Versi baru ditulis ke
+direktori sementara lalu di-rename, sehingga pembaca tidak pernah melihat
+versi setengah jadi.
+
+Model selalu dimuat lewat path file: TFLite memetakan file .tflite dengan
+mmap read-only bersama (MAP_SHARED), jadi semua interpreter di pool dan
+semua proses worker berbagi page cache yang sama. Karena direktori versi
+tidak pernah diubah, mapping tersebut tetap valid selama versi dipakai.
+
+ModelManager memantau registry di thread latar dan mengganti versi aktif
+secara atomik: pemanggil mengambil snapshot LoadedModel, sehingga
+prediksi yang sedang berjalan selesai dengan versi lama, sementara
+pemanggil berikutnya langsung memakai versi baru.
+
+Versi terbaru ditentukan oleh nomor urut publish (sequence) di manifest,
+bukan nama versi, sehingga nama bebas dipilih (mis. v9 lalu v10).
+
+Contoh:
+    python model_registry.py publish hasil_training/ --version 2024-06-01
+    python model_registry.py list
+    python model_registry.py verify 2024-06-01
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from forecast_cache import file_digest
+from ingest import file_lock
+from interpreter_pool import MODEL_VARIANTS, InterpreterPool, model_variant_path
+
+REGISTRY_DIR = 'models'
+MANIFEST_FILE = 'manifest.json'
+LOCK_FILE = '.publish.lock'
+CREATED_FORMAT = '%Y-%m-%dT%H:%M:%S%z'
+# File yang ikut dipublikasikan dari direktori hasil training
+ARTIFACT_FILES = tuple(MODEL_VARIANTS.values()) + ('scalers.npz', 'scaler.pkl', 'training_manifest.json')
+
+
+class RegistryError(Exception):
+    """Versi tidak ditemukan, tidak lengkap, atau checksum tidak cocok"""
+
+
+class ModelRegistry:
+    """
+    Direktori berisi versi model
+    Args:
+        root: Direktori registry
+    """
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+        # Manifest tidak pernah berubah, jadi kunci urutan cukup dibaca sekali per versi
+        self._order_keys = {}
+
+    def _order_key(self, version):
+        key = self._order_keys.get(version)
+        if key is None:
+            manifest = self.manifest(version)
+            # Manifest lama tanpa sequence diurutkan menurut waktu pembuatan, sebelum versi bersequence
+            try:
+                created = datetime.strptime(manifest.get('created', ''), CREATED_FORMAT).timestamp()
+            except ValueError:
+                created = os.path.getmtime(os.path.join(self.path(version), MANIFEST_FILE))
+            key = self._order_keys[version] = (manifest.get('sequence', 0), created, version)
+        return key
+
+    def versions(self):
+        """Versi yang lengkap (memiliki manifest), terurut menurut urutan publish"""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        names = [name for name in names
+                 if not name.startswith('.') and os.path.exists(os.path.join(self.root, name, MANIFEST_FILE))]
+        keys = {}
+        for name in names:
+            try:
+                keys[name] = self._order_key(name)
+            except (RegistryError, OSError):
+                continue
+        return sorted(keys, key=keys.get)
+
+    def latest(self):
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def path(self, version):
+        return os.path.join(self.root, version)
+
+    def manifest(self, version):
+        try:
+            with open(os.path.join(self.path(version), MANIFEST_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise RegistryError(f"Manifest versi {version} tidak dapat dibaca: {e}") from e
+
+    def verify(self, version):
+        """
+        Mencocokkan checksum setiap file dengan manifest
+        Raises:
+            RegistryError: Jika ada file yang hilang atau berubah
+        """
+        manifest = self.manifest(version)
+        for name, expected in manifest['files'].items():
+            path = os.path.join(self.path(version), name)
+            if not os.path.exists(path):
+                raise RegistryError(f"File {name} pada versi {version} tidak ditemukan")
+            if file_digest(path) != expected['sha256']:
+                raise RegistryError(f"Checksum {name} pada versi {version} tidak cocok")
+        return manifest
+
+    def publish(self, source_dir, version=None):
+        """
+        Menyalin artefak training ke versi baru secara atomik
+        Args:
+            source_dir: Direktori berisi model.tflite dan scaler (hasil train_model.py)
+            version: Nama versi (default: timestamp UTC)
+        Returns:
+            str: Nama versi
+        """
+        version = version or time.strftime('%Y%m%d-%H%M%S', time.gmtime())
+        if os.path.exists(self.path(version)):
+            raise RegistryError(f"Versi {version} sudah ada")
+        names = [name for name in ARTIFACT_FILES if os.path.exists(os.path.join(source_dir, name))]
+        if MODEL_VARIANTS['float32'] not in names:
+            raise RegistryError(f"{MODEL_VARIANTS['float32']} tidak ditemukan di {source_dir}")
+        if 'scalers.npz' not in names and 'scaler.pkl' not in names:
+            raise RegistryError(f"scalers.npz atau scaler.pkl tidak ditemukan di {source_dir}")
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = os.path.join(self.root, f".{version}.{os.getpid()}.tmp")
+        os.makedirs(tmp_dir)
+        try:
+            files = {}
+            for name in names:
+                target = os.path.join(tmp_dir, name)
+                shutil.copyfile(os.path.join(source_dir, name), target)
+                files[name] = {'bytes': os.path.getsize(target), 'sha256': file_digest(target)}
+            # Nomor urut dan rename dalam satu kunci agar dua publish bersamaan tidak
+            # mendapat sequence yang sama
+            with file_lock(os.path.join(self.root, LOCK_FILE)):
+                if os.path.exists(self.path(version)):
+                    raise RegistryError(f"Versi {version} sudah ada")
+                sequence = max([self._order_key(name)[0] for name in self.versions()] + [0]) + 1
+                manifest = {'version': version, 'sequence': sequence,
+                            'created': time.strftime(CREATED_FORMAT), 'files': files}
+                with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+                    json.dump(manifest, f, indent=2)
+                os.rename(tmp_dir, self.path(version))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return version
+
+
+class LoadedModel:
+    """
+    Satu versi model yang siap dipakai
+    Attributes:
+        version: Nama versi (None = file model di direktori kerja)
+        pool: InterpreterPool untuk versi ini
+        scalers: ScalerRegistry milik versi ini
+    """
+    def __init__(self, version, pool, scalers, manifest=None):
+        self.version = version
+        self.pool = pool
+        self.scalers = scalers
+        self.manifest = manifest or {}
+
+
+def load_scalers(model_dir):
+    """ScalerRegistry dari scalers.npz, atau dari scaler.pkl lama (GLD)"""
+    from scaler_registry import REGISTRY_FILE, ScalerRegistry
+
+    path = os.path.join(model_dir, REGISTRY_FILE)
+    if os.path.exists(path):
+        return ScalerRegistry.load(path)
+    import forecast_core
+    legacy = forecast_core.load_scaler_file(os.path.join(model_dir, 'scaler.pkl'))
+    registry = ScalerRegistry()
+    registry.set('GLD', legacy.data_min_[0], legacy.data_max_[0])
+    return registry
+
+
+class ModelManager:
+    """
+    Versi aktif (terbaru) ditambah cache versi yang dipilih pengguna
+    Args:
+        registry: ModelRegistry
+        variant: Varian model (default: GOLD_MODEL_VARIANT)
+        pool_factory: Fungsi pool_factory(model_path) -> InterpreterPool
+        max_loaded: Jumlah versi pilihan pengguna yang tetap dimuat
+    """
+    def __init__(self, registry, variant=None, pool_factory=InterpreterPool.from_env, max_loaded=2):
+        self.registry = registry
+        self.variant = variant
+        self.pool_factory = pool_factory
+        self.max_loaded = max_loaded
+        self._current = None
+        self._pinned = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self.swaps = 0
+        self.last_error = None
+
+    @classmethod
+    def from_env(cls):
+        """Registry dari GOLD_MODEL_REGISTRY (default models/)"""
+        return cls(ModelRegistry(os.environ.get('GOLD_MODEL_REGISTRY', REGISTRY_DIR)))
+
+    def _load(self, version):
+        self.registry.verify(version)
+        model_dir = self.registry.path(version)
+        pool = self.pool_factory(model_variant_path(self.variant, model_dir))
+        return LoadedModel(version, pool, load_scalers(model_dir), self.registry.manifest(version))
+
+    def current(self):
+        """
+        Snapshot versi terbaru; pemanggil memakai snapshot ini sampai selesai
+        Returns:
+            LoadedModel, atau None jika registry kosong
+        """
+        with self._lock:
+            current = self._current
+        if current is None:
+            self.refresh()
+            with self._lock:
+                current = self._current
+        return current
+
+    def get(self, version):
+        """LoadedModel untuk versi tertentu (dimuat sekali, disimpan LRU)"""
+        with self._lock:
+            if self._current is not None and self._current.version == version:
+                return self._current
+            if version in self._pinned:
+                self._pinned.move_to_end(version)
+                return self._pinned[version]
+        with self._load_lock:
+            loaded = self._load(version)
+        with self._lock:
+            self._pinned[version] = loaded
+            while len(self._pinned) > self.max_loaded:
+                self._pinned.popitem(last=False)
+        return loaded
+
+    def refresh(self):
+        """
+        Memuat versi terbaru jika berbeda dari versi aktif, lalu menukarnya
+        Returns:
+            bool: True jika versi aktif berganti
+        """
+        latest = self.registry.latest()
+        if latest is None or latest == self._active_version():
+            return False
+        # Pool baru dibangun di luar lock agar prediksi tidak tertahan selama loading
+        with self._load_lock:
+            # Watcher dan pemanggil current() bisa sampai di sini bersamaan
+            if latest == self._active_version():
+                return False
+            try:
+                loaded = self._load(latest)
+            except Exception as e:
+                self.last_error = f"{latest}: {e}"
+                return False
+        with self._lock:
+            self._current = loaded
+            self._pinned.pop(latest, None)
+            self.swaps += 1
+            self.last_error = None
+        return True
+
+    def _active_version(self):
+        with self._lock:
+            return self._current.version if self._current is not None else None
+
+    def versions(self):
+        return self.registry.versions()
+
+    def start_watcher(self, interval=5.0):
+        """Memulai thread yang memeriksa versi baru setiap interval detik"""
+        if self._watcher is not None:
+            return
+        def watch():
+            while not self._stop.wait(interval):
+                self.refresh()
+        self._watcher = threading.Thread(target=watch, name='model-registry-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Registry model berversi")
+    parser.add_argument('--registry', default=os.environ.get('GOLD_MODEL_REGISTRY', REGISTRY_DIR))
+    commands = parser.add_subparsers(dest='command', required=True)
+    publish = commands.add_parser('publish', help='Publikasikan artefak training sebagai versi baru')
+    publish.add_argument('source_dir')
+    publish.add_argument('--version')
+    commands.add_parser('list', help='Daftar versi')
+    verify = commands.add_parser('verify', help='Periksa checksum sebuah versi')
+    verify.add_argument('version')
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.registry)
+    try:
+        if args.command == 'publish':
+            print(registry.publish(args.source_dir, args.version))
+        elif args.command == 'list':
+            for version in registry.versions():
+                manifest = registry.manifest(version)
+                files = ', '.join(manifest['files'])
+                print(f"{version}  {manifest['created']}  {files}")
+        else:
+            registry.verify(args.version)
+            print(f"✓ {args.version}")
+    except RegistryError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
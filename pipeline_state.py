@@ -0,0 +1,76 @@
+"""
+State pipeline prediksi per sesi.
+
+Streamlit menjalankan ulang seluruh halaman setiap kali widget berubah.
+PipelineState menyimpan hasil setiap tahap (upload ter-parse, laporan
+validasi, data terurut, series ter-skala, hasil rollout) bersama key
+input-nya, sehingga pada rerun hanya tahap yang key-nya berubah yang
+dihitung ulang. Key tahap hilir selalu diturunkan dari key tahap hulu,
+jadi perubahan di hulu otomatis membuat tahap hilir dihitung ulang.
+Setiap lookup dicatat sebagai cache 'session' di metrics.
+
+Rollout bersifat autoregresif dan deterministik: prediksi 30 hari sama
+persis dengan 30 langkah pertama prediksi 90 hari. Karena itu hanya
+rollout terpanjang yang disimpan dan horizon yang lebih pendek diambil
+dari prefiksnya.
+"""
+import metrics
+
+
+class PipelineState:
+    """
+    Hasil tahap-tahap pipeline untuk satu sesi
+    Attributes:
+        hits, misses: Jumlah tahap yang dipakai ulang / dihitung
+    """
+    def __init__(self):
+        self._stages = {}
+        self.hits = 0
+        self.misses = 0
+
+    def stage(self, name, key, compute, valid=None):
+        """
+        Hasil tahap name untuk key; compute() hanya dipanggil jika key berubah
+        Args:
+            name: Nama tahap
+            key: Fingerprint semua input tahap
+            compute: Fungsi tanpa argumen yang menghitung hasil tahap
+            valid: Fungsi valid(hasil) -> bool; hasil yang gagal tidak disimpan
+                   sehingga dicoba lagi (dan pesan error tampil lagi) di rerun berikutnya
+        """
+        cached = self._stages.get(name)
+        metrics.cache_lookup('session', cached is not None and cached[0] == key)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        value = compute()
+        if valid is None or valid(value):
+            self._stages[name] = (key, value)
+        else:
+            self._stages.pop(name, None)
+        return value
+
+    def prefix(self, name, key, length):
+        """
+        length elemen pertama dari hasil terpanjang yang disimpan untuk key
+        Returns:
+            Prefiks hasil, atau None jika belum ada hasil yang cukup panjang
+        """
+        cached = self._stages.get(name)
+        hit = cached is not None and cached[0] == key and len(cached[1]) >= length
+        metrics.cache_lookup('session', hit)
+        if hit:
+            self.hits += 1
+            return cached[1][:length]
+        self.misses += 1
+        return None
+
+    def remember(self, name, key, value):
+        """Menyimpan hasil untuk key kecuali sudah ada hasil yang lebih panjang"""
+        cached = self._stages.get(name)
+        if cached is None or cached[0] != key or len(cached[1]) < len(value):
+            self._stages[name] = (key, value)
+
+    def clear(self):
+        self._stages.clear()
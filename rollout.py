@@ -0,0 +1,192 @@
+import time
+
+import numpy as np
+
+import metrics
+
+
+class RolloutError(Exception):
+    """
+    Kegagalan pada salah satu langkah rollout
+    Attributes:
+        step: Indeks langkah (0-based) yang gagal
+        partial: Hasil prediksi ter-skala sebelum langkah yang gagal
+    """
+    def __init__(self, step, partial, cause):
+        super().__init__(f"Error pada prediksi hari ke-{step + 1}: {cause}")
+        self.step = step
+        self.partial = partial
+
+
+class RolloutEngine:
+    """
+    Mesin rollout autoregresif yang bekerja sepenuhnya di ruang ter-skala.
+
+    Indeks tensor input/output dibaca sekali saat engine dibuat. Window
+    disimpan dalam ring buffer float32 yang dicerminkan (panjang 2 x window),
+    sehingga window aktif selalu berupa view tanpa alokasi baru di setiap
+    langkah. Beberapa series dapat dimajukan bersama dalam satu invoke
+    dengan mengubah ukuran batch tensor input. Hasil dikembalikan dalam
+    skala model; inverse transform cukup dilakukan sekali oleh pemanggil
+    pada vektor akhir. Untuk model dengan input/output int8 (kuantisasi
+    full-integer) nilai dikuantisasi tepat sebelum invoke dan
+    didekuantisasi tepat sesudahnya, sehingga window tetap float32.
+    """
+    def __init__(self, interpreter, sequence_length=60):
+        self.interpreter = interpreter
+        self.sequence_length = sequence_length
+
+        input_details = interpreter.get_input_details()[0]
+        output_details = interpreter.get_output_details()[0]
+        self._input_index = input_details['index']
+        self._output_index = output_details['index']
+        self._input_dtype = input_details['dtype']
+        self._input_quantization = input_details['quantization']
+        self._output_quantization = output_details['quantization'] \
+            if np.issubdtype(output_details['dtype'], np.integer) else None
+        self._batch_size = int(input_details['shape'][0])
+        # Model dengan batch dinamis memiliki shape_signature -1 di dimensi batch
+        shape_signature = input_details.get('shape_signature', input_details['shape'])
+        self.dynamic_batch = int(shape_signature[0]) == -1
+
+        self._buffer = np.zeros((self._batch_size, 2 * sequence_length), dtype=np.float32)
+        self._head = 0
+        # Durasi invoke dikumpulkan lalu dicatat ke metrics sekali per rollout
+        self._invoke_times = []
+
+    def _ensure_batch(self, batch_size):
+        if self.dynamic_batch and batch_size != self._batch_size:
+            self.interpreter.resize_tensor_input(self._input_index,
+                                                 [batch_size, self.sequence_length, 1])
+            self.interpreter.allocate_tensors()
+            self._batch_size = batch_size
+        if self._buffer.shape[0] != batch_size:
+            self._buffer = np.zeros((batch_size, 2 * self.sequence_length), dtype=np.float32)
+
+    def _load_windows(self, windows):
+        windows = np.asarray(windows, dtype=np.float32).reshape(len(windows), -1)
+        if windows.shape[1] != self.sequence_length:
+            raise ValueError(f"Dibutuhkan {self.sequence_length} timesteps tetapi mendapat {windows.shape[1]}")
+        self._ensure_batch(windows.shape[0])
+        self._buffer[:, :self.sequence_length] = windows
+        self._buffer[:, self.sequence_length:] = windows
+        self._head = 0
+
+    def _invoke(self, current_window):
+        if np.issubdtype(self._input_dtype, np.integer):
+            scale, zero_point = self._input_quantization
+            info = np.iinfo(self._input_dtype)
+            current_window = np.clip(np.round(current_window / scale) + zero_point,
+                                     info.min, info.max).astype(self._input_dtype)
+        self.interpreter.set_tensor(self._input_index, current_window)
+        start = time.perf_counter()
+        self.interpreter.invoke()
+        self._invoke_times.append(time.perf_counter() - start)
+        values = self.interpreter.get_tensor(self._output_index)[:, 0]
+        if self._output_quantization is not None:
+            scale, zero_point = self._output_quantization
+            values = (values.astype(np.float32) - zero_point) * scale
+        return values
+
+    def _invoke_chunk(self, chunk):
+        count = len(chunk)
+        if count == self._batch_size:
+            return self._invoke(chunk)
+        # Potongan terakhir lebih kecil dari batch tetap model: diisi nol sampai
+        # ukuran batch, output baris pengisi dibuang
+        padded = np.zeros((self._batch_size,) + chunk.shape[1:], dtype=chunk.dtype)
+        padded[:count] = chunk
+        return self._invoke(padded)[:count]
+
+    def _step(self, noise=None):
+        length = self.sequence_length
+        head = self._head
+        series = self._buffer.shape[0]
+        current_window = self._buffer[:, head:head + length].reshape(series, length, 1)
+
+        if series == self._batch_size:
+            values = self._invoke(current_window)
+        else:
+            # Model dengan batch tetap: invoke per series pada langkah yang sama
+            values = np.concatenate([
+                self._invoke_chunk(current_window[n:n + self._batch_size])
+                for n in range(0, series, self._batch_size)
+            ])
+        if noise is not None:
+            values = values + noise
+
+        # Geser window: nilai terlama di posisi head diganti nilai baru
+        # pada kedua salinan cermin
+        self._buffer[:, head] = values
+        self._buffer[:, head + length] = values
+        self._head = (head + 1) % length
+        return values
+
+    def iter_batch(self, windows, steps, noise=None):
+        """
+        Rollout beberapa series sebagai generator: setiap langkah di-yield
+        begitu selesai sehingga pemanggil bisa menampilkan hasil bertahap
+        atau berhenti lebih awal
+        Args:
+            windows: Window ter-skala berbentuk (N, sequence_length, 1)
+            steps: Jumlah langkah prediksi
+            noise: Gangguan ter-skala berbentuk (N, steps) yang ditambahkan ke
+                output setiap langkah sebelum diumpankan kembali (opsional)
+        Yields:
+            np.ndarray: Prediksi ter-skala langkah ini berbentuk (N,)
+        Returns:
+            np.ndarray: Seluruh prediksi ter-skala berbentuk (N, steps)
+        """
+        self._load_windows(windows)
+        outputs = np.empty((self._buffer.shape[0], steps), dtype=np.float32)
+        if noise is not None:
+            noise = np.asarray(noise, dtype=np.float32).reshape(outputs.shape)
+        try:
+            for i in range(steps):
+                try:
+                    outputs[:, i] = self._step(None if noise is None else noise[:, i])
+                except Exception as e:
+                    raise RolloutError(i, outputs[:, :i].copy(), e) from e
+                yield outputs[:, i]
+        finally:
+            # Juga saat rollout gagal atau generator ditutup lebih awal (job dibatalkan)
+            self._flush_metrics()
+        return outputs
+
+    def _flush_metrics(self):
+        if self._invoke_times:
+            metrics.observe_many(metrics.STAGE_METRIC, self._invoke_times, stage='invoke')
+            metrics.count('gold_interpreter_invokes_total', len(self._invoke_times))
+            self._invoke_times = []
+
+    def run_batch(self, windows, steps, noise=None):
+        """
+        Menjalankan rollout untuk beberapa series sekaligus
+        Args:
+            windows: Window ter-skala berbentuk (N, sequence_length, 1)
+            steps: Jumlah langkah prediksi
+            noise: Gangguan ter-skala berbentuk (N, steps), lihat iter_batch
+        Returns:
+            np.ndarray: Prediksi ter-skala berbentuk (N, steps)
+        """
+        rollout = self.iter_batch(windows, steps, noise)
+        while True:
+            try:
+                next(rollout)
+            except StopIteration as done:
+                return done.value
+
+    def run(self, window, steps):
+        """
+        Menjalankan rollout dari satu window ter-skala
+        Args:
+            window: Window ter-skala dengan panjang sequence_length
+            steps: Jumlah langkah prediksi
+        Returns:
+            np.ndarray: Prediksi ter-skala berbentuk (steps,)
+        """
+        window = np.asarray(window, dtype=np.float32).reshape(1, -1)
+        try:
+            return self.run_batch(window, steps)[0]
+        except RolloutError as e:
+            raise RolloutError(e.step, e.partial[0], e.__cause__) from e.__cause__
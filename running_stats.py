@@ -0,0 +1,272 @@
+"""
+Statistik ringkasan inkremental untuk dataset historis yang terus bertambah.
+
+RunningStats menyimpan momen berjalan per kolom dan per pasangan kolom
+(jumlah data, rata-rata, M2 dan co-moment gaya Welford, digabung per
+batch dengan rumus Chan dkk.), nilai minimum/maksimum beserta tanggalnya,
+serta sketch kuantil per kolom. Hanya baris baru yang diproses saat data
+bertambah, dan tabel describe() maupun matriks korelasi dihitung dari
+state berukuran tetap, tidak bergantung pada panjang histori.
+
+Korelasi bersifat pairwise seperti DataFrame.corr(): setiap pasangan
+memakai baris yang kedua nilainya tersedia.
+"""
+import copy
+import os
+import pickle
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ingest import file_lock
+
+STATS_FILE = 'running_stats.pkl'
+STATS_VERSION = 1
+
+_loaded_lock = threading.Lock()
+_loaded_stats = {}
+
+
+class QuantileSketch:
+    """
+    Sketch kuantil bertingkat (compactor ala MRL/KLL) dengan kapasitas k per level.
+
+    Selama jumlah data <= k semua nilai disimpan dan kuantil dihitung exact
+    (interpolasi linear seperti pandas). Setelah itu level yang penuh
+    diurutkan lalu separuh nilainya dipromosikan ke level berikutnya dengan
+    bobot dua kali lipat, sehingga memori O(k log(n/k)).
+    """
+    def __init__(self, k=4096):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        # Offset ganjil/genap bergantian per level agar hasil deterministik tanpa bias
+        self._offsets = []
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) > self.k:
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                    self._offsets.append(0)
+                items = np.sort(self.levels[h])
+                # Jumlah ganjil: satu item tetap di level ini agar bobot total terjaga
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                offset = self._offsets[h]
+                self._offsets[h] ^= 1
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], pairs[offset::2]])
+                self.levels[h] = keep
+            h += 1
+
+    @property
+    def exact(self):
+        return len(self.levels) == 1
+
+    def quantile(self, q):
+        """Estimasi kuantil q (skalar atau array di [0, 1])"""
+        if not self.count:
+            return np.full(np.shape(q), np.nan)
+        if self.exact:
+            return np.quantile(self.levels[0], q)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, weights = items[order], weights[order]
+        # Posisi tengah setiap item pada distribusi kumulatif berbobot
+        cumulative = (np.cumsum(weights) - weights / 2) / weights.sum()
+        return np.interp(q, cumulative, items)
+
+
+class RunningStats:
+    """
+    Momen berjalan, ekstrem dan sketch kuantil untuk sekumpulan kolom
+    Attributes:
+        columns: Nama kolom
+        rows: Jumlah baris yang sudah diproses
+        last_index: Nilai index baris terakhir yang diproses (untuk deteksi data berubah)
+    """
+    def __init__(self, columns, sketch_size=4096):
+        k = len(columns)
+        self.columns = list(columns)
+        self.rows = 0
+        self.last_index = None
+        # Matriks pasangan: [i, j] dihitung dari baris di mana kolom i dan j tersedia
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))      # rata-rata kolom i pada baris pasangan (i, j)
+        self.m2 = np.zeros((k, k))        # M2 kolom i pada baris pasangan (i, j)
+        self.comoment = np.zeros((k, k))
+        self.min = np.full(k, np.nan)
+        self.max = np.full(k, np.nan)
+        self.min_index = [None] * k
+        self.max_index = [None] * k
+        self.sketches = [QuantileSketch(sketch_size) for _ in range(k)]
+
+    def update(self, values, index=None):
+        """
+        Menambahkan batch baris baru
+        Args:
+            values: Array (n, k) sesuai urutan columns; NaN = tidak tersedia
+            index: Label baris (mis. tanggal) untuk mencatat posisi min/max
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(self.columns))
+        if not len(values):
+            return
+        valid = np.isfinite(values)
+        valid_f = valid.astype(np.float64)
+
+        # Geser dengan rata-rata batch agar perkalian tidak kehilangan presisi
+        with np.errstate(invalid='ignore'):
+            shift = np.nanmean(np.where(valid, values, np.nan), axis=0)
+        shift = np.nan_to_num(shift)
+        centered = np.where(valid, values - shift, 0.0)
+
+        n_b = valid_f.T @ valid_f
+        sums = centered.T @ valid_f                      # [i, j] = jumlah x_i pada baris pasangan
+        squares = (centered ** 2).T @ valid_f
+        products = centered.T @ centered
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_b = np.where(n_b > 0, sums / n_b, 0.0)
+        m2_b = squares - n_b * mean_b ** 2
+        comoment_b = products - n_b * mean_b * mean_b.T
+        mean_b = mean_b + shift[:, None]
+
+        # Penggabungan dua kelompok (Chan dkk.)
+        n_a = self.n
+        total = n_a + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(total > 0, n_a * n_b / total, 0.0)
+            ratio = np.where(total > 0, n_b / total, 0.0)
+        delta = mean_b - self.mean
+        self.comoment = self.comoment + comoment_b + delta * delta.T * weight
+        self.m2 = self.m2 + m2_b + delta ** 2 * weight
+        self.mean = self.mean + delta * ratio
+        self.n = total
+
+        self._update_extremes(values, valid, index)
+        for column, sketch in enumerate(self.sketches):
+            sketch.update(values[valid[:, column], column])
+        self.rows += len(values)
+        if index is not None and len(index):
+            self.last_index = index[-1]
+
+    def _update_extremes(self, values, valid, index):
+        has_value = valid.any(axis=0)
+        if not has_value.any():
+            return
+        with np.errstate(invalid='ignore'):
+            batch_max = np.where(valid, values, -np.inf)
+            batch_min = np.where(valid, values, np.inf)
+        max_pos, min_pos = batch_max.argmax(axis=0), batch_min.argmin(axis=0)
+        for column in np.flatnonzero(has_value):
+            value = values[max_pos[column], column]
+            if np.isnan(self.max[column]) or value > self.max[column]:
+                self.max[column] = value
+                self.max_index[column] = index[max_pos[column]] if index is not None else None
+            value = values[min_pos[column], column]
+            if np.isnan(self.min[column]) or value < self.min[column]:
+                self.min[column] = value
+                self.min_index[column] = index[min_pos[column]] if index is not None else None
+
+    def describe(self, percentiles=(0.25, 0.5, 0.75)):
+        """Tabel setara DataFrame.describe() dari state (kuantil dari sketch)"""
+        counts = np.diag(self.n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.diag(self.m2) / (counts - 1))
+        std = np.where(counts > 1, std, np.nan)
+        mean = np.where(counts > 0, np.diag(self.mean), np.nan)
+        quantiles = np.array([sketch.quantile(list(percentiles)) for sketch in self.sketches]).T
+        labels = [f"{p * 100:g}%" for p in percentiles]
+        rows = [counts, mean, std, self.min] + list(quantiles) + [self.max]
+        return pd.DataFrame(rows, index=['count', 'mean', 'std', 'min'] + labels + ['max'],
+                            columns=self.columns)
+
+    def corr(self):
+        """Matriks korelasi Pearson pairwise dari co-moment"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        corr = np.where(self.n > 1, corr, np.nan)
+        np.fill_diagonal(corr, np.where(np.diag(self.m2) > 0, 1.0, np.nan))
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=self.columns, columns=self.columns)
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': STATS_VERSION, 'stats': self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """State tersimpan, atau None jika tidak ada/rusak/versi lama"""
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+            return None
+        if not isinstance(state, dict) or state.get('version') != STATS_VERSION:
+            return None
+        return state['stats']
+
+
+def _matches(stats, table):
+    """State masih merupakan prefiks dari tabel (tidak ada penulisan ulang data)"""
+    if stats is None or stats.columns != list(table.columns) or stats.rows > len(table):
+        return False
+    if stats.rows == 0 or table.index is None:
+        return True
+    return table.index[stats.rows - 1] == stats.last_index
+
+
+def ensure_stats(ingestor, table, batch_rows=1_000_000):
+    """
+    Memperbarui statistik tersimpan dengan baris baru dari cache kolumnar
+    Args:
+        ingestor: CsvIngestor pemilik store (lokasi state dan kunci)
+        table: ColumnarTable versi terkini
+        batch_rows: Jumlah baris per batch saat memproses histori panjang
+    Returns:
+        RunningStats
+    """
+    path = os.path.join(ingestor.store_dir, STATS_FILE)
+    # State yang sudah dimuat di proses ini dipakai ulang tanpa membaca disk
+    with _loaded_lock:
+        stats = cached = _loaded_stats.get(path)
+    if _matches(stats, table) and stats.rows == len(table):
+        return stats
+
+    with file_lock(ingestor.lock_path):
+        # Proses lain mungkin sudah memperbarui state di disk lebih jauh
+        disk_stats = RunningStats.load(path)
+        if _matches(disk_stats, table) and (not _matches(stats, table) or disk_stats.rows > stats.rows):
+            stats = disk_stats
+        if not _matches(stats, table):
+            stats = RunningStats(table.columns)
+        if stats.rows == len(table):
+            with _loaded_lock:
+                _loaded_stats[path] = stats
+            return stats
+
+        if stats is cached:
+            # Objek di cache sedang dibaca sesi lain: baris baru diterapkan ke salinan,
+            # yang baru menggantikan cache setelah save berhasil
+            stats = copy.deepcopy(stats)
+        for start in range(stats.rows, len(table), batch_rows):
+            stop = min(start + batch_rows, len(table))
+            values = np.column_stack([table[column][start:stop] for column in table.columns])
+            index = table.index[start:stop] if table.index is not None else None
+            stats.update(values, index)
+        stats.save(path)
+    with _loaded_lock:
+        _loaded_stats[path] = stats
+    return stats
@@ -0,0 +1,190 @@
+"""
+Registry scaler per kolom untuk prediksi multi-aset.
+
+Setiap kolom (SPX, GLD, USO, SLV, EUR/USD, maupun kolom hasil upload)
+memiliki scaler affine MinMax (0, 1) sendiri. Semua kolom di-fit dalam
+satu pass vektor (nanmin/nanmax per kolom) dan disimpan bersama dalam
+satu file .npz tanpa pickle, sehingga dimuat dalam hitungan milidetik.
+ColumnScaler kompatibel dengan transform/inverse_transform milik
+MinMaxScaler, jadi bisa dipakai langsung oleh forecast_core.
+"""
+import os
+
+import numpy as np
+
+import fingerprint
+
+REGISTRY_FILE = 'scalers.npz'
+
+
+class ColumnScaler:
+    """
+    Scaler MinMax (0, 1) untuk satu kolom
+    Attributes:
+        column: Nama kolom
+        data_min, data_max: Rentang data saat fit
+        fingerprint: Key yang mewakili parameter scaler (untuk cache)
+    """
+    def __init__(self, column, data_min, data_max):
+        self.column = column
+        self.data_min = float(data_min)
+        self.data_max = float(data_max)
+        data_range = self.data_max - self.data_min
+        # Sama seperti MinMaxScaler: rentang nol tidak diskalakan
+        self.scale = 1.0 / data_range if data_range > 0 else 1.0
+        self.fingerprint = fingerprint.combine('minmax', column, self.data_min, self.data_max)
+
+    @classmethod
+    def fit(cls, column, values):
+        values = np.asarray(values, dtype=np.float64)
+        return cls(column, np.nanmin(values), np.nanmax(values))
+
+    def transform(self, values):
+        return (np.asarray(values, dtype=np.float64) - self.data_min) * self.scale
+
+    def inverse_transform(self, values):
+        return np.asarray(values, dtype=np.float64) / self.scale + self.data_min
+
+    def __repr__(self):
+        return f"ColumnScaler({self.column!r}, {self.data_min:g}, {self.data_max:g})"
+
+
+class ScalerRegistry:
+    """
+    Kumpulan ColumnScaler yang disimpan sebagai array parameter
+    Attributes:
+        columns: Nama kolom
+        data_min, data_max: Array rentang per kolom (urut sesuai columns)
+    """
+    def __init__(self, columns=(), data_min=(), data_max=()):
+        self.columns = [str(column) for column in columns]
+        # Selalu disalin: set() mengubah array di tempat, dan array asal bisa milik
+        # objek lain (mis. min/max RunningStats historis di from_stats)
+        self.data_min = np.array(data_min, dtype=np.float64, copy=True)
+        self.data_max = np.array(data_max, dtype=np.float64, copy=True)
+        self._positions = {column: i for i, column in enumerate(self.columns)}
+
+    @classmethod
+    def fit(cls, values, columns):
+        """
+        Fit semua kolom sekaligus
+        Args:
+            values: Array (n, k) atau DataFrame; NaN diabaikan
+            columns: Nama k kolom
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(columns))
+        with np.errstate(invalid='ignore'):
+            return cls(columns, np.nanmin(values, axis=0), np.nanmax(values, axis=0))
+
+    @classmethod
+    def fit_frame(cls, df):
+        """Fit semua kolom numerik sebuah DataFrame"""
+        numeric = df.select_dtypes(include=[np.number])
+        return cls.fit(numeric.to_numpy(dtype=np.float64), numeric.columns)
+
+    @classmethod
+    def fit_csv(cls, path, exclude=('Date',), chunksize=1_000_000):
+        """
+        Fit semua kolom numerik CSV per chunk, tanpa memuat seluruh file
+        Args:
+            exclude: Kolom yang dilewati (mis. kolom tanggal)
+        """
+        import pandas as pd
+
+        registry = None
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            chunk = chunk.drop(columns=[c for c in exclude if c in chunk.columns])
+            values = chunk.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+            with np.errstate(invalid='ignore'):
+                part_min, part_max = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+            if registry is None:
+                registry = cls(chunk.columns, part_min, part_max)
+            else:
+                registry.data_min = np.fmin(registry.data_min, part_min)
+                registry.data_max = np.fmax(registry.data_max, part_max)
+        registry = registry or cls()
+        # Kolom tanpa satu pun nilai numerik tidak dimasukkan
+        valid = np.isfinite(registry.data_min)
+        return cls(np.array(registry.columns, dtype=object)[valid], registry.data_min[valid],
+                   registry.data_max[valid])
+
+    @classmethod
+    def from_stats(cls, stats):
+        """Registry dari RunningStats (min/max sudah tersedia, tanpa membaca data lagi)"""
+        return cls(stats.columns, stats.min, stats.max)
+
+    def __contains__(self, column):
+        return column in self._positions
+
+    def __len__(self):
+        return len(self.columns)
+
+    def scaler(self, column):
+        """
+        ColumnScaler untuk satu kolom
+        Raises:
+            KeyError: Jika kolom tidak ada di registry
+        """
+        i = self._positions[column]
+        return ColumnScaler(column, self.data_min[i], self.data_max[i])
+
+    def scaler_for(self, column, values):
+        """ColumnScaler dari registry, atau di-fit dari values untuk kolom yang belum terdaftar"""
+        if column in self:
+            return self.scaler(column)
+        return ColumnScaler.fit(column, values)
+
+    def set(self, column, data_min, data_max):
+        """Menambahkan atau mengganti parameter satu kolom"""
+        if column in self:
+            i = self._positions[column]
+            self.data_min[i], self.data_max[i] = data_min, data_max
+        else:
+            self._positions[column] = len(self.columns)
+            self.columns.append(column)
+            self.data_min = np.append(self.data_min, data_min)
+            self.data_max = np.append(self.data_max, data_max)
+
+    def transform(self, values, columns=None):
+        """Men-skala array (n, k) yang kolomnya sesuai columns (default: semua kolom registry)"""
+        data_min, scale = self._params(columns)
+        return (np.asarray(values, dtype=np.float64) - data_min) * scale
+
+    def inverse_transform(self, values, columns=None):
+        data_min, scale = self._params(columns)
+        return np.asarray(values, dtype=np.float64) / scale + data_min
+
+    def _params(self, columns):
+        positions = [self._positions[c] for c in columns] if columns is not None else slice(None)
+        data_min, data_max = self.data_min[positions], self.data_max[positions]
+        data_range = data_max - data_min
+        with np.errstate(divide='ignore'):
+            return data_min, np.where(data_range > 0, 1.0 / data_range, 1.0)
+
+    def save(self, path=REGISTRY_FILE):
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, columns=np.array(self.columns, dtype=str),
+                 data_min=self.data_min, data_max=self.data_max)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=REGISTRY_FILE):
+        """
+        Raises:
+            FileNotFoundError: Jika file registry belum ada
+        """
+        with np.load(path, allow_pickle=False) as state:
+            return cls(state['columns'].tolist(), state['data_min'], state['data_max'])
+
+
+def load_registry(path=REGISTRY_FILE, legacy_path=None):
+    """
+    Registry dari path (jika ada); scaler.pkl lama di legacy_path dilatih
+    pada GLD, jadi hanya dipakai untuk GLD jika GLD belum ada di registry
+    """
+    registry = ScalerRegistry.load(path) if path and os.path.exists(path) else ScalerRegistry()
+    if legacy_path and os.path.exists(legacy_path) and 'GLD' not in registry:
+        import forecast_core
+        legacy = forecast_core.load_scaler_file(legacy_path)
+        registry.set('GLD', legacy.data_min_[0], legacy.data_max_[0])
+    return registry
@@ -0,0 +1,290 @@
+"""
+Pipeline pelatihan dan ekspor model.tflite + scaler.pkl.
+
+Scaler MinMax di-fit pada kolom yang dipilih (default GLD), lalu window
+60 langkah dibangun secara lazy dengan tf.data: yang disimpan hanya
+series ter-skala satu dimensi, dan setiap batch mengambil window-nya
+dengan tf.gather dari indeks awal window. Tidak ada array X berukuran
+(N, 60, 1) yang dimaterialisasi, sehingga memori tumbuh linear dengan
+panjang series, bukan 60 kali lipat.
+
+Validasi memakai bagian akhir series (kronologis). LSTM di-unroll agar
+hasil konversi TFLite hanya berisi op bawaan (tanpa Flex/TensorList) dan
+batch tetap dinamis untuk rollout berbatch. Hasil ekspor (nama file
+varian mengikuti interpreter_pool.MODEL_VARIANTS):
+    model.tflite                float32
+    model_float16.tflite        bobot float16
+    model_int8_dynamic.tflite   kuantisasi dynamic range (bobot int8)
+    model_int8_full.tflite      full-integer dengan input/output int8,
+                                dikalibrasi dengan window data latih
+    scaler.pkl                  scaler kolom yang dilatih
+    scalers.npz                 scaler per kolom untuk semua kolom numerik CSV
+    training_manifest.json      hash data, hyperparameter, metrik, waktu, checksum artefak
+
+Contoh:
+    python train_model.py --column GLD --epochs 100 --output-dir .
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import platform
+import sys
+import time
+
+import numpy as np
+
+import forecast_core
+from forecast_cache import file_digest
+from interpreter_pool import MODEL_VARIANTS
+from scaler_registry import REGISTRY_FILE, ScalerRegistry
+
+MANIFEST_FILE = 'training_manifest.json'
+# Jumlah window data latih untuk kalibrasi kuantisasi full-integer
+CALIBRATION_WINDOWS = 500
+
+
+def fit_scaler(values):
+    """MinMaxScaler (0, 1) yang di-fit pada satu kolom"""
+    from sklearn.preprocessing import MinMaxScaler
+    return MinMaxScaler(feature_range=(0, 1)).fit(np.asarray(values, dtype=np.float64).reshape(-1, 1))
+
+
+def window_dataset(series, start, stop, sequence_length=forecast_core.SEQUENCE_LENGTH, batch_size=32,
+                   shuffle=False, seed=0):
+    """
+    Dataset (window, target) untuk window yang targetnya berada di [start, stop)
+    Args:
+        series: tf.Tensor float32 (n,) ter-skala, dibagi oleh semua dataset
+        start, stop: Rentang indeks target; window = series[t-sequence_length:t]
+        shuffle: Acak urutan window (seed tetap agar dapat diulang)
+    """
+    import tensorflow as tf
+
+    offsets = tf.range(-sequence_length, 0, dtype=tf.int64)
+    targets = tf.data.Dataset.range(max(start, sequence_length), stop)
+    if shuffle:
+        targets = targets.shuffle(stop - start, seed=seed, reshuffle_each_iteration=True)
+
+    def gather(target_index):
+        windows = tf.gather(series, target_index[:, None] + offsets)
+        return windows[..., None], tf.gather(series, target_index)
+
+    return (targets.batch(batch_size)
+            .map(gather, num_parallel_calls=tf.data.AUTOTUNE, deterministic=True)
+            .prefetch(tf.data.AUTOTUNE))
+
+
+def build_model(sequence_length=forecast_core.SEQUENCE_LENGTH, units=50, dropout=0.2):
+    """LSTM dua lapis dengan output satu nilai ter-skala"""
+    import tensorflow as tf
+
+    model = tf.keras.Sequential([
+        tf.keras.Input((sequence_length, 1)),
+        tf.keras.layers.LSTM(units, return_sequences=True, unroll=True),
+        tf.keras.layers.Dropout(dropout),
+        tf.keras.layers.LSTM(units, unroll=True),
+        tf.keras.layers.Dropout(dropout),
+        tf.keras.layers.Dense(1),
+    ])
+    model.compile(optimizer='adam', loss='mse', metrics=['mae'])
+    return model
+
+
+def convert_model(model, variant='float32', calibration_data=None):
+    """
+    Konversi model Keras ke bytes TFLite
+    Args:
+        variant: Salah satu kunci MODEL_VARIANTS
+        calibration_data: tf.data.Dataset (window, target) ber-batch 1, wajib untuk int8_full
+    """
+    import tensorflow as tf
+
+    if variant not in MODEL_VARIANTS:
+        raise ValueError(f"Varian model '{variant}' tidak dikenal")
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if variant != 'float32':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if variant == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == 'int8_full':
+        def representative_dataset():
+            for window, _ in calibration_data.take(CALIBRATION_WINDOWS):
+                yield [window]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    return converter.convert()
+
+
+def _write_bytes(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return {'file': os.path.basename(path), 'bytes': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+
+
+def _epoch_timer(durations):
+    """Callback Keras yang mencatat durasi setiap epoch ke list durations"""
+    import tensorflow as tf
+
+    marks = {}
+    return tf.keras.callbacks.LambdaCallback(
+        on_epoch_begin=lambda epoch, logs: marks.__setitem__('start', time.perf_counter()),
+        on_epoch_end=lambda epoch, logs: durations.append(time.perf_counter() - marks['start']),
+    )
+
+
+def train(csv_path='gld_price_data.csv', column='GLD', date_column='Date', output_dir='.', epochs=100,
+          batch_size=32, units=50, dropout=0.2, validation_fraction=0.1, patience=None, seed=42,
+          threads=None, variants=tuple(MODEL_VARIANTS)):
+    """
+    Melatih model dan menulis artefak ke output_dir
+    Args:
+        variants: Varian TFLite yang diekspor (float32 selalu disertakan)
+    Returns:
+        dict: Isi manifest yang ditulis
+    """
+    import tensorflow as tf
+
+    timings = {}
+    start = time.perf_counter()
+    tf.keras.utils.set_random_seed(seed)
+    tf.config.experimental.enable_op_determinism()
+    if threads:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(threads)
+
+    values, dates = forecast_core.load_series(csv_path, column, date_column)
+    sequence_length = forecast_core.SEQUENCE_LENGTH
+    if len(values) < sequence_length + 2:
+        raise ValueError(f"Data terlalu sedikit. Minimal {sequence_length + 2} data point diperlukan.")
+    timings['load_s'] = time.perf_counter() - start
+
+    scaler = fit_scaler(values)
+    series = tf.constant(scaler.transform(values.reshape(-1, 1)).ravel(), dtype=tf.float32)
+    del values
+    split = len(series) - max(int((len(series) - sequence_length) * validation_fraction), 1)
+    train_data = window_dataset(series, 0, split, batch_size=batch_size, shuffle=True, seed=seed)
+    val_data = window_dataset(series, split, len(series), batch_size=batch_size)
+
+    model = build_model(sequence_length, units, dropout)
+    epoch_durations = []
+    callbacks = [_epoch_timer(epoch_durations)]
+    if patience:
+        callbacks.append(tf.keras.callbacks.EarlyStopping(patience=patience, restore_best_weights=True))
+    fit_start = time.perf_counter()
+    history = model.fit(train_data, validation_data=val_data, epochs=epochs, callbacks=callbacks, verbose=2)
+    timings['fit_s'] = time.perf_counter() - fit_start
+    timings['epoch_s'] = epoch_durations
+
+    export_start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    calibration_data = window_dataset(series, 0, split, batch_size=1, shuffle=True, seed=seed)
+    artifacts = {}
+    timings['export_variant_s'] = {}
+    for variant in MODEL_VARIANTS:
+        if variant != 'float32' and variant not in variants:
+            continue
+        variant_start = time.perf_counter()
+        artifacts[variant] = _write_bytes(os.path.join(output_dir, MODEL_VARIANTS[variant]),
+                                          convert_model(model, variant, calibration_data))
+        timings['export_variant_s'][variant] = time.perf_counter() - variant_start
+    artifacts['scaler'] = _write_bytes(os.path.join(output_dir, 'scaler.pkl'),
+                                       pickle.dumps(scaler, protocol=pickle.HIGHEST_PROTOCOL))
+    # Kolom yang dilatih memakai rentang yang persis sama dengan scaler.pkl
+    registry = ScalerRegistry.fit_csv(csv_path, exclude=(date_column,))
+    registry.set(column, scaler.data_min_[0], scaler.data_max_[0])
+    registry_path = os.path.join(output_dir, REGISTRY_FILE)
+    registry.save(registry_path)
+    artifacts['scalers'] = {'file': REGISTRY_FILE, 'bytes': os.path.getsize(registry_path),
+                            'sha256': file_digest(registry_path), 'columns': registry.columns}
+    timings['export_s'] = time.perf_counter() - export_start
+    timings['total_s'] = time.perf_counter() - start
+
+    manifest = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'data': {
+            'file': os.path.basename(csv_path),
+            'sha256': file_digest(csv_path),
+            'column': column,
+            'rows': int(len(series)),
+            'first_date': str(dates[0])[:10],
+            'last_date': str(dates[-1])[:10],
+            'train_windows': int(split - sequence_length),
+            'validation_windows': int(len(series) - split),
+        },
+        'scaler': {'data_min': float(scaler.data_min_[0]), 'data_max': float(scaler.data_max_[0])},
+        'params': {
+            'sequence_length': sequence_length, 'epochs': epochs, 'epochs_run': len(epoch_durations),
+            'batch_size': batch_size, 'units': units, 'dropout': dropout,
+            'validation_fraction': validation_fraction, 'patience': patience, 'seed': seed,
+            'calibration_windows': CALIBRATION_WINDOWS if 'int8_full' in artifacts else 0,
+        },
+        'metrics': {name: [float(v) for v in values] for name, values in history.history.items()},
+        'timings': timings,
+        'artifacts': artifacts,
+        'environment': {'python': platform.python_version(), 'tensorflow': tf.__version__,
+                        'numpy': np.__version__},
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Melatih model LSTM dan mengekspor model.tflite + scaler.pkl")
+    parser.add_argument('--csv', default='gld_price_data.csv')
+    parser.add_argument('--date-column', default='Date')
+    parser.add_argument('--column', default='GLD', help='Kolom harga yang dipelajari')
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--units', type=int, default=50, help='Unit per lapisan LSTM')
+    parser.add_argument('--dropout', type=float, default=0.2)
+    parser.add_argument('--validation-fraction', type=float, default=0.1)
+    parser.add_argument('--patience', type=int, help='Early stopping pada val_loss (default: nonaktif)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--threads', type=int, help='Thread TensorFlow (default: semua core)')
+    parser.add_argument('--variants', default=','.join(MODEL_VARIANTS),
+                        help='Varian TFLite yang diekspor, dipisah koma')
+    parser.add_argument('--publish', metavar='REGISTRY_DIR', nargs='?', const='models',
+                        help='Publikasikan hasil sebagai versi baru di registry model (default: models)')
+    args = parser.parse_args(argv)
+
+    variants = [v.strip() for v in args.variants.split(',') if v.strip()]
+    unknown = [v for v in variants if v not in MODEL_VARIANTS]
+    if unknown:
+        parser.error(f"Varian tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(MODEL_VARIANTS)}")
+
+    try:
+        manifest = train(args.csv, args.column, args.date_column, args.output_dir, args.epochs,
+                         args.batch_size, args.units, args.dropout, args.validation_fraction,
+                         args.patience, args.seed, args.threads, variants)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    metrics, timings = manifest['metrics'], manifest['timings']
+    print(f"Selesai dalam {timings['total_s']:.1f}s (fit {timings['fit_s']:.1f}s, "
+          f"ekspor {timings['export_s']:.1f}s) — loss {metrics['loss'][-1]:.6f}, "
+          f"val_loss {metrics['val_loss'][-1]:.6f}, val_mae {metrics['val_mae'][-1]:.6f}")
+    for artifact in manifest['artifacts'].values():
+        print(f"  {artifact['file']:<26} {artifact['bytes'] / 1024:8.1f} KB  {artifact['sha256'][:12]}")
+
+    if args.publish:
+        from model_registry import ModelRegistry, RegistryError
+        try:
+            version = ModelRegistry(args.publish).publish(args.output_dir)
+        except (OSError, RegistryError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        print(f"Dipublikasikan sebagai versi {version} di {args.publish}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
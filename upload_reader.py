@@ -0,0 +1,87 @@
+"""
+Pembacaan file CSV upload dalam dua tahap.
+
+read_preview() hanya mem-parse header dan beberapa baris pertama, cukup
+untuk pilihan kolom dan tabel preview. Setelah kolom tanggal dan harga
+dipilih, read_columns() membaca kedua kolom itu saja dengan parser CSV
+Arrow (pyarrow.csv, multithread) dan tipe eksplisit: tanggal sebagai
+string (diparse kemudian dengan format yang terdeteksi saat validasi)
+dan harga sebagai float64. Kolom lain hanya di-tokenize dan tidak pernah
+dikonversi, sehingga waktu parse dan memori puncak mengikuti dua kolom
+yang dipakai, bukan lebar file.
+
+Tanpa pyarrow, atau jika parser Arrow menolak file (mis. nama kolom
+ganda di header, spasi di sekitar angka), pembacaan jatuh ke engine C
+pandas dengan usecols dan dtype yang sama.
+"""
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow opsional; engine C pandas dipakai
+    pa = None
+
+# Jumlah baris preview, sama dengan df.head()
+PREVIEW_ROWS = 5
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def read_preview(source, rows=PREVIEW_ROWS):
+    """
+    Header dan beberapa baris pertama file CSV
+    Args:
+        source: Path atau file-like (mis. UploadedFile)
+        rows: Jumlah baris preview
+    Returns:
+        DataFrame: rows baris pertama dengan semua kolom file
+    """
+    _rewind(source)
+    return pd.read_csv(source, nrows=rows)
+
+
+def _column_dtypes(date_column, value_column):
+    # Jika kolom yang sama dipilih dua kali, tipe string (tanggal) yang dipakai
+    return {value_column: 'float64', date_column: str}
+
+
+def _read_arrow(source, columns, dtypes):
+    if hasattr(source, 'getbuffer'):
+        # File upload sudah ada di memori: dibaca tanpa salinan
+        source = pa.BufferReader(pa.py_buffer(source.getbuffer()))
+    else:
+        _rewind(source)
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=columns,
+        column_types={name: pa.string() if dtype is str else pa.float64() for name, dtype in dtypes.items()},
+    )
+    table = pa_csv.read_csv(source, read_options=pa_csv.ReadOptions(use_threads=True),
+                            convert_options=convert_options)
+    return table.to_pandas()
+
+
+def read_columns(source, date_column, value_column):
+    """
+    Membaca hanya kolom tanggal dan harga dari file CSV
+    Args:
+        source: Path atau file-like (mis. UploadedFile)
+        date_column: Nama kolom tanggal (dibaca sebagai string)
+        value_column: Nama kolom harga (dibaca sebagai float64)
+    Returns:
+        DataFrame: Kolom date_column dan value_column
+    Raises:
+        ValueError: Jika kolom tidak ditemukan atau harga tidak numerik
+    """
+    columns = list(dict.fromkeys([date_column, value_column]))
+    dtypes = _column_dtypes(date_column, value_column)
+    if pa is not None:
+        try:
+            return _read_arrow(source, columns, dtypes)
+        except pa.ArrowException:
+            pass
+    _rewind(source)
+    return pd.read_csv(source, usecols=columns, dtype=dtypes)
@@ -0,0 +1,236 @@
+"""
+Validasi upload secara streaming per chunk.
+
+Format tanggal dideteksi sekali dari chunk pertama lalu dipakai ulang,
+setiap aturan dicek secara vektor per chunk, dan state (jumlah baris,
+tanggal valid terakhir) dibawa antar chunk. Hasilnya adalah indeks baris
+bermasalah per aturan, sehingga upload besar cukup divalidasi sekali
+jalan dengan memori terbatas.
+"""
+import numpy as np
+import pandas as pd
+
+# Jumlah baris minimum, sama dengan panjang sequence input model
+MIN_ROWS = 60
+
+# Format tanggal yang dicoba secara berurutan oleh detect_date_format
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%Y/%m/%d',
+    '%d-%m-%Y',
+    '%m-%d-%Y',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y%m%d',
+]
+
+
+def detect_date_format(values, sample_size=200):
+    """
+    Mencari format tanggal eksplisit yang cocok untuk seluruh sampel nilai,
+    agar parsing berikutnya tidak perlu menebak format per elemen
+    Returns:
+        str atau None: Format strftime, atau None jika tidak ada yang cocok
+    """
+    sample = pd.Series(values).dropna().astype(str).str.strip()
+    sample = sample[sample != ''].head(sample_size)
+    if sample.empty:
+        return None
+    for date_format in DATE_FORMATS:
+        try:
+            pd.to_datetime(sample, format=date_format)
+            return date_format
+        except (ValueError, TypeError):
+            continue
+    return None
+
+
+# Urutan prioritas pesan, mengikuti urutan pengecekan validate_data
+RULES = [
+    'date_invalid',
+    'value_not_numeric',
+    'value_missing',
+    'value_negative',
+    'date_missing',
+    'date_not_ascending',
+]
+
+RULE_LABELS = {
+    'date_invalid': 'format tanggal tidak valid',
+    'value_not_numeric': 'nilai bukan angka',
+    'value_missing': 'nilai kosong',
+    'value_negative': 'nilai negatif',
+    'date_missing': 'tanggal kosong',
+    'date_not_ascending': 'tanggal lebih awal dari baris sebelumnya',
+}
+
+
+class ValidationReport:
+    """
+    Hasil validasi streaming
+    Attributes:
+        rows: Jumlah baris data yang diperiksa
+        date_format: Format tanggal yang terdeteksi (None = inferensi pandas)
+        error_counts: Jumlah baris bermasalah per aturan
+        errors: Indeks baris (0-based, tanpa header) per aturan, dibatasi max_errors
+    """
+    def __init__(self, date_column, value_column, min_rows, date_format, rows, error_counts, errors):
+        self.date_column = date_column
+        self.value_column = value_column
+        self.min_rows = min_rows
+        self.date_format = date_format
+        self.rows = rows
+        self.error_counts = error_counts
+        self.errors = errors
+
+    @property
+    def is_valid(self):
+        return self.rows >= self.min_rows and not any(self.error_counts.values())
+
+    def first_error(self):
+        """Pesan untuk masalah pertama sesuai urutan prioritas validate_data"""
+        if self.rows < self.min_rows:
+            return f"Data minimal {self.min_rows} baris untuk melakukan prediksi"
+        for rule in RULES:
+            if self.error_counts[rule]:
+                return self._rule_message(rule)
+        return ""
+
+    def _rule_message(self, rule):
+        if rule == 'date_invalid':
+            return f"Kolom {self.date_column} harus berformat tanggal yang valid (contoh: YYYY-MM-DD, MM/DD/YYYY)"
+        if rule in ('value_not_numeric', 'value_missing'):
+            return f"Kolom {self.value_column} mengandung nilai yang tidak valid"
+        if rule == 'value_negative':
+            return f"Kolom {self.value_column} tidak boleh mengandung nilai negatif"
+        if rule == 'date_missing':
+            return "Data tidak boleh mengandung nilai yang hilang (NA/null)"
+        return "Data harus diurutkan berdasarkan tanggal secara ascending"
+
+    def summary(self, examples=5):
+        """Ringkasan seluruh masalah beserta contoh nomor baris (1-based)"""
+        if self.rows < self.min_rows:
+            return self.first_error()
+        parts = []
+        for rule in RULES:
+            count = self.error_counts[rule]
+            if count:
+                rows = ', '.join(str(r + 1) for r in self.errors[rule][:examples])
+                parts.append(f"{RULE_LABELS[rule]}: {count} baris (mis. baris {rows})")
+        return '; '.join(parts)
+
+    def error_frame(self):
+        """Indeks baris bermasalah sebagai tabel (Baris 1-based, Masalah)"""
+        frames = [pd.DataFrame({'Baris': self.errors[rule] + 1, 'Masalah': RULE_LABELS[rule]})
+                  for rule in RULES if len(self.errors[rule])]
+        if not frames:
+            return pd.DataFrame(columns=['Baris', 'Masalah'])
+        return pd.concat(frames).sort_values('Baris', kind='stable').reset_index(drop=True)
+
+
+def _parse_dates(column, date_format):
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column
+    if date_format is None:
+        # Tidak ada format eksplisit yang cocok: jatuh ke inferensi per elemen
+        return pd.to_datetime(column, errors='coerce', format='mixed')
+    return pd.to_datetime(column, errors='coerce', format=date_format)
+
+
+def validate_chunks(chunks, date_column, value_column, min_rows=MIN_ROWS, max_errors=10_000):
+    """
+    Memvalidasi iterable berisi DataFrame chunk
+    Args:
+        chunks: Iterable DataFrame yang memuat date_column dan value_column
+        date_column: Nama kolom tanggal
+        value_column: Nama kolom nilai
+        min_rows: Jumlah baris minimum
+        max_errors: Batas indeks baris yang disimpan per aturan
+    Returns:
+        ValidationReport
+    """
+    error_counts = {rule: 0 for rule in RULES}
+    error_parts = {rule: [] for rule in RULES}
+    stored = {rule: 0 for rule in RULES}
+    date_format = None
+    format_detected = False
+    last_date = None
+    offset = 0
+
+    def record(rule, mask):
+        positions = np.flatnonzero(mask)
+        if not len(positions):
+            return
+        error_counts[rule] += len(positions)
+        room = max_errors - stored[rule]
+        if room > 0:
+            error_parts[rule].append(positions[:room] + offset)
+            stored[rule] += min(room, len(positions))
+
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        raw_dates = chunk[date_column]
+        raw_values = chunk[value_column]
+
+        if not format_detected:
+            if not pd.api.types.is_datetime64_any_dtype(raw_dates):
+                date_format = detect_date_format(raw_dates)
+            format_detected = True
+
+        # Aturan tanggal
+        dates = _parse_dates(raw_dates, date_format).to_numpy(dtype='datetime64[ns]')
+        date_missing = raw_dates.isna().to_numpy()
+        if raw_dates.dtype == object:
+            date_missing = date_missing | (raw_dates.astype(str).str.strip() == '').to_numpy()
+        date_invalid = ~date_missing & np.isnat(dates)
+        record('date_missing', date_missing)
+        record('date_invalid', date_invalid)
+
+        # Aturan nilai
+        values = pd.to_numeric(raw_values, errors='coerce').to_numpy(dtype=np.float64)
+        value_missing = raw_values.isna().to_numpy()
+        value_not_numeric = ~value_missing & np.isnan(values)
+        with np.errstate(invalid='ignore'):
+            value_negative = values < 0
+        record('value_missing', value_missing)
+        record('value_not_numeric', value_not_numeric)
+        record('value_negative', value_negative)
+
+        # Urutan tanggal: bandingkan setiap tanggal valid dengan tanggal valid sebelumnya,
+        # termasuk tanggal valid terakhir dari chunk sebelumnya
+        valid_positions = np.flatnonzero(~np.isnat(dates))
+        if len(valid_positions):
+            valid_dates = dates[valid_positions]
+            previous = np.concatenate([[last_date if last_date is not None else valid_dates[0]],
+                                       valid_dates[:-1]])
+            descending = np.zeros(len(chunk), dtype=bool)
+            descending[valid_positions[valid_dates < previous]] = True
+            record('date_not_ascending', descending)
+            last_date = valid_dates[-1]
+
+        offset += len(chunk)
+
+    errors = {rule: (np.concatenate(error_parts[rule]) if error_parts[rule] else np.empty(0, dtype=np.int64))
+              for rule in RULES}
+    return ValidationReport(date_column, value_column, min_rows, date_format, offset, error_counts, errors)
+
+
+def validate_stream(source, date_column, value_column, chunksize=100_000, **kwargs):
+    """
+    Memvalidasi file CSV (path atau file-like) tanpa memuat seluruhnya
+    Raises:
+        ValueError: Jika kolom tidak ditemukan di header
+    """
+    reader = pd.read_csv(source, usecols=list(dict.fromkeys([date_column, value_column])),
+                         dtype=str, chunksize=chunksize)
+    with reader:
+        return validate_chunks(reader, date_column, value_column, **kwargs)
+
+
+def validate_frame(df, date_column, value_column, chunksize=100_000, **kwargs):
+    """Memvalidasi DataFrame yang sudah dimuat dengan aturan yang sama, per potongan"""
+    chunks = (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+    return validate_chunks(chunks, date_column, value_column, **kwargs)